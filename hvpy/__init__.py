@@ -1,7 +1,81 @@
-from .config import set_api_url
+import importlib
+
 from .datasource import *
 from .event import *
-from .facade import *
-from .helpers import createMovie, createScreenshot
-from .utils import create_events, create_layers, save_file
 from .version import __version__
+
+# Everything else is imported on first use, so that ``import hvpy`` does not
+# pay for requests, pydantic and every parameter model up front.
+_LAZY = {
+    "getClosestImages": "batch",
+    "Client": "client",
+    "set_client": "client",
+    "set_api_url": "config",
+    "createMovie": "helpers",
+    "createScreenshot": "helpers",
+    "read_jp2_header": "jp2",
+    "create_events": "utils",
+    "create_layers": "utils",
+    "data_sources_to_int": "utils",
+    "save_file": "utils",
+}
+_LAZY.update(
+    dict.fromkeys(
+        [
+            "getJP2Image",
+            "getJP2Header",
+            "getJPXClosestToMidPoint",
+            "getJPX",
+            "getStatus",
+            "getClosestImage",
+            "getDataSources",
+            "takeScreenshot",
+            "downloadScreenshot",
+            "queueMovie",
+            "reQueueMovie",
+            "getMovieStatus",
+            "downloadMovie",
+            "getNewsFeed",
+            "shortenURL",
+            "getTile",
+        ],
+        "facade",
+    )
+)
+_SUBMODULES = {
+    "availability",
+    "batch",
+    "cache",
+    "catalog",
+    "client",
+    "config",
+    "core",
+    "facade",
+    "helpers",
+    "io",
+    "jp2",
+    "metrics",
+    "parameters",
+    "polling",
+    "ratelimit",
+    "registry",
+    "retry",
+    "store",
+    "utils",
+}
+
+__all__ = ["DataSource", "EventType", "__version__", *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | _SUBMODULES)
@@ -0,0 +1,10 @@
+"""
+Asynchronous versions of the ``hvpy`` API functions.
+
+Every function shares its name and parameters with the synchronous one in
+`hvpy`, but is a coroutine function backed by a single asynchronous
+connection pool. This requires the optional ``httpx`` dependency.
+"""
+from .client import AsyncClient, aclose, set_client
+from .facade import *
+from .helpers import createMovie, createScreenshot
@@ -0,0 +1,207 @@
+import asyncio
+import weakref
+from typing import Any, Dict, Union, Callable, Iterable, Optional
+
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover
+    raise ImportError("hvpy.aio requires httpx, install it with: pip install hvpy[async]") from e
+
+from hvpy.metrics import CallEvent
+from hvpy.ratelimit import RateLimiter
+from hvpy.retry import RetryPolicy
+from hvpy.singleflight import AsyncSingleFlight
+
+__all__ = ["AsyncClient", "aclose", "get_client", "set_client"]
+
+
+class AsyncClient:
+    """
+    Pooled asynchronous HTTP client used by `hvpy.aio`.
+
+    A single connection pool is shared by every coroutine, so hundreds of
+    requests can be in flight at once without a thread per request.
+
+    Parameters
+    ----------
+    max_connections
+        Maximum number of concurrent connections.
+        Default is 100.
+    max_keepalive_connections
+        Maximum number of idle connections kept alive.
+        Default is 20.
+    keepalive_expiry
+        Seconds an idle connection is kept alive for.
+        Default is 5.
+    timeout
+        Timeout in seconds, `None` waits forever.
+        Default is ``httpx.Timeout(None, connect=10)``.
+    headers
+        Extra headers sent with every request.
+        Default is `None`, optional.
+    transport
+        An ``httpx`` transport to use instead of the default network one.
+        Default is `None`, optional.
+    retry
+        When to send failed requests again.
+        Default is `None` (a default `hvpy.retry.RetryPolicy`), optional.
+    rate_limiter
+        Limits the rate of requests sent to each endpoint.
+        Default is `None` (unlimited), optional.
+    coalesce
+        Share one request between identical API calls made concurrently,
+        except for the endpoints in `hvpy.retry.NON_IDEMPOTENT_ENDPOINTS`.
+        Default is `True`.
+    hooks
+        Called with a `hvpy.metrics.CallEvent` for everything that happens
+        during an API call, e.g. a `hvpy.metrics.MetricsCollector`.
+        Default is `None`, optional.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5,
+        timeout: Union[None, float, "httpx.Timeout"] = httpx.Timeout(None, connect=10),
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalesce: bool = True,
+        hooks: Optional[Iterable[Callable[[CallEvent], Any]]] = None,
+    ):
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.hooks = list(hooks or ())
+        self.flights = AsyncSingleFlight() if coalesce else None
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.session = httpx.AsyncClient(limits=limits, timeout=timeout, headers=headers, transport=transport)
+
+    async def get(
+        self, url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False, **kwargs
+    ) -> "httpx.Response":
+        """
+        Sends a GET request through the connection pool.
+
+        Parameters
+        ----------
+        url
+            The URL to request.
+        params
+            The query parameters.
+        stream
+            Whether to return before the body is read, which must then be
+            closed with ``await response.aclose()``.
+            Default is `False`.
+        **kwargs
+            Passed on to ``httpx.AsyncClient.get``.
+
+        Returns
+        -------
+        ``httpx.Response``
+            The response.
+        """
+        if stream:
+            request = self.session.build_request("GET", url, params=_to_query(params), **kwargs)
+            return await self.session.send(request, stream=True)
+        return await self.session.get(url, params=_to_query(params), **kwargs)
+
+    def stream(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        """
+        Opens a streaming GET request through the connection pool.
+
+        Parameters
+        ----------
+        url
+            The URL to request.
+        params
+            The query parameters.
+        **kwargs
+            Passed on to ``httpx.AsyncClient.stream``.
+
+        Returns
+        -------
+        An asynchronous context manager yielding the ``httpx.Response``.
+        """
+        return self.session.stream("GET", url, params=_to_query(params), **kwargs)
+
+    async def close(self) -> None:
+        """
+        Closes every pooled connection.
+        """
+        await self.session.aclose()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def _to_query(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Drops `None` values and renders booleans the way `requests` does, so both
+    clients send the same query strings.
+    """
+    if params is None:
+        return None
+    return {k: str(v) if isinstance(v, bool) else v for k, v in params.items() if v is not None}
+
+
+_client: Optional[AsyncClient] = None
+# httpx pools are bound to the event loop they were first used on, so the
+# default client is created once per running loop.
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> AsyncClient:
+    """
+    Returns the client used by default for every asynchronous API call.
+
+    Unless one was set with `set_client`, a client is created for the
+    running event loop on first use. Its connections stay open until
+    `aclose` is awaited on that loop.
+    """
+    if _client is not None:
+        return _client
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        from hvpy.config import LiveSettings
+
+        client = AsyncClient(
+            max_connections=LiveSettings.pool_maxsize * 10,
+            timeout=httpx.Timeout(LiveSettings.read_timeout, connect=LiveSettings.connect_timeout),
+        )
+        _loop_clients[loop] = client
+    return client
+
+
+def set_client(client: Optional[AsyncClient]) -> None:
+    """
+    Sets the client used by default for every asynchronous API call.
+
+    Parameters
+    ----------
+    client : `hvpy.aio.AsyncClient`
+        The client to use, `None` to go back to a client per event loop.
+    """
+    global _client
+    _client = client
+
+
+async def aclose() -> None:
+    """
+    Closes the client `get_client` created for the running event loop.
+
+    Await it before the loop is closed, e.g. at the end of the coroutine
+    given to `asyncio.run`. A client set with `set_client` is left open.
+    """
+    client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
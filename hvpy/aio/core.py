@@ -0,0 +1,249 @@
+import os
+import time
+import asyncio
+from typing import Any, Dict, Union, BinaryIO, Callable, Optional, Awaitable
+from pathlib import Path
+
+import httpx
+
+from hvpy.aio.client import AsyncClient, get_client
+from hvpy.availability import AVAILABILITY_ENDPOINTS, _clamp, get_availability
+from hvpy.cache import MISSING, cache_key, get_cache
+from hvpy.core import CHUNK_SIZE, _emit, _lookup, parse_response
+from hvpy.io import HvpyParameters
+from hvpy.retry import NON_IDEMPOTENT_ENDPOINTS
+from hvpy.utils import _partial_filename, _prepare_filename
+
+__all__ = ["download_api_call", "execute_api_call"]
+
+
+async def execute_api_call(
+    input_parameters: HvpyParameters,
+    client: Optional[AsyncClient] = None,
+) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Executes the API call asynchronously and returns a parsed response.
+
+    Like `hvpy.core.execute_api_call`, responses are served from and stored
+    in the cache, the catalog and the store, if any. Identical calls made
+    concurrently share one request, unless the client was created with
+    ``coalesce=False``. Transient failures are retried according to the
+    retry policy of the client. Calls for dates without images are clamped
+    or rejected by the availability index, which is checked in a worker
+    thread as it may fetch ``getDataSources`` and ``getStatus`` with the
+    synchronous client.
+
+    Parameters
+    ----------
+    input_parameters
+        The input parameters.
+    client
+        The client to send the request with.
+        Default is `None` (the one returned by `hvpy.aio.client.get_client`), optional.
+
+    Returns
+    -------
+    Union[bytes, str, Dict[str, Any]]
+        Parsed response from the API.
+    """
+    client = client or get_client()
+    if get_availability() is not None and input_parameters.endpoint in AVAILABILITY_ENDPOINTS:
+        input_parameters = await asyncio.get_running_loop().run_in_executor(None, _clamp, input_parameters)
+    cache = get_cache()
+    if cache is None or not cache.caches(input_parameters):
+        return await _coalesce(input_parameters, client, lambda: _call(input_parameters, client))
+    result = cache.get(input_parameters)
+    if client.hooks:
+        _emit(client, "cache_miss" if result is MISSING else "cache_hit", input_parameters, source="memory")
+    if result is not MISSING:
+        return result
+
+    async def fetch() -> Union[bytes, str, Dict[str, Any]]:
+        result = await _call(input_parameters, client)
+        cache.set(input_parameters, result)
+        return result
+
+    return await _coalesce(input_parameters, client, fetch)
+
+
+async def _coalesce(
+    input_parameters: HvpyParameters,
+    client: AsyncClient,
+    fetch: Callable[[], Awaitable[Union[bytes, str, Dict[str, Any]]]],
+) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Awaits ``fetch()``, or waits for an identical call in flight.
+    """
+    if client.flights is None or input_parameters.endpoint in NON_IDEMPOTENT_ENDPOINTS:
+        return await fetch()
+    if not client.hooks:
+        return await client.flights.do((input_parameters.endpoint, cache_key(input_parameters)), fetch)
+    leader = False
+
+    async def lead() -> Union[bytes, str, Dict[str, Any]]:
+        nonlocal leader
+        leader = True
+        return await fetch()
+
+    try:
+        return await client.flights.do((input_parameters.endpoint, cache_key(input_parameters)), lead)
+    finally:
+        if not leader:
+            _emit(client, "coalesced", input_parameters)
+
+
+async def _call(input_parameters: HvpyParameters, client: AsyncClient) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Returns the parsed response, from the catalog or the disk store if
+    possible.
+    """
+    data, save = _lookup(input_parameters, client)
+    if data is not MISSING:
+        return data
+    data = await _send(input_parameters, client)
+    if save is not None:
+        save(data)
+    return data
+
+
+async def _send(input_parameters: HvpyParameters, client: AsyncClient) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Sends the request and parses the response.
+    """
+    start = time.perf_counter()
+    try:
+        response = await _get(input_parameters, client)
+        response.raise_for_status()
+        result = parse_response(response, input_parameters.get_output_type())
+    except Exception as e:
+        if client.hooks:
+            _emit(client, "error", input_parameters, elapsed=time.perf_counter() - start, error=e)
+        raise
+    if client.hooks:
+        _emit(
+            client,
+            "response",
+            input_parameters,
+            status=response.status_code,
+            elapsed=time.perf_counter() - start,
+            nbytes=len(response.content),
+        )
+    return result
+
+
+async def _get(input_parameters: HvpyParameters, client: AsyncClient, stream: bool = False) -> "httpx.Response":
+    """
+    Sends the request within the rate limits of the client, trying again after
+    transient failures as its retry policy allows.
+
+    With ``stream``, the body of the response returned is not read yet.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if client.rate_limiter is not None:
+            wait = client.rate_limiter.reserve(input_parameters.endpoint)
+            if wait:
+                await asyncio.sleep(wait)
+        if client.hooks:
+            _emit(client, "request", input_parameters, attempt=attempt)
+        try:
+            response = await client.get(
+                input_parameters.url, params=input_parameters.model_dump(exclude_none=True), stream=stream
+            )
+        except httpx.TransportError as e:
+            if not client.retry.should_retry(input_parameters, attempt):
+                raise
+            if client.hooks:
+                _emit(client, "retry", input_parameters, attempt=attempt, error=e)
+            await asyncio.sleep(client.retry.delay(attempt))
+            continue
+        if response.status_code >= 400 and client.retry.should_retry(input_parameters, attempt, response.status_code):
+            if client.hooks:
+                _emit(client, "retry", input_parameters, attempt=attempt, status=response.status_code)
+            await response.aclose()
+            await asyncio.sleep(client.retry.delay(attempt, response.headers))
+            continue
+        return response
+
+
+async def download_api_call(
+    input_parameters: HvpyParameters,
+    sink: Union[str, Path, BinaryIO],
+    overwrite: bool = False,
+    progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    client: Optional[AsyncClient] = None,
+) -> Union[Path, BinaryIO]:
+    """
+    Executes the API call asynchronously and streams the raw response to a
+    file.
+
+    When saving to a path, the data is first written to ``<filename>.part``
+    and only renamed once complete. The request is rate limited and retried
+    like those of `execute_api_call`.
+
+    Parameters
+    ----------
+    input_parameters
+        The input parameters.
+    sink
+        The path to save the response to, or a binary file-like object to write it to.
+    overwrite
+        Whether to overwrite the file if it already exists.
+        Default is `False`.
+    progress
+        Called as ``progress(downloaded, total)`` after every chunk, where
+        ``total`` is the size announced by the server or `None`.
+        Default is `None`, optional.
+    chunk_size
+        Size in bytes of the chunks read from the network.
+        Default is `hvpy.core.CHUNK_SIZE`.
+    client
+        The client to send the request with.
+        Default is `None` (the one returned by `hvpy.aio.client.get_client`), optional.
+
+    Returns
+    -------
+    Union[`~pathlib.Path`, BinaryIO]
+        The path to the saved file, or ``sink`` if it is file-like.
+    """
+    client = client or get_client()
+    start = time.perf_counter()
+    try:
+        response = await _get(input_parameters, client, stream=True)
+        try:
+            response.raise_for_status()
+            length = response.headers.get("Content-Length")
+            total = int(length) if length is not None else None
+            if hasattr(sink, "write"):
+                f, path = sink, None
+            else:
+                path = _prepare_filename(sink, overwrite=overwrite)
+                partial = _partial_filename(path)
+                f = partial.open("wb")
+            try:
+                downloaded = 0
+                async for chunk in response.aiter_bytes(chunk_size):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    if progress is not None:
+                        progress(downloaded, total)
+            except BaseException:
+                if path is not None:
+                    f.close()
+                    partial.unlink(missing_ok=True)
+                raise
+            if path is not None:
+                f.close()
+                os.replace(partial, path)
+        finally:
+            await response.aclose()
+    except Exception as e:
+        if client.hooks:
+            _emit(client, "error", input_parameters, elapsed=time.perf_counter() - start, error=e)
+        raise
+    if client.hooks:
+        elapsed = time.perf_counter() - start
+        _emit(client, "response", input_parameters, status=response.status_code, elapsed=elapsed, nbytes=downloaded)
+    return sink if path is None else path
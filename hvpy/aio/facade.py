@@ -0,0 +1,73 @@
+import inspect
+import functools
+from typing import Any, Dict, Union, Callable, Awaitable
+
+import hvpy.facade
+import hvpy.parameters
+from hvpy.aio.core import execute_api_call
+
+__all__ = list(hvpy.facade.__all__)
+
+
+def _asyncio_docstring(name: str, doc: str) -> str:
+    """
+    Rewrites the examples of a synchronous facade function to run the coroutine
+    function of the same name with `asyncio.run`.
+    """
+    lines = doc.split("\n")
+    out = []
+    i = 0
+    in_examples = False
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if stripped == "Examples" and not in_examples:
+            in_examples = True
+            indent = line[: len(line) - len(line.lstrip())]
+            out += [line, lines[i + 1], f"{indent}>>> import asyncio"]
+            i += 2
+            continue
+        if in_examples and stripped.startswith(">>> from hvpy import "):
+            line = line.replace("from hvpy import", "from hvpy.aio import")
+        elif in_examples and stripped.startswith(f">>> {name}("):
+            # Wrap the whole call, which may continue over several lines.
+            block = [line.replace(f">>> {name}(", f">>> asyncio.run({name}(", 1)]
+            depth = line.count("(") - line.count(")")
+            while depth > 0:
+                i += 1
+                block.append(lines[i])
+                depth += lines[i].count("(") - lines[i].count(")")
+            code, sep, comment = block[-1].partition("  # ")
+            block[-1] = code + ")" + sep + comment
+            out += block
+            i += 1
+            continue
+        out.append(line)
+        i += 1
+    return "\n".join(out)
+
+
+def _coroutine_function(name: str) -> Callable[..., Awaitable[Union[bytes, str, Dict[str, Any]]]]:
+    """
+    Creates the coroutine function of an endpoint, with the signature and
+    documentation of the synchronous one in `hvpy.facade`.
+    """
+    func = getattr(hvpy.facade, name)
+    signature = inspect.signature(func)
+    input_class = getattr(hvpy.parameters, f"{name}InputParameters")
+
+    @functools.wraps(func)
+    async def coroutine_function(*args, **kwargs) -> Union[bytes, str, Dict[str, Any]]:
+        params = input_class(**signature.bind(*args, **kwargs).arguments)
+        return await execute_api_call(input_parameters=params)
+
+    coroutine_function.__module__ = __name__
+    coroutine_function.__doc__ = _asyncio_docstring(name, func.__doc__)
+    del coroutine_function.__wrapped__
+    coroutine_function.__signature__ = signature
+    return coroutine_function
+
+
+for _name in __all__:
+    globals()[_name] = _coroutine_function(_name)
+del _name
@@ -0,0 +1,226 @@
+import time
+import asyncio
+from typing import Union, Optional
+from pathlib import Path
+from datetime import datetime
+
+from hvpy.aio.core import download_api_call
+from hvpy.aio.facade import getMovieStatus, queueMovie, takeScreenshot
+from hvpy.api_groups.movies.download_movie import downloadMovieInputParameters
+from hvpy.api_groups.movies.queue_movie import queueMovieInputParameters
+from hvpy.api_groups.screenshots.download_screenshot import downloadScreenshotInputParameters
+from hvpy.api_groups.screenshots.take_screenshot import takeScreenshotInputParameters
+from hvpy.polling import FixedPolling, PollingStrategy
+from hvpy.utils import _add_shared_docstring
+
+__all__ = [
+    "createMovie",
+    "createScreenshot",
+]
+
+
+@_add_shared_docstring(queueMovieInputParameters)
+async def createMovie(
+    startTime: datetime,
+    endTime: datetime,
+    layers: str,
+    events: str,
+    eventsLabels: bool,
+    imageScale: float,
+    format: str = "mp4",
+    frameRate: str = "15",
+    maxFrames: Optional[str] = None,
+    scale: Optional[bool] = None,
+    scaleType: Optional[str] = None,
+    scaleX: Optional[float] = None,
+    scaleY: Optional[float] = None,
+    movieLength: Optional[float] = None,
+    watermark: bool = True,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    x0: Optional[int] = None,
+    y0: Optional[int] = None,
+    x1: Optional[int] = None,
+    y1: Optional[int] = None,
+    x2: Optional[int] = None,
+    y2: Optional[int] = None,
+    size: int = 0,
+    movieIcons: Optional[int] = None,
+    followViewport: Optional[int] = None,
+    reqObservationDate: Optional[datetime] = None,
+    overwrite: bool = False,
+    filename: Optional[Union[str, Path]] = None,
+    hq: bool = False,
+    timeout: float = 5,
+    polling: Optional[PollingStrategy] = None,
+) -> Path:
+    """
+    Automatically creates a movie using `queueMovie`, `getMovieStatus` and
+    `downloadMovie` functions.
+
+    Parameters
+    ----------
+    overwrite
+        Whether to overwrite the file if it already exists.
+        Default is `False`.
+    filename
+        The path to save the file to.
+        Optional, will default to ``f"{res['title']}.{format}"``.
+    hq
+        Download a higher-quality movie file (valid for "mp4" movies only, ignored otherwise).
+        Default is `False`, optional.
+    timeout
+        The timeout in minutes to wait for the movie to be created.
+        Default is 5 minutes.
+    polling
+        Decides how long to wait between two checks on the movie.
+        Default is `None` (``FixedPolling(3)``), optional.
+    {Insert}
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from hvpy import DataSource, create_events, create_layers
+    >>> from hvpy.aio import createMovie
+    >>> from datetime import datetime, timedelta
+    >>> movie_location = asyncio.run(createMovie(
+    ...     startTime=datetime.today() - timedelta(days=15, minutes=5),
+    ...     endTime=datetime.today() - timedelta(days=15),
+    ...     layers=create_layers([(DataSource.AIA_171, 100)]),
+    ...     events=create_events(["AR"]),
+    ...     eventsLabels=True,
+    ...     imageScale=1,
+    ...     filename="my_movie",
+    ... ))
+    >>> # This is to cleanup the file created from the example
+    >>> # you don't need to do this
+    >>> from pathlib import Path
+    >>> Path('my_movie.mp4').unlink()
+    """
+    input_params = locals()
+    # These are used later on but we want to avoid passing
+    # them into queueMovie.
+    overwrite = input_params.pop("overwrite")
+    filename = input_params.pop("filename")
+    hq = input_params.pop("hq")
+    timeout = input_params.pop("timeout")
+    polling = input_params.pop("polling") or FixedPolling()
+    res = await queueMovie(**input_params)
+    if res.get("error"):
+        raise RuntimeError(res["error"])
+    start = time.time()
+    timeout_counter = start + 60 * timeout  # Default 5 minutes
+    title = ""
+    polls = 0
+    status = res
+    while True:
+        delay = polling.delay(status, polls, time.time() - start)
+        await asyncio.sleep(min(delay, max(timeout_counter - time.time(), 0)))
+        status = await getMovieStatus(
+            id=res["id"],
+            format=format,
+            verbose=polling.verbose,
+            token=res["token"],
+        )
+        polls += 1
+        if status["status"] == 2:
+            title = status["title"]
+            break
+        if status["status"] == 3:
+            raise RuntimeError(status["error"])
+        if time.time() > timeout_counter:
+            raise RuntimeError(f"Exceeded timeout of {timeout} minutes.")
+    if filename is None:
+        filename = f"{title}.{format}"
+    else:
+        filename = f"{filename}.{format}"
+    filename = await download_api_call(
+        downloadMovieInputParameters(
+            id=res["id"],
+            format=format,
+            hq=hq,
+        ),
+        sink=filename,
+        overwrite=overwrite,
+    )
+    return filename
+
+
+@_add_shared_docstring(takeScreenshotInputParameters)
+async def createScreenshot(
+    date: datetime,
+    imageScale: float,
+    layers: str,
+    events: Optional[str] = None,
+    eventLabels: bool = False,
+    scale: bool = False,
+    scaleType: Optional[str] = None,
+    scaleX: Optional[int] = None,
+    scaleY: Optional[int] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    x0: Optional[int] = None,
+    y0: Optional[int] = None,
+    x1: Optional[int] = None,
+    y1: Optional[int] = None,
+    x2: Optional[int] = None,
+    y2: Optional[int] = None,
+    watermark: bool = False,
+    overwrite: bool = False,
+    filename: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Automatically creates a screenshot using `takeScreenshot`,
+    `downloadScreenshot` functions.
+
+    Parameters
+    ----------
+    overwrite
+        Whether to overwrite the file if it already exists.
+        Default is `False`.
+    filename
+        The path to save the file to.
+        Optional, will default to ``f"{res['id']}_{date.date()}.png"``.
+    {Insert}
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from hvpy import DataSource, create_events, create_layers, EventType
+    >>> from hvpy.aio import createScreenshot
+    >>> from datetime import datetime, timedelta
+    >>> screenshot_location = asyncio.run(createScreenshot(
+    ...     date=datetime.today() - timedelta(days=15),
+    ...     layers=create_layers([(DataSource.AIA_171, 100)]),
+    ...     events=create_events([EventType.ACTIVE_REGION]),
+    ...     eventLabels=True,
+    ...     imageScale=1,
+    ...     x0=0,
+    ...     y0=0,
+    ...     width=100,
+    ...     height=100,
+    ...     filename="my_screenshot",
+    ... ))
+    >>> # This is to cleanup the file created from the example
+    >>> # you don't need to do this
+    >>> from pathlib import Path
+    >>> Path('my_screenshot.png').unlink()
+    """
+    input_params = locals()
+    # These are used later on but we want to avoid passing
+    # them into takeScreenshot.
+    input_params.pop("overwrite")
+    input_params.pop("filename")
+    res = await takeScreenshot(**input_params)
+    if res.get("error"):
+        raise RuntimeError(res["error"])
+    if filename is None:
+        filename = f"{res['id']}_{date.date()}.png"
+    else:
+        filename = f"{filename}.png"
+    filename = await download_api_call(
+        downloadScreenshotInputParameters(id=res["id"]),
+        sink=filename,
+        overwrite=overwrite,
+    )
+    return filename
@@ -0,0 +1,265 @@
+import json
+import asyncio
+from pathlib import Path
+from datetime import datetime
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from hvpy import DataSource  # noqa: E402
+from hvpy.aio import (  # noqa: E402
+    AsyncClient,
+    aclose,
+    createScreenshot,
+    getClosestImage,
+    getJP2Header,
+    getStatus,
+    set_client,
+)
+from hvpy.aio.client import _loop_clients, get_client  # noqa: E402
+from hvpy.aio.facade import getJP2Image  # noqa: E402
+from hvpy.metrics import MetricsCollector  # noqa: E402
+from hvpy.retry import RetryPolicy  # noqa: E402
+
+
+@pytest.fixture
+def fake_async_api():
+    calls = []
+    routes = {}
+
+    def handler(request):
+        calls.append(request)
+        endpoint = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        return routes[endpoint](request)
+
+    client = AsyncClient(transport=httpx.MockTransport(handler), retry=RetryPolicy(backoff_factor=0))
+    set_client(client)
+    yield routes, calls
+    set_client(None)
+
+
+def test_json_response(fake_async_api, date):
+    routes, calls = fake_async_api
+    routes["getClosestImage"] = lambda request: httpx.Response(200, json={"id": "1", "date": "2022-01-01"})
+    response = asyncio.run(getClosestImage(date=date, sourceId=DataSource.AIA_171))
+    assert response == {"id": "1", "date": "2022-01-01"}
+    assert calls[0].url.params["sourceId"] == "10"
+    assert "callback" not in calls[0].url.params
+
+
+def test_string_response(fake_async_api):
+    routes, calls = fake_async_api
+    routes["getJP2Header"] = lambda request: httpx.Response(200, text="<meta></meta>")
+    assert asyncio.run(getJP2Header(id=1)) == "<meta></meta>"
+
+
+def test_many_requests_in_flight(fake_async_api):
+    routes, calls = fake_async_api
+    routes["getClosestImage"] = lambda request: httpx.Response(200, json={})
+
+    async def main():
+        return await asyncio.gather(
+            *[getClosestImage(date=datetime(2022, 1, 1, 0, 0, i), sourceId=DataSource.AIA_171) for i in range(50)]
+        )
+
+    assert asyncio.run(main()) == [{}] * 50
+    assert len(calls) == 50
+
+
+def test_identical_requests_are_coalesced(fake_async_api):
+    routes, calls = fake_async_api
+
+    async def status(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"status": "ok"})
+
+    routes["getStatus"] = status
+
+    async def main():
+        return await asyncio.gather(*[getStatus() for _ in range(20)])
+
+    results = asyncio.run(main())
+    assert results == [{"status": "ok"}] * 20
+    assert results[0] is not results[1]
+    assert len(calls) == 1
+
+
+def test_metrics(fake_async_api):
+    routes, calls = fake_async_api
+
+    async def status(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={})
+
+    routes["getStatus"] = status
+    metrics = MetricsCollector()
+    get_client().hooks.append(metrics)
+
+    async def main():
+        return await asyncio.gather(*[getStatus() for _ in range(3)])
+
+    asyncio.run(main())
+    assert metrics.counters["requests"] == {"getStatus": 1}
+    assert metrics.counters["coalesced"] == {"getStatus": 2}
+    assert metrics.counters["bytes"] == {"getStatus": 2}
+    assert metrics.responses == {("getStatus", 200): 1}
+
+
+def test_http_error(fake_async_api):
+    routes, calls = fake_async_api
+    routes["getStatus"] = lambda request: httpx.Response(503)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(getStatus())
+    assert len(calls) == 4
+    routes["getStatus"] = lambda request: httpx.Response(404)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(getStatus())
+    assert len(calls) == 5
+
+
+def test_createScreenshot(fake_async_api, date, tmp_path):
+    routes, calls = fake_async_api
+    routes["takeScreenshot"] = lambda request: httpx.Response(200, json={"id": 42})
+    routes["downloadScreenshot"] = lambda request: httpx.Response(200, content=b"png")
+    result = asyncio.run(
+        createScreenshot(date=date, imageScale=2.5, layers="[10,1,100]", filename=tmp_path / "screenshot")
+    )
+    assert result == tmp_path / "screenshot.png"
+    assert Path(result).read_bytes() == b"png"
+    assert json.loads(json.dumps(dict(calls[0].url.params)))["display"] == "False"
+
+
+def test_cache(fake_async_api):
+    from hvpy.cache import LRUCache, caching
+
+    routes, calls = fake_async_api
+    routes["getStatus"] = lambda request: httpx.Response(200, json={})
+    with caching(LRUCache()):
+        asyncio.run(getStatus())
+        asyncio.run(getStatus())
+    assert len(calls) == 1
+
+
+def test_generated_functions(fake_async_api):
+    routes, calls = fake_async_api
+    routes["getJP2Image"] = lambda request: httpx.Response(200, text="jpip://image")
+    assert asyncio.run(getJP2Image(datetime(2022, 1, 1), DataSource.AIA_171, jpip=True)) == "jpip://image"
+    assert calls[0].url.params["sourceId"] == "10"
+    assert calls[0].url.params["jpip"] == "True"
+    assert getJP2Image.__module__ == "hvpy.aio.facade"
+    assert ">>> asyncio.run(getJP2Image(" in getJP2Image.__doc__
+    with pytest.raises(TypeError):
+        asyncio.run(getJP2Image(datetime(2022, 1, 1)))
+
+
+def test_aclose():
+    async def main():
+        client = get_client()
+        assert get_client() is client
+        await aclose()
+        assert client.session.is_closed
+        assert asyncio.get_running_loop() not in _loop_clients
+        # Closing twice is harmless
+        await aclose()
+
+    asyncio.run(main())
+
+
+def test_download_writes_a_partial_file(fake_async_api, date, tmp_path):
+    from hvpy.aio.core import download_api_call
+    from hvpy.parameters import getJP2ImageInputParameters
+
+    routes, calls = fake_async_api
+
+    async def broken():
+        yield b"half"
+        raise httpx.ReadError("Connection lost")
+
+    routes["getJP2Image"] = lambda request: httpx.Response(200, content=broken())
+    params = getJP2ImageInputParameters(date=date, sourceId=DataSource.AIA_171)
+    path = tmp_path / "image.jp2"
+    with pytest.raises(httpx.ReadError):
+        asyncio.run(download_api_call(params, path))
+    # No truncated file is left behind
+    assert list(tmp_path.iterdir()) == []
+    routes["getJP2Image"] = lambda request: httpx.Response(200, content=b"image")
+    assert asyncio.run(download_api_call(params, path)) == path
+    assert path.read_bytes() == b"image"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_download_is_retried_and_rate_limited(fake_async_api, date, tmp_path):
+    from hvpy.aio.core import download_api_call
+    from hvpy.parameters import getJP2ImageInputParameters
+    from hvpy.ratelimit import RateLimiter
+
+    routes, calls = fake_async_api
+    responses = iter([httpx.Response(503), httpx.Response(200, content=b"image")])
+    routes["getJP2Image"] = lambda request: next(responses)
+    client = get_client()
+    client.rate_limiter = RateLimiter(budgets={"getJP2Image": 100}, burst=0.01)
+    metrics = MetricsCollector()
+    client.hooks.append(metrics)
+    path = tmp_path / "image.jp2"
+    assert asyncio.run(download_api_call(getJP2ImageInputParameters(date=date, sourceId=10), path)) == path
+    assert path.read_bytes() == b"image"
+    assert len(calls) == 2
+    assert metrics.counters["requests"] == {"getJP2Image": 2}
+    assert metrics.counters["retries"] == {"getJP2Image": 1}
+    assert metrics.counters["bytes"] == {"getJP2Image": 5}
+    assert client.rate_limiter.waited["getJP2Image"] == pytest.approx(0.02, abs=0.015)
+
+
+def test_availability(fake_api, fake_async_api):
+    from hvpy.availability import AvailabilityIndex, set_availability
+    from hvpy.registry import DataSourceRegistry
+
+    routes, calls = fake_async_api
+    routes["getClosestImage"] = lambda request: httpx.Response(200, json={"id": "1"})
+    sources = {"start": "2010-06-02 00:05:30", "end": None, "nickname": "AIA 171", "sourceId": 10}
+    fake_api.add("getDataSources", json_body={"SDO": {"AIA": {"171": sources}}})
+    fake_api.add("getStatus", json_body={})
+    set_availability(AvailabilityIndex(DataSourceRegistry(), policy="reject"))
+    try:
+        with pytest.raises(ValueError, match="AIA 171 has no images before"):
+            asyncio.run(getClosestImage(date=datetime(2000, 1, 1), sourceId=DataSource.AIA_171))
+        assert asyncio.run(getClosestImage(date=datetime(2020, 1, 1), sourceId=DataSource.AIA_171)) == {"id": "1"}
+    finally:
+        set_availability(None)
+    assert len(calls) == 1
+
+
+def test_store(fake_async_api, tmp_path):
+    from hvpy.aio import getTile
+    from hvpy.store import DiskStore, set_store
+
+    routes, calls = fake_async_api
+    routes["getTile"] = lambda request: httpx.Response(200, content=b"png")
+    store = DiskStore(tmp_path)
+    set_store(store)
+    try:
+        for _ in range(2):
+            assert asyncio.run(getTile(id=7, x=0, y=0, imageScale=2)) == b"png"
+    finally:
+        set_store(None)
+    assert len(calls) == 1
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_catalog(fake_async_api, tmp_path):
+    from hvpy.catalog import ImageCatalog, set_catalog
+
+    routes, calls = fake_async_api
+    body = {"id": "1", "date": "2022-01-01 00:00:00", "width": 4096, "height": 4096}
+    routes["getClosestImage"] = lambda request: httpx.Response(200, json=body)
+    catalog = ImageCatalog(tmp_path / "catalog.sqlite")
+    set_catalog(catalog)
+    try:
+        for _ in range(2):
+            result = asyncio.run(getClosestImage(date=datetime(2022, 1, 1), sourceId=DataSource.AIA_171))
+            assert result["id"] == "1"
+    finally:
+        set_catalog(None)
+        catalog.close()
+    assert len(calls) == 1
@@ -0,0 +1,212 @@
+import time
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple, Union, Optional
+from datetime import datetime, timedelta
+
+from hvpy.datasource import DataSource
+from hvpy.io import HvpyParameters
+from hvpy.utils import _from_timestamp, _to_timestamp, convert_date_to_isoformat
+
+if TYPE_CHECKING:
+    from hvpy.client import Client
+    from hvpy.registry import DataSourceRegistry
+
+__all__ = ["AVAILABILITY_ENDPOINTS", "AvailabilityIndex", "get_availability", "set_availability"]
+
+AVAILABILITY_ENDPOINTS = frozenset({"getClosestImage", "getJP2Image"})
+"""
+Endpoints whose requests are checked against the availability of their
+datasource.
+"""
+
+
+class AvailabilityIndex:
+    """
+    The dates between which each datasource has images, to settle requests for
+    other dates without the API.
+
+    The first image of every datasource is taken from a
+    `hvpy.registry.DataSourceRegistry`. As its ``getDataSources`` response
+    may be a day old, the last one is only taken from ``getStatus``, fetched
+    again once older than ``status_ttl``. Requests after the last image of
+    datasources it does not list, or made while it cannot be fetched, are
+    left to the API.
+
+    The image closest to a date before the first image of its datasource
+    is the first image, and the one closest to a date after the last image
+    is the last image. With the ``"clamp"`` policy, such requests are made
+    for the date of that image instead, so that they share the responses
+    of the cache, the catalog and the store. With the ``"reject"`` policy,
+    they raise a `ValueError`. Images ingested since the index was
+    refreshed are not picked up. Datasources the server does not list are
+    left to the API.
+
+    Parameters
+    ----------
+    registry
+        The registry to take the datasources from.
+        Default is `None` (the one returned by `hvpy.registry.get_registry`), optional.
+    policy
+        Either ``"clamp"`` or ``"reject"``.
+        Default is ``"clamp"``.
+    status_ttl
+        How long the ``getStatus`` response is used before it is fetched again.
+        Default is five minutes.
+    client
+        The client to send the ``getStatus`` requests with.
+        Default is `None` (the default client), optional.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy import DataSource, getClosestImage
+    >>> from hvpy.availability import AvailabilityIndex, set_availability
+    >>> set_availability(AvailabilityIndex(policy="reject"))
+    >>> getClosestImage(date=datetime(1990, 1, 1), sourceId=DataSource.EIT_171)  # doctest: +SKIP
+    Traceback (most recent call last):
+    ...
+    ValueError: EIT 171 has no images before ...
+    >>> set_availability(None)
+    """
+
+    def __init__(
+        self,
+        registry: Optional["DataSourceRegistry"] = None,
+        policy: str = "clamp",
+        status_ttl: timedelta = timedelta(minutes=5),
+        client: Optional["Client"] = None,
+    ):
+        if policy not in ("clamp", "reject"):
+            raise ValueError(f"policy must be 'clamp' or 'reject', not {policy!r}")
+        self.registry = registry
+        self.policy = policy
+        self.status_ttl = status_ttl
+        self.client = client
+        self.clamped = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._status: Optional[Dict[str, float]] = None
+        self._status_fetched = 0.0
+
+    def _registry(self) -> "DataSourceRegistry":
+        if self.registry is None:
+            from hvpy.registry import get_registry
+
+            return get_registry()
+        return self.registry
+
+    def _latest(self) -> Optional[Dict[str, float]]:
+        """
+        Returns the timestamp of the last image of every feed in ``getStatus``,
+        by lowercase name, `None` if it cannot be fetched.
+        """
+        if time.time() - self._status_fetched < self.status_ttl.total_seconds():
+            return self._status
+        # hvpy.core consults this module, so it cannot be imported up front.
+        from hvpy.core import execute_api_call
+        from hvpy.parameters import getStatusInputParameters
+
+        with self._lock:
+            if time.time() - self._status_fetched < self.status_ttl.total_seconds():
+                return self._status
+            try:
+                response = execute_api_call(getStatusInputParameters(), client=self.client)
+                status = {
+                    name.casefold(): _to_timestamp(feed["time"])
+                    for name, feed in response.items()
+                    if isinstance(feed, dict) and feed.get("time")
+                }
+            except Exception:
+                status = None
+            self._status, self._status_fetched = status, time.time()
+        return status
+
+    def window(self, sourceId: Union[int, DataSource]) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Returns the datetimes of the first and last images of a datasource, in
+        UTC, `None` if the server does not list it.
+
+        The last one is `None` unless ``getStatus`` lists the datasource.
+        Datasources that cannot be fetched are not listed.
+        """
+        try:
+            source = self._registry().get(sourceId)
+        except Exception:
+            source = None
+        if source is None:
+            return None
+        latest = self._latest()
+        if latest is None:
+            return source.start, None
+        # The end in the registry may predate images ingested since it was fetched.
+        end = None
+        for name in (source.instrument, "-".join(source.path[1:3])):
+            if name and name.casefold() in latest:
+                end = max(end or 0, latest[name.casefold()])
+        return source.start, None if end is None else _from_timestamp(end)
+
+    def check(self, input_parameters: HvpyParameters) -> HvpyParameters:
+        """
+        Returns the parameters to request instead, clamped to the images of
+        their datasource.
+
+        Raises
+        ------
+        ValueError
+            If the datasource has no image at that date and the policy is
+            ``"reject"``.
+        """
+        if input_parameters.endpoint not in AVAILABILITY_ENDPOINTS:
+            return input_parameters
+        window = self.window(input_parameters.sourceId)
+        if window is None:
+            return input_parameters
+        date, (start, end) = _from_timestamp(_to_timestamp(input_parameters.date)), window
+        if start is not None and date < start:
+            bound, relation = start, "before"
+        elif end is not None and date > end:
+            bound, relation = end, "after"
+        else:
+            return input_parameters
+        if self.policy == "reject":
+            self.rejected += 1
+            nickname = self._registry()[input_parameters.sourceId].nickname
+            raise ValueError(f"{nickname} has no images {relation} {bound}")
+        self.clamped += 1
+        return input_parameters.model_copy(update={"date": convert_date_to_isoformat(bound)})
+
+
+_availability: Optional[AvailabilityIndex] = None
+
+
+def get_availability() -> Optional[AvailabilityIndex]:
+    """
+    Returns the availability index API calls consult, `None` if there is none.
+    """
+    return _availability
+
+
+def set_availability(index: Optional[AvailabilityIndex]) -> None:
+    """
+    Sets the availability index consulted by ``getClosestImage`` and
+    ``getJP2Image``.
+
+    There is no availability index by default.
+
+    Parameters
+    ----------
+    index : `hvpy.availability.AvailabilityIndex`
+        The index to use, `None` to stop using one.
+    """
+    global _availability
+    _availability = index
+
+
+def _clamp(input_parameters: HvpyParameters) -> HvpyParameters:
+    """
+    Checks the parameters against the availability index, if any.
+    """
+    index = _availability
+    if index is None or input_parameters.endpoint not in AVAILABILITY_ENDPOINTS:
+        return input_parameters
+    return index.check(input_parameters)
@@ -0,0 +1,1029 @@
+import io
+import math
+import time
+import bisect
+import threading
+from typing import Any, Dict, List, Tuple, Union, Iterator, Optional, Sequence, NamedTuple
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent import futures
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from hvpy.client import Client
+from hvpy.core import download_api_call, execute_api_call
+from hvpy.datasource import DataSource
+from hvpy.parameters import (
+    downloadMovieInputParameters,
+    downloadScreenshotInputParameters,
+    getClosestImageInputParameters,
+    getJPXInputParameters,
+    getMovieStatusInputParameters,
+    getTileInputParameters,
+    queueMovieInputParameters,
+    takeScreenshotInputParameters,
+)
+from hvpy.polling import ExponentialPolling, PollingStrategy
+from hvpy.utils import _from_timestamp, _to_timestamp, data_sources_to_int
+
+__all__ = [
+    "DEFAULT_VIEWPORT",
+    "JPX_MAX_FRAMES",
+    "TILE_SIZE",
+    "ImageTable",
+    "MovieBatch",
+    "ScreenshotBatch",
+    "createScreenshots",
+    "getClosestFrames",
+    "getClosestImages",
+    "getTiles",
+    "screenshot_grid",
+    "stitchTiles",
+    "tile_grid",
+]
+
+TILE_SIZE = 512
+"""
+Width and height of a ``getTile`` tile, in pixels.
+"""
+DEFAULT_VIEWPORT = (-1200, -1200, 1200, 1200)
+"""
+Viewport covering the solar disk and the inner corona, in arcseconds.
+"""
+JPX_MAX_FRAMES = 1000
+"""
+Number of frames above which ``getJPX`` samples the images of a range instead
+of returning all of them.
+"""
+
+
+class ImageTable(NamedTuple):
+    """
+    Columnar table of images, one row per requested (date, source) pair.
+    """
+
+    requested: List[datetime]
+    """
+    The requested datetimes.
+    """
+    sourceIds: List[int]
+    """
+    The datasource identifiers.
+    """
+    ids: List[int]
+    """
+    Unique image identifiers.
+    """
+    dates: List[datetime]
+    """
+    Observation datetimes of the images.
+    """
+    widths: List[int]
+    """
+    Image widths in pixels.
+    """
+    heights: List[int]
+    """
+    Image heights in pixels.
+    """
+
+    def unique(self) -> "ImageTable":
+        """
+        Returns a table with only the first row of every image identifier.
+        """
+        seen = set()
+        rows = []
+        for i, image_id in enumerate(self.ids):
+            if image_id not in seen:
+                seen.add(image_id)
+                rows.append(i)
+        return ImageTable(*[[column[i] for i in rows] for column in self])
+
+
+def _as_list(sourceIds: Union[int, DataSource, Sequence[Union[int, DataSource]]]) -> list:
+    if isinstance(sourceIds, (int, DataSource)):
+        return [sourceIds]
+    return list(sourceIds)
+
+
+def getClosestImages(
+    dates: Sequence[datetime],
+    sourceIds: Union[int, DataSource, Sequence[Union[int, DataSource]]],
+    concurrency: int = 8,
+    client: Optional[Client] = None,
+) -> ImageTable:
+    """
+    Finds the images closest to many datetimes, for one or more datasources.
+
+    Requests are sent concurrently and identical (date, source) pairs are
+    only requested once.
+
+    Parameters
+    ----------
+    dates
+        Datetimes of the images.
+    sourceIds
+        One or more datasource identifiers, every date is resolved for every source.
+    concurrency
+        Maximum number of requests in flight.
+        Default is 8.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Returns
+    -------
+    `hvpy.batch.ImageTable`
+        One row per (source, date) pair, in the order sources then dates.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy import DataSource
+    >>> from hvpy.batch import getClosestImages
+    >>> table = getClosestImages(
+    ...     dates=[datetime(2022, 1, 1), datetime(2022, 1, 1, 0, 0, 5)],
+    ...     sourceIds=[DataSource.AIA_171, DataSource.AIA_304],
+    ... )
+    >>> len(table.ids), len(table.unique().ids)
+    (4, 2)
+    """
+    rows: List[Tuple[datetime, getClosestImageInputParameters]] = []
+    pending: Dict[Tuple[str, int], getClosestImageInputParameters] = {}
+    for source in data_sources_to_int(_as_list(sourceIds)):
+        for date in dates:
+            params = getClosestImageInputParameters(date=date, sourceId=source)
+            rows.append((date, params))
+            pending.setdefault((params.date, params.sourceId), params)
+
+    def fetch(params: getClosestImageInputParameters) -> Dict[str, Any]:
+        res = execute_api_call(params, client=client)
+        if res.get("error"):
+            raise RuntimeError(res["error"])
+        return res
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = dict(zip(pending, executor.map(fetch, pending.values())))
+    table = ImageTable([], [], [], [], [], [])
+    for date, params in rows:
+        res = results[(params.date, params.sourceId)]
+        table.requested.append(date)
+        table.sourceIds.append(params.sourceId)
+        table.ids.append(int(res["id"]))
+        table.dates.append(datetime.fromisoformat(res["date"]))
+        table.widths.append(int(res["width"]))
+        table.heights.append(int(res["height"]))
+    return table
+
+
+def _nearest(frames: Sequence[float], targets: Sequence[float]) -> List[float]:
+    """
+    Returns the frame closest to each target, earlier frames winning ties.
+
+    ``frames`` must be sorted and not empty. The lookups are vectorized with
+    NumPy if it is installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        nearest = []
+        for target in targets:
+            i = bisect.bisect_left(frames, target)
+            nearest.append(min(frames[max(i - 1, 0) : i + 1], key=lambda frame: abs(frame - target)))
+        return nearest
+    sorted_frames = np.asarray(frames, dtype=float)
+    points = np.asarray(targets, dtype=float)
+    after = np.searchsorted(sorted_frames, points).clip(max=len(sorted_frames) - 1)
+    before = (after - 1).clip(min=0)
+    earlier = np.abs(points - sorted_frames[before]) <= np.abs(sorted_frames[after] - points)
+    return np.where(earlier, sorted_frames[before], sorted_frames[after]).tolist()
+
+
+def getClosestFrames(
+    dates: Sequence[datetime],
+    sourceId: Union[int, DataSource],
+    margin: timedelta = timedelta(hours=1),
+    max_span: timedelta = timedelta(days=1),
+    concurrency: int = 8,
+    client: Optional[Client] = None,
+) -> List[datetime]:
+    """
+    Finds the dates of the images of a datasource closest to many datetimes,
+    with a few ``getJPX`` calls.
+
+    The datetimes are sorted and grouped into ranges of at most
+    ``max_span``. The timestamps of every image in each range, widened by
+    ``margin`` on both sides, are requested with one verbose ``getJPX`` call,
+    split further when the range holds more than `JPX_MAX_FRAMES` images.
+    Every datetime is then resolved locally, with NumPy if it is installed.
+
+    A datetime closer to the edge of its range than to the image found may
+    have a closer image outside of it, it is resolved with
+    ``getClosestImage`` instead.
+
+    Parameters
+    ----------
+    dates
+        Datetimes to resolve, naive ones being in UTC.
+    sourceId
+        Unique image datasource identifier.
+    margin
+        How far to look for images before the first and after the last datetime of a range.
+        Default is one hour.
+    max_span
+        Maximum time between the first and last datetime of a range.
+        Default is one day.
+    concurrency
+        Maximum number of requests in flight.
+        Default is 8.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Returns
+    -------
+    List[`~datetime.datetime`]
+        The date of the closest image to each datetime, in UTC.
+
+    Examples
+    --------
+    >>> from datetime import datetime, timedelta
+    >>> from hvpy import DataSource
+    >>> from hvpy.batch import getClosestFrames
+    >>> dates = [datetime(2022, 1, 1) + timedelta(seconds=7 * i) for i in range(1000)]
+    >>> frames = getClosestFrames(dates, DataSource.AIA_171)
+    >>> len(frames)
+    1000
+    """
+    targets = [_to_timestamp(date) for date in dates]
+    groups: List[List[int]] = []
+    for i in sorted(range(len(targets)), key=targets.__getitem__):
+        if not groups or targets[i] - targets[groups[-1][0]] > max_span.total_seconds():
+            groups.append([])
+        groups[-1].append(i)
+
+    def frames(start: float, end: float) -> List[float]:
+        params = getJPXInputParameters(
+            startTime=_from_timestamp(start),
+            endTime=_from_timestamp(end),
+            sourceId=sourceId,
+            verbose=True,
+            jpip=True,
+        )
+        res = execute_api_call(params, client=client)
+        if res.get("error"):
+            raise RuntimeError(res["error"])
+        found = sorted(res.get("frames") or [])
+        if len(found) >= JPX_MAX_FRAMES and end - start > 1:
+            # The images were sampled, ask for each half.
+            middle = (start + end) / 2
+            return sorted(set(frames(start, middle)) | set(frames(middle, end)))
+        return found
+
+    def resolve(group: List[int]) -> Dict[int, Optional[float]]:
+        start = targets[group[0]] - margin.total_seconds()
+        end = targets[group[-1]] + margin.total_seconds()
+        found = frames(start, end)
+        if not found:
+            return dict.fromkeys(group)
+        nearest = _nearest(found, [targets[i] for i in group])
+        # A closer image may lie beyond the edge of the range.
+        return {
+            i: frame if abs(frame - targets[i]) <= min(targets[i] - start, end - targets[i]) else None
+            for i, frame in zip(group, nearest)
+        }
+
+    def closest_image(i: int) -> float:
+        res = execute_api_call(getClosestImageInputParameters(date=dates[i], sourceId=sourceId), client=client)
+        if res.get("error"):
+            raise RuntimeError(res["error"])
+        return _to_timestamp(res["date"])
+
+    resolved: Dict[int, Optional[float]] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for result in executor.map(resolve, groups):
+            resolved.update(result)
+        unresolved = [i for i, frame in resolved.items() if frame is None]
+        resolved.update(zip(unresolved, executor.map(closest_image, unresolved)))
+    return [_from_timestamp(resolved[i]) for i in range(len(targets))]
+
+
+def tile_grid(
+    imageScale: float, viewport: Tuple[float, float, float, float] = DEFAULT_VIEWPORT
+) -> List[Tuple[int, int]]:
+    """
+    Returns the coordinates of the tiles covering a viewport.
+
+    Tile ``(x, y)`` covers the square of ``TILE_SIZE * imageScale`` arcseconds
+    whose top-left corner is ``x`` tiles right and ``y`` tiles down from the
+    center of the image, as in the Helioviewer.org viewport.
+
+    Parameters
+    ----------
+    imageScale
+        Image scale in arcseconds per pixel.
+    viewport
+        The ``(left, top, right, bottom)`` edges of the viewport in arcseconds
+        from the center of the image, with ``y`` growing downwards.
+        Default is `DEFAULT_VIEWPORT`.
+
+    Returns
+    -------
+    `list`
+        The ``(x, y)`` coordinates of the tiles, row by row.
+
+    Examples
+    --------
+    >>> from hvpy.batch import tile_grid
+    >>> tile_grid(imageScale=2, viewport=(-1000, -500, 1000, 500))
+    [(-1, -1), (0, -1), (-1, 0), (0, 0)]
+    """
+    left, top, right, bottom = viewport
+    if right <= left or bottom <= top:
+        raise ValueError(f"Empty viewport {viewport}")
+    size = TILE_SIZE * imageScale
+    xs = range(math.floor(left / size), math.ceil(right / size))
+    ys = range(math.floor(top / size), math.ceil(bottom / size))
+    return [(x, y) for y in ys for x in xs]
+
+
+def getTiles(
+    id: int,
+    imageScale: float,
+    viewport: Tuple[float, float, float, float] = DEFAULT_VIEWPORT,
+    difference: Optional[int] = None,
+    diffCount: Optional[int] = None,
+    diffTime: Optional[int] = None,
+    baseDiffTime: Optional[datetime] = None,
+    stitch: bool = False,
+    concurrency: int = 8,
+    client: Optional[Client] = None,
+) -> Union[Dict[Tuple[int, int], bytes], "PIL.Image.Image"]:  # noqa: F821
+    """
+    Fetches every tile of an image covering a viewport.
+
+    The tiles are computed with `tile_grid` and requested concurrently.
+    Requests go through `hvpy.core.execute_api_call`, so tiles already in the
+    cache or the disk store are not requested again.
+
+    Parameters
+    ----------
+    id
+        Unique image identifier.
+    imageScale
+        Image scale in arcseconds per pixel.
+    viewport
+        The ``(left, top, right, bottom)`` edges of the viewport in arcseconds
+        from the center of the image, with ``y`` growing downwards.
+        Default is `DEFAULT_VIEWPORT`.
+    difference
+        Specify image type difference, see `hvpy.getTile`.
+        Default is `None`, optional.
+    diffCount
+        Used to display Running difference image, see `hvpy.getTile`.
+        Default is `None`, optional.
+    diffTime
+        Select Running difference time period, see `hvpy.getTile`.
+        Default is `None`, optional.
+    baseDiffTime
+        Datetime for base difference images.
+        Default is `None`, optional.
+    stitch
+        Assemble the tiles into a single image cropped to the viewport, see `stitchTiles`.
+        Default is `False`.
+    concurrency
+        Maximum number of requests in flight.
+        Default is 8.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Returns
+    -------
+    `dict` or `PIL.Image.Image`
+        The PNG tiles keyed by their ``(x, y)`` coordinates, row by row, or
+        the stitched image.
+
+    Examples
+    --------
+    >>> from hvpy.batch import getTiles
+    >>> tiles = getTiles(id=36275490, imageScale=8, viewport=(-2048, -2048, 2048, 2048))
+    >>> sorted(tiles)
+    [(-1, -1), (-1, 0), (0, -1), (0, 0)]
+    """
+    grid = tile_grid(imageScale, viewport)
+    # Validate the parameters once, then only the tile coordinates change.
+    template = getTileInputParameters(
+        id=id,
+        x=0,
+        y=0,
+        imageScale=imageScale,
+        difference=difference,
+        diffCount=diffCount,
+        diffTime=diffTime,
+        baseDiffTime=baseDiffTime,
+    ).model_dump()
+
+    def fetch(xy: Tuple[int, int]) -> bytes:
+        params = getTileInputParameters._trusted(**{**template, "x": xy[0], "y": xy[1]})
+        return execute_api_call(params, client=client)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tiles = dict(zip(grid, executor.map(fetch, grid)))
+    if stitch:
+        return stitchTiles(tiles, imageScale, viewport)
+    return tiles
+
+
+def stitchTiles(
+    tiles: Dict[Tuple[int, int], bytes],
+    imageScale: Optional[float] = None,
+    viewport: Optional[Tuple[float, float, float, float]] = None,
+) -> "PIL.Image.Image":  # noqa: F821
+    """
+    Assembles tiles into a single image.
+
+    This requires `Pillow <https://pillow.readthedocs.io>`__.
+
+    Parameters
+    ----------
+    tiles
+        The PNG tiles keyed by their ``(x, y)`` coordinates, as returned by `getTiles`.
+    imageScale
+        Image scale of the tiles in arcseconds per pixel, needed to crop the image.
+        Default is `None`, optional.
+    viewport
+        The ``(left, top, right, bottom)`` edges of the viewport to crop the
+        image to, in arcseconds from the center of the image.
+        Default is `None` (no cropping), optional.
+
+    Returns
+    -------
+    `PIL.Image.Image`
+        The stitched RGBA image.
+    """
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError("Stitching tiles requires Pillow, install it with: pip install hvpy[image]") from e
+    if not tiles:
+        raise ValueError("No tiles to stitch")
+    left = min(x for x, _ in tiles)
+    top = min(y for _, y in tiles)
+    columns = max(x for x, _ in tiles) - left + 1
+    rows = max(y for _, y in tiles) - top + 1
+    mosaic = Image.new("RGBA", (columns * TILE_SIZE, rows * TILE_SIZE))
+    for (x, y), data in tiles.items():
+        with Image.open(io.BytesIO(data)) as tile:
+            mosaic.paste(tile.convert("RGBA"), ((x - left) * TILE_SIZE, (y - top) * TILE_SIZE))
+    if viewport is not None and imageScale is not None:
+        box = [
+            round(viewport[0] / imageScale) - left * TILE_SIZE,
+            round(viewport[1] / imageScale) - top * TILE_SIZE,
+            round(viewport[2] / imageScale) - left * TILE_SIZE,
+            round(viewport[3] / imageScale) - top * TILE_SIZE,
+        ]
+        mosaic = mosaic.crop(box)
+    return mosaic
+
+
+class _Movie:
+    """
+    State of a movie handled by a `MovieBatch`.
+    """
+
+    def __init__(self, params: queueMovieInputParameters, filename: Optional[Union[str, Path]], hq: bool):
+        self.params = params
+        self.filename = filename
+        self.hq = hq
+        self.future: "Future[Path]" = Future()
+        self.id: Optional[str] = None
+        self.token: Optional[str] = None
+        self.status: Dict[str, Any] = {}
+        self.polls = 0
+        self.queued_at = 0.0
+        self.next_poll = 0.0
+        self.deadline = 0.0
+
+
+class MovieBatch:
+    """
+    Creates many movies concurrently.
+
+    Every movie added is queued right away, then a single scheduler thread
+    polls `hvpy.getMovieStatus` for all the outstanding ones, as often as
+    the polling strategy decides, and finished movies are downloaded
+    concurrently.
+
+    Parameters
+    ----------
+    directory
+        Directory to save the movies to.
+        Default is the current directory.
+    max_workers
+        Maximum number of movies queued or downloaded at once.
+        Default is 4.
+    polling
+        Decides how long to wait between two checks on a movie.
+        Default is `None` (``ExponentialPolling(initial=3, maximum=30)``), optional.
+    timeout
+        The timeout in minutes to wait for each movie to be created.
+        Default is 5 minutes.
+    overwrite
+        Whether to overwrite files that already exist.
+        Default is `False`.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Examples
+    --------
+    >>> from datetime import datetime, timedelta
+    >>> from hvpy import DataSource, create_events, create_layers
+    >>> from hvpy.batch import MovieBatch
+    >>> with MovieBatch(directory=".") as batch:  # doctest: +SKIP
+    ...     movies = [
+    ...         batch.add(
+    ...             startTime=datetime(2022, 1, day),
+    ...             endTime=datetime(2022, 1, day, 0, 10),
+    ...             layers=create_layers([(DataSource.AIA_171, 100)]),
+    ...             events=create_events(["AR"]),
+    ...             eventsLabels=False,
+    ...             imageScale=2,
+    ...         )
+    ...         for day in range(1, 8)
+    ...     ]
+    >>> [movie.result() for movie in movies]  # doctest: +SKIP
+    [PosixPath('...'), ...]
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = ".",
+        max_workers: int = 4,
+        polling: Optional[PollingStrategy] = None,
+        timeout: float = 5,
+        overwrite: bool = False,
+        client: Optional[Client] = None,
+    ):
+        self.directory = Path(directory)
+        self.polling = polling or ExponentialPolling(initial=3, maximum=30)
+        self.timeout = timeout
+        self.overwrite = overwrite
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._movies: List[_Movie] = []
+        self._polling: List[_Movie] = []
+        self._condition = threading.Condition()
+        self._scheduler: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(
+        self,
+        filename: Optional[Union[str, Path]] = None,
+        hq: bool = False,
+        **kwargs,
+    ) -> "Future[Path]":
+        """
+        Queues a movie.
+
+        Parameters
+        ----------
+        filename
+            The name to save the movie under, inside ``directory``.
+            Default is `None` (the title of the movie), optional.
+        hq
+            Download a higher-quality movie file (valid for "mp4" movies only, ignored otherwise).
+            Default is `False`, optional.
+        **kwargs
+            The parameters of `hvpy.queueMovie`.
+
+        Returns
+        -------
+        `concurrent.futures.Future`
+            Resolves to the path of the saved movie.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot add movies to a closed MovieBatch.")
+        movie = _Movie(queueMovieInputParameters(**kwargs), filename, hq)
+        self._movies.append(movie)
+        self._executor.submit(self._queue, movie)
+        return movie.future
+
+    def _queue(self, movie: _Movie) -> None:
+        try:
+            res = execute_api_call(movie.params, client=self.client)
+            if res.get("error"):
+                raise RuntimeError(res["error"])
+        except BaseException as e:
+            movie.future.set_exception(e)
+            return
+        movie.id, movie.token, movie.status = res["id"], res.get("token"), res
+        movie.queued_at = time.monotonic()
+        movie.next_poll = movie.queued_at + self.polling.delay(res, 0, 0)
+        movie.deadline = movie.queued_at + 60 * self.timeout
+        with self._condition:
+            self._polling.append(movie)
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self._schedule, name="hvpy-movie-batch", daemon=True)
+                self._scheduler.start()
+            self._condition.notify()
+
+    def _schedule(self) -> None:
+        while True:
+            with self._condition:
+                while not self._polling:
+                    if self._closed and all(movie.future.done() for movie in self._movies):
+                        return
+                    self._condition.wait(1)
+                now = time.monotonic()
+                due = [movie for movie in self._polling if movie.next_poll <= now]
+                if not due:
+                    self._condition.wait(min(movie.next_poll for movie in self._polling) - now)
+                    continue
+            for movie in due:
+                self._poll(movie)
+
+    def _poll(self, movie: _Movie) -> None:
+        params = getMovieStatusInputParameters._trusted(
+            id=movie.id,
+            format=movie.params.format,
+            verbose=self.polling.verbose,
+            token=movie.token,
+        )
+        try:
+            status = execute_api_call(params, client=self.client)
+            if status.get("error") and status.get("status") != 3:
+                raise RuntimeError(status["error"])
+            movie.status = status
+            movie.polls += 1
+            if status["status"] == 2:
+                self._finish(movie)
+                self._executor.submit(self._download, movie, status.get("title", movie.id))
+            elif status["status"] == 3:
+                self._finish(movie, exception=RuntimeError(status.get("error", "Movie creation failed.")))
+            elif time.monotonic() > movie.deadline:
+                self._finish(movie, exception=RuntimeError(f"Exceeded timeout of {self.timeout} minutes."))
+            else:
+                now = time.monotonic()
+                delay = self.polling.delay(status, movie.polls, now - movie.queued_at)
+                movie.next_poll = min(now + delay, movie.deadline)
+        except BaseException as e:
+            # Whatever goes wrong fails this movie only, the others keep being polled.
+            if movie in self._polling:
+                self._finish(movie, exception=e)
+            elif not movie.future.done():
+                movie.future.set_exception(e)
+
+    def _finish(self, movie: _Movie, exception: Optional[BaseException] = None) -> None:
+        """
+        Stops polling a movie, failing it with ``exception`` if given.
+        """
+        with self._condition:
+            self._polling.remove(movie)
+            self._condition.notify()
+        if exception is not None:
+            movie.future.set_exception(exception)
+
+    def _download(self, movie: _Movie, title: str) -> None:
+        name = movie.filename if movie.filename is not None else title
+        try:
+            path = download_api_call(
+                downloadMovieInputParameters(id=movie.id, format=movie.params.format, hq=movie.hq),
+                sink=self.directory / f"{name}.{movie.params.format}",
+                overwrite=self.overwrite,
+                client=self.client,
+            )
+        except BaseException as e:
+            movie.future.set_exception(e)
+        else:
+            movie.future.set_result(path)
+        with self._condition:
+            self._condition.notify()
+
+    def wait(self) -> List[Path]:
+        """
+        Waits for every movie added so far.
+
+        Returns
+        -------
+        List[`~pathlib.Path`]
+            The paths of the saved movies, in the order they were added.
+
+        Raises
+        ------
+        Exception
+            The error of the first movie that failed.
+        """
+        return [movie.future.result() for movie in list(self._movies)]
+
+    def close(self) -> None:
+        """
+        Waits for every movie to be done, then releases the worker threads.
+
+        Failed movies do not raise here, check their futures.
+        """
+        self._closed = True
+        futures.wait([movie.future for movie in self._movies])
+        with self._condition:
+            self._condition.notify()
+        self._executor.shutdown()
+
+    def __enter__(self) -> "MovieBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Screenshot:
+    """
+    State of a screenshot handled by a `ScreenshotBatch`.
+    """
+
+    def __init__(self, params: takeScreenshotInputParameters, filename: Optional[Union[str, Path]]):
+        self.params = params
+        self.filename = filename
+        self.future: "Future[Path]" = Future()
+
+
+class ScreenshotBatch:
+    """
+    Creates many screenshots concurrently.
+
+    Every screenshot goes through two stages: `hvpy.takeScreenshot` renders
+    it on the server, then `hvpy.downloadScreenshot` streams it to disk.
+    Each stage has its own pool of workers, so screenshots are downloaded as
+    soon as they are rendered while the next ones are being rendered.
+
+    Parameters
+    ----------
+    directory
+        Directory to save the screenshots to.
+        Default is the current directory.
+    max_workers
+        Maximum number of screenshots rendered at once.
+        Default is 8.
+    download_workers
+        Maximum number of screenshots downloaded at once.
+        Default is `None` (``max_workers``), optional.
+    overwrite
+        Whether to overwrite files that already exist.
+        Default is `False`.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Examples
+    --------
+    >>> from concurrent.futures import as_completed
+    >>> from datetime import datetime
+    >>> from hvpy import DataSource, create_layers
+    >>> from hvpy.batch import ScreenshotBatch
+    >>> with ScreenshotBatch(directory=".") as batch:  # doctest: +SKIP
+    ...     screenshots = [
+    ...         batch.add(
+    ...             date=datetime(2022, 1, day),
+    ...             layers=create_layers([(DataSource.AIA_171, 100)]),
+    ...             imageScale=2.4,
+    ...             viewport=(-1200, -1200, 1200, 1200),
+    ...         )
+    ...         for day in range(1, 8)
+    ...     ]
+    ...     for screenshot in as_completed(screenshots):
+    ...         print(screenshot.result())
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = ".",
+        max_workers: int = 8,
+        download_workers: Optional[int] = None,
+        overwrite: bool = False,
+        client: Optional[Client] = None,
+    ):
+        self.directory = Path(directory)
+        self.overwrite = overwrite
+        self.client = client
+        self._takers = ThreadPoolExecutor(max_workers=max_workers)
+        self._downloaders = ThreadPoolExecutor(max_workers=download_workers or max_workers)
+        self._screenshots: List[_Screenshot] = []
+        self._closed = False
+
+    def add(
+        self,
+        filename: Optional[Union[str, Path]] = None,
+        viewport: Optional[Tuple[float, float, float, float]] = None,
+        **kwargs,
+    ) -> "Future[Path]":
+        """
+        Adds a screenshot.
+
+        Parameters
+        ----------
+        filename
+            The name to save the screenshot under, inside ``directory``.
+            Default is `None` (``f"{id}_{date.date()}"``), optional.
+        viewport
+            The ``(left, top, right, bottom)`` edges of the field of view in
+            arcseconds from the center of the Sun, with ``y`` growing
+            downwards, instead of ``x1``, ``y1``, ``x2`` and ``y2``.
+            Default is `None`, optional.
+        **kwargs
+            The parameters of `hvpy.takeScreenshot`.
+
+        Returns
+        -------
+        `concurrent.futures.Future`
+            Resolves to the path of the saved screenshot.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot add screenshots to a closed ScreenshotBatch.")
+        if viewport is not None:
+            kwargs.update(zip(("x1", "y1", "x2", "y2"), viewport))
+        kwargs.pop("display", None)
+        screenshot = _Screenshot(takeScreenshotInputParameters(**kwargs), filename)
+        self._screenshots.append(screenshot)
+        self._takers.submit(self._take, screenshot)
+        return screenshot.future
+
+    def _take(self, screenshot: _Screenshot) -> None:
+        try:
+            res = execute_api_call(screenshot.params, client=self.client)
+            if res.get("error"):
+                raise RuntimeError(res["error"])
+        except BaseException as e:
+            screenshot.future.set_exception(e)
+            return
+        self._downloaders.submit(self._download, screenshot, res["id"])
+
+    def _download(self, screenshot: _Screenshot, id: int) -> None:
+        if screenshot.filename is not None:
+            name = screenshot.filename
+        else:
+            name = f"{id}_{screenshot.params.date[:10]}"
+        try:
+            path = download_api_call(
+                downloadScreenshotInputParameters(id=id),
+                sink=self.directory / f"{name}.png",
+                overwrite=self.overwrite,
+                client=self.client,
+            )
+        except BaseException as e:
+            screenshot.future.set_exception(e)
+        else:
+            screenshot.future.set_result(path)
+
+    def wait(self) -> List[Path]:
+        """
+        Waits for every screenshot added so far.
+
+        Returns
+        -------
+        List[`~pathlib.Path`]
+            The paths of the saved screenshots, in the order they were added.
+
+        Raises
+        ------
+        Exception
+            The error of the first screenshot that failed.
+        """
+        return [screenshot.future.result() for screenshot in list(self._screenshots)]
+
+    def close(self) -> None:
+        """
+        Waits for every screenshot to be done, then releases the worker
+        threads.
+
+        Failed screenshots do not raise here, check their futures.
+        """
+        self._closed = True
+        futures.wait([screenshot.future for screenshot in self._screenshots])
+        self._takers.shutdown()
+        self._downloaders.shutdown()
+
+    def __enter__(self) -> "ScreenshotBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def screenshot_grid(
+    dates: Sequence[datetime],
+    layers: Union[str, Sequence[str]],
+    events: Union[None, str, Sequence[Optional[str]]] = None,
+    viewports: Union[None, Tuple[float, float, float, float], Sequence[Tuple[float, float, float, float]]] = None,
+    **kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Returns the parameters of a screenshot for every combination of dates,
+    layers, events and viewports.
+
+    Parameters
+    ----------
+    dates
+        Datetimes of the screenshots.
+    layers
+        One or more layer strings, see `hvpy.create_layers`.
+    events
+        One or more event strings, see `hvpy.create_events`.
+        Default is `None` (no events), optional.
+    viewports
+        One or more ``(left, top, right, bottom)`` fields of view, see
+        `ScreenshotBatch.add`.
+        Default is `None` (the default field of view), optional.
+    **kwargs
+        Parameters of `hvpy.takeScreenshot` shared by every screenshot, like ``imageScale``.
+
+    Returns
+    -------
+    `list`
+        The parameters of every screenshot, for `ScreenshotBatch.add` or
+        `createScreenshots`, with dates varying fastest.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy.batch import screenshot_grid
+    >>> grid = screenshot_grid(
+    ...     [datetime(2022, 1, 1), datetime(2022, 1, 2)],
+    ...     layers=["[10,1,100]", "[11,1,100]"],
+    ...     imageScale=2.4,
+    ... )
+    >>> [(spec["date"].day, spec["layers"]) for spec in grid]
+    [(1, '[10,1,100]'), (2, '[10,1,100]'), (1, '[11,1,100]'), (2, '[11,1,100]')]
+    """
+    if isinstance(layers, str):
+        layers = [layers]
+    if events is None or isinstance(events, str):
+        events = [events]
+    if viewports is None or (len(viewports) == 4 and not isinstance(viewports[0], (tuple, list))):
+        viewports = [viewports]
+    return [
+        {**kwargs, "date": date, "layers": layer, "events": event, "viewport": viewport}
+        for layer in layers
+        for event in events
+        for viewport in viewports
+        for date in dates
+    ]
+
+
+def createScreenshots(
+    specs: Sequence[Dict[str, Any]],
+    directory: Union[str, Path] = ".",
+    max_workers: int = 8,
+    download_workers: Optional[int] = None,
+    overwrite: bool = False,
+    client: Optional[Client] = None,
+) -> Iterator[Tuple[Dict[str, Any], Path]]:
+    """
+    Creates many screenshots concurrently with a `ScreenshotBatch`, yielding
+    each one as soon as it is saved.
+
+    Parameters
+    ----------
+    specs
+        The parameters of every screenshot, see `ScreenshotBatch.add` and `screenshot_grid`.
+    directory
+        Directory to save the screenshots to.
+        Default is the current directory.
+    max_workers
+        Maximum number of screenshots rendered at once.
+        Default is 8.
+    download_workers
+        Maximum number of screenshots downloaded at once.
+        Default is `None` (``max_workers``), optional.
+    overwrite
+        Whether to overwrite files that already exist.
+        Default is `False`.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Yields
+    ------
+    `tuple`
+        The parameters of a screenshot and the path it was saved to, in the
+        order they complete.
+
+    Raises
+    ------
+    Exception
+        The error of the first screenshot that failed, once the others are done.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy.batch import createScreenshots, screenshot_grid
+    >>> grid = screenshot_grid(
+    ...     [datetime(2022, 1, day) for day in range(1, 32)],
+    ...     layers=["[10,1,100]", "[11,1,100]"],
+    ...     imageScale=2.4,
+    ... )
+    >>> for spec, path in createScreenshots(grid, directory="."):  # doctest: +SKIP
+    ...     print(spec["date"], spec["layers"], path)
+    """
+    with ScreenshotBatch(directory, max_workers, download_workers, overwrite, client) as batch:
+        pending = {batch.add(**spec): spec for spec in specs}
+        for future in futures.as_completed(pending):
+            yield pending[future], future.result()
@@ -0,0 +1,236 @@
+import abc
+import sys
+import copy
+import time
+import threading
+import contextlib
+from typing import Any, Dict, Tuple, Iterator, Optional
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from hvpy.io import HvpyParameters
+
+__all__ = [
+    "DEFAULT_TTLS",
+    "Cache",
+    "LRUCache",
+    "caching",
+    "get_cache",
+    "set_cache",
+]
+
+DEFAULT_TTLS: Dict[str, Optional[float]] = {
+    "getJP2Header": None,
+    "getTile": None,
+    "getClosestImage": 300,
+    "getDataSources": 3600,
+    "getStatus": 5,
+}
+"""
+Seconds responses of each endpoint are kept for, `None` means forever.
+
+Endpoints that are not listed are never cached.
+"""
+
+MISSING = object()
+"""
+Returned by `Cache.get` when there is no usable entry.
+"""
+
+
+def cache_key(input_parameters: HvpyParameters) -> str:
+    """
+    Returns the key identifying a request, made of the endpoint URL and its
+    canonical parameters.
+    """
+    params = sorted(input_parameters.model_dump(exclude_none=True).items())
+    return input_parameters.url + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+class Cache(abc.ABC):
+    """
+    Base class for response caches.
+
+    Subclasses implement the storage by overriding ``_get``, ``_set`` and
+    ``clear``, guarding it with ``_lock`` if needed.
+
+    Parameters
+    ----------
+    ttls
+        Seconds responses of each endpoint are kept for, `None` meaning forever.
+        Endpoints that are not listed are never cached.
+        Default is `DEFAULT_TTLS`.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, Optional[float]]] = None):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def caches(self, input_parameters: HvpyParameters) -> bool:
+        """
+        Whether responses for these parameters are cached.
+        """
+        return input_parameters.endpoint in self.ttls
+
+    def get(self, input_parameters: HvpyParameters) -> Any:
+        """
+        Returns the cached response for these parameters, or ``MISSING``.
+        """
+        value = self._get(cache_key(input_parameters))
+        with self._lock:
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return MISSING if value is MISSING else copy.deepcopy(value)
+
+    def set(self, input_parameters: HvpyParameters, value: Any) -> None:
+        """
+        Stores the response for these parameters.
+        """
+        ttl = self.ttls[input_parameters.endpoint]
+        expires = None if ttl is None else time.monotonic() + ttl
+        self._set(cache_key(input_parameters), copy.deepcopy(value), expires)
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Any:
+        """
+        Returns the value stored under ``key``, or ``MISSING``.
+        """
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: Any, expires: Optional[float]) -> None:
+        """
+        Stores ``value`` under ``key`` until the monotonic time ``expires``.
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache(Cache):
+    """
+    In-memory cache evicting the least recently used responses.
+
+    Parameters
+    ----------
+    maxsize
+        Maximum number of responses kept.
+        Default is 1024.
+    max_bytes
+        Maximum total size of the responses kept, in bytes.
+        Default is `None` (no limit), optional.
+    ttls
+        Seconds responses of each endpoint are kept for, see `Cache`.
+        Default is `DEFAULT_TTLS`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        super().__init__(ttls)
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires, size = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                self.nbytes -= size
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any, expires: Optional[float]) -> None:
+        size = _sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (value, expires, size)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+_cache: Optional[Cache] = None
+_override: ContextVar = ContextVar("hvpy_cache", default=MISSING)
+
+
+def get_cache() -> Optional[Cache]:
+    """
+    Returns the cache API calls currently use, `None` if caching is off.
+    """
+    override = _override.get()
+    return _cache if override is MISSING else override
+
+
+def set_cache(cache: Optional[Cache]) -> None:
+    """
+    Sets the cache used by every API call.
+
+    Caching is off by default.
+
+    Parameters
+    ----------
+    cache : `hvpy.cache.Cache`
+        The cache to use, `None` to turn caching off.
+    """
+    global _cache
+    _cache = cache
+
+
+@contextlib.contextmanager
+def caching(cache: Optional[Cache]) -> Iterator[Optional[Cache]]:
+    """
+    Overrides the cache for the API calls made inside the ``with`` block.
+
+    Parameters
+    ----------
+    cache : `hvpy.cache.Cache`
+        The cache to use, `None` to bypass caching.
+
+    Examples
+    --------
+    >>> from hvpy.cache import LRUCache, caching, set_cache
+    >>> set_cache(LRUCache())
+    >>> with caching(None):
+    ...     pass  # API calls made here are never served from the cache
+    >>> set_cache(None)
+    """
+    token = _override.set(cache)
+    try:
+        yield cache
+    finally:
+        _override.reset(token)
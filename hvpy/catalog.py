@@ -0,0 +1,287 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple, Union, Iterable, Optional
+from pathlib import Path
+from datetime import datetime
+
+from hvpy.datasource import DataSource
+from hvpy.io import HvpyParameters
+from hvpy.utils import _data_source_to_int, _from_timestamp, _to_timestamp
+
+__all__ = ["ImageCatalog", "get_catalog", "set_catalog"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    sourceId INTEGER NOT NULL,
+    date REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_by_date ON images (sourceId, date);
+CREATE TABLE IF NOT EXISTS coverage (
+    sourceId INTEGER NOT NULL,
+    start REAL NOT NULL,
+    stop REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_by_start ON coverage (sourceId, start);
+"""
+
+
+class ImageCatalog:
+    """
+    Local SQLite catalog of images, answering ``getClosestImage`` without the
+    API where it can.
+
+    Every ``getClosestImage`` response is recorded along with what it
+    proves: if the image closest to ``date`` is ``d`` seconds away, the
+    datasource has no other image less than ``d`` seconds from ``date``.
+    These covered intervals are merged per datasource, and a later call is
+    answered locally when the interval around its date, up to the closest
+    image in the catalog, is covered. Other calls go to the API and extend
+    the catalog.
+
+    Images published after they were recorded as missing, like those of a
+    feed that lags behind, are not picked up until the catalog is cleared.
+
+    Parameters
+    ----------
+    path
+        The SQLite database file, created if needed.
+        Default is ``":memory:"`` (a catalog lost on exit).
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy import DataSource, getClosestImage
+    >>> from hvpy.catalog import ImageCatalog, set_catalog
+    >>> set_catalog(ImageCatalog("~/.hvpy/catalog.sqlite"))  # doctest: +SKIP
+    >>> getClosestImage(date=datetime(2022, 1, 1), sourceId=DataSource.AIA_171)  # doctest: +SKIP
+    {...}
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        if str(path) != ":memory:":
+            path = Path(path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def catalogs(self, input_parameters: HvpyParameters) -> bool:
+        """
+        Whether calls with these parameters are answered by the catalog.
+        """
+        return input_parameters.endpoint == "getClosestImage" and input_parameters.callback is None
+
+    def get(self, input_parameters: HvpyParameters) -> Optional[Dict[str, Any]]:
+        """
+        Returns the response to a ``getClosestImage`` call, or `None` if the
+        catalog cannot answer it.
+        """
+        image = self.closest(input_parameters.date, input_parameters.sourceId)
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    def put(self, input_parameters: HvpyParameters, response: Dict[str, Any]) -> None:
+        """
+        Records the response to a ``getClosestImage`` call.
+        """
+        if not isinstance(response, dict) or response.get("error") or not {"id", "date"} <= response.keys():
+            return
+        date = _to_timestamp(input_parameters.date)
+        distance = abs(_to_timestamp(response["date"]) - date)
+        self._add(input_parameters.sourceId, [response], (date - distance, date + distance))
+
+    def add(
+        self,
+        sourceId: Union[int, DataSource],
+        images: Iterable[Dict[str, Any]],
+        coverage: Optional[Tuple[datetime, datetime]] = None,
+    ) -> None:
+        """
+        Records images of a datasource.
+
+        Parameters
+        ----------
+        sourceId
+            Unique image datasource identifier.
+        images
+            The images, as returned by ``getClosestImage``, with at least
+            their ``"id"`` and ``"date"``.
+        coverage
+            A ``(start, end)`` interval in which ``images`` are all the
+            images of the datasource.
+            Default is `None` (no interval is covered), optional.
+        """
+        interval = None if coverage is None else (_to_timestamp(coverage[0]), _to_timestamp(coverage[1]))
+        self._add(_data_source_to_int(sourceId), images, interval)
+
+    def _add(self, sourceId: int, images: Iterable[Dict[str, Any]], interval: Optional[Tuple[float, float]]) -> None:
+        rows = [
+            (
+                int(image["id"]),
+                sourceId,
+                _to_timestamp(image["date"]),
+                image.get("width"),
+                image.get("height"),
+                json.dumps(image),
+            )
+            for image in images
+        ]
+        bounds = [row[2] for row in rows] + list(interval or ())
+        if not bounds:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._merge(sourceId, min(bounds), max(bounds), interval)
+
+    def _merge(self, sourceId: int, low: float, high: float, interval: Optional[Tuple[float, float]]) -> None:
+        """
+        Adds an interval to the coverage of a datasource, merging the intervals
+        between ``low`` and ``high`` that overlap.
+
+        Intervals are open, as the image closest to a date may be tied
+        with one just as far on the other side. Intervals that only
+        touch are merged where the catalog holds an image at that very
+        date.
+        """
+        found = self._connection.execute(
+            "SELECT rowid, start, stop FROM coverage WHERE sourceId = ? AND start <= ? AND stop >= ?",
+            (sourceId, high, low),
+        ).fetchall()
+        intervals = sorted([(start, stop) for _, start, stop in found])
+        if interval is not None and interval[0] < interval[1]:
+            intervals = sorted(intervals + [interval])
+        merged: List[List[float]] = []
+        for start, stop in intervals:
+            if merged and (start < merged[-1][1] or (start == merged[-1][1] and self._known(sourceId, start))):
+                merged[-1][1] = max(merged[-1][1], stop)
+            else:
+                merged.append([start, stop])
+        if len(merged) == len(found) and interval is None:
+            return
+        self._connection.executemany("DELETE FROM coverage WHERE rowid = ?", [(rowid,) for rowid, _, _ in found])
+        self._connection.executemany(
+            "INSERT INTO coverage VALUES (?, ?, ?)", [(sourceId, start, stop) for start, stop in merged]
+        )
+
+    def _known(self, sourceId: int, date: float) -> bool:
+        """
+        Whether the catalog holds an image of a datasource at that very date.
+        """
+        query = "SELECT 1 FROM images WHERE sourceId = ? AND date = ?"
+        return self._connection.execute(query, (sourceId, date)).fetchone() is not None
+
+    def closest(self, date: Union[datetime, str], sourceId: Union[int, DataSource]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the image of a datasource closest to a date, if the catalog
+        knows it.
+
+        Parameters
+        ----------
+        date
+            Datetime of the image, naive ones being in UTC.
+        sourceId
+            Unique image datasource identifier.
+
+        Returns
+        -------
+        Optional[`dict`]
+            The image as returned by ``getClosestImage``, `None` if the
+            catalog does not cover the date.
+        """
+        target, sourceId = _to_timestamp(date), _data_source_to_int(sourceId)
+        with self._lock:
+            before = self._connection.execute(
+                "SELECT date, response FROM images WHERE sourceId = ? AND date <= ? ORDER BY date DESC LIMIT 1",
+                (sourceId, target),
+            ).fetchone()
+            after = self._connection.execute(
+                "SELECT date, response FROM images WHERE sourceId = ? AND date >= ? ORDER BY date LIMIT 1",
+                (sourceId, target),
+            ).fetchone()
+            candidates = [row for row in (before, after) if row is not None]
+            if not candidates:
+                return None
+            found, response = min(candidates, key=lambda row: abs(row[0] - target))
+            distance = abs(found - target)
+            # No other image can be closer if the whole interval is covered.
+            if (
+                distance
+                and not self._connection.execute(
+                    "SELECT 1 FROM coverage WHERE sourceId = ? AND start <= ? AND stop >= ? LIMIT 1",
+                    (sourceId, target - distance, target + distance),
+                ).fetchone()
+            ):
+                return None
+        return json.loads(response)
+
+    def coverage(self, sourceId: Union[int, DataSource]) -> List[Tuple[datetime, datetime]]:
+        """
+        Returns the intervals in which the catalog holds every image of a
+        datasource, in chronological order.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT start, stop FROM coverage WHERE sourceId = ? ORDER BY start", (_data_source_to_int(sourceId),)
+            ).fetchall()
+        return [(_from_timestamp(start), _from_timestamp(stop)) for start, stop in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def clear(self) -> None:
+        """
+        Deletes every image and covered interval.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM images")
+            self._connection.execute("DELETE FROM coverage")
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        self._connection.close()
+
+    def __enter__(self) -> "ImageCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_catalog: Optional[ImageCatalog] = None
+
+
+def get_catalog() -> Optional[ImageCatalog]:
+    """
+    Returns the catalog API calls consult, `None` if there is none.
+    """
+    return _catalog
+
+
+def set_catalog(catalog: Optional[ImageCatalog]) -> None:
+    """
+    Sets the catalog consulted by ``getClosestImage``.
+
+    There is no catalog by default.
+
+    Parameters
+    ----------
+    catalog : `hvpy.catalog.ImageCatalog`
+        The catalog to use, `None` to stop using one.
+    """
+    global _catalog
+    _catalog = catalog
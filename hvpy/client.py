@@ -0,0 +1,163 @@
+import threading
+from typing import Any, Dict, Tuple, Union, Callable, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from hvpy.metrics import CallEvent
+from hvpy.ratelimit import RateLimiter
+from hvpy.retry import RetryPolicy
+from hvpy.singleflight import SingleFlight
+
+__all__ = ["Client", "get_client", "set_client"]
+
+
+class Client:
+    """
+    Pooled HTTP client used for every call to the Helioviewer API.
+
+    Connections are kept alive and reused between calls, so only the first
+    request to a host pays for the TCP and TLS handshakes.
+
+    Parameters
+    ----------
+    pool_connections
+        Number of per-host connection pools to keep, unless ``session`` is given.
+        Default is 10.
+    pool_maxsize
+        Maximum number of connections kept alive for a single host, unless ``session`` is given.
+        Default is 10.
+    pool_block
+        Block when every connection of a host is busy instead of opening a throwaway one,
+        unless ``session`` is given.
+        Default is `False`.
+    keep_alive
+        Reuse connections between requests.
+        Default is `True`.
+    timeout
+        Timeout in seconds, either a single value or a ``(connect, read)`` tuple.
+        `None` waits forever.
+        Default is ``(10, None)``.
+    headers
+        Extra headers sent with every request.
+        Default is `None`, optional.
+    session
+        An existing `requests.Session` to use instead of creating a new one.
+        Its transport adapters are left as they are.
+        Default is `None`, optional.
+    retry
+        When to send failed requests again.
+        Default is `None` (a default `hvpy.retry.RetryPolicy`), optional.
+    rate_limiter
+        Limits the rate of requests sent to each endpoint.
+        Default is `None` (unlimited), optional.
+    coalesce
+        Share one request between identical API calls made concurrently,
+        except for the endpoints in `hvpy.retry.NON_IDEMPOTENT_ENDPOINTS`.
+        Default is `True`.
+    hooks
+        Called with a `hvpy.metrics.CallEvent` for everything that happens
+        during an API call, e.g. a `hvpy.metrics.MetricsCollector`.
+        Default is `None`, optional.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        timeout: Union[None, float, Tuple[Optional[float], Optional[float]]] = (10, None),
+        headers: Optional[Dict[str, str]] = None,
+        session: Optional[requests.Session] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalesce: bool = True,
+        hooks: Optional[Iterable[Callable[[CallEvent], Any]]] = None,
+    ):
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.hooks = list(hooks or ())
+        self.flights = SingleFlight() if coalesce else None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        if headers:
+            self.session.headers.update(headers)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the connection pool.
+
+        Parameters
+        ----------
+        url
+            The URL to request.
+        params
+            The query parameters.
+        **kwargs
+            Passed on to `requests.Session.get`.
+
+        Returns
+        -------
+        `requests.Response`
+            The response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, params=params, **kwargs)
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection.
+        """
+        self.session.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Client:
+    """
+    Returns the client used by default for every API call.
+
+    It is created on first use from the settings in `hvpy.config`.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from hvpy.config import LiveSettings
+
+                _client = Client(
+                    pool_connections=LiveSettings.pool_connections,
+                    pool_maxsize=LiveSettings.pool_maxsize,
+                    timeout=(LiveSettings.connect_timeout, LiveSettings.read_timeout),
+                )
+    return _client
+
+
+def set_client(client: Optional[Client]) -> None:
+    """
+    Sets the client used by default for every API call.
+
+    Parameters
+    ----------
+    client : `hvpy.client.Client`
+        The client to use, `None` to go back to a client built from the settings.
+    """
+    global _client
+    with _client_lock:
+        _client = client
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,6 +9,10 @@ __all__ = ["LiveSettings", "set_api_url", "get_api_url"]
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="HELIOVIEWER_")
     api_url: str = Field("https://api.helioviewer.org/v2/")
+    pool_connections: int = Field(10)
+    pool_maxsize: int = Field(10)
+    connect_timeout: Optional[float] = Field(10)
+    read_timeout: Optional[float] = Field(None)
 
 
 def get_api_url() -> str:
@@ -1,7 +1,12 @@
+import io
 import os
+import json
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 
 import pytest
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
 
 
 class SetEnv:
@@ -24,6 +29,51 @@ def env():
     setenv.clear()
 
 
+class FakeAPI(HTTPAdapter):
+    """
+    Transport adapter that answers API requests in-process.
+
+    Responses are registered per endpoint with `add`, every request sent
+    through the adapter is recorded in ``calls``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+        self.calls = []
+
+    def add(self, endpoint, body=b"", status=200, headers=None, json_body=None):
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        if callable(body):
+            self.routes[endpoint] = body
+        else:
+            self.routes[endpoint] = lambda request: (status, body, headers or {})
+
+    def send(self, request, **kwargs):
+        self.calls.append(request)
+        endpoint = urlsplit(request.url).path.rstrip("/").rsplit("/", 1)[-1]
+        status, body, headers = self.routes[endpoint](request)
+        headers = {"Content-Length": str(len(body)), **headers}
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, preload_content=False)
+        return self.build_response(request, raw)
+
+
+@pytest.fixture
+def fake_api():
+    from hvpy.client import Client, set_client
+    from hvpy.retry import RetryPolicy
+
+    api = FakeAPI()
+    client = Client(retry=RetryPolicy(backoff_factor=0))
+    client.session.mount("https://", api)
+    client.session.mount("http://", api)
+    set_client(client)
+    yield api
+    set_client(None)
+
+
 @pytest.fixture
 def date():
     return datetime.today() - timedelta(days=15)
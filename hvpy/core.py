@@ -1,10 +1,36 @@
-from typing import Any, Dict, Union
+import io
+import os
+import re
+import time
+import logging
+import functools
+from typing import Any, Dict, Tuple, Union, BinaryIO, Callable, Optional
+from pathlib import Path
 
 import requests
 
+from hvpy.availability import _clamp
+from hvpy.cache import MISSING, cache_key, get_cache
+from hvpy.catalog import get_catalog
+from hvpy.client import Client, get_client
 from hvpy.io import HvpyParameters, OutputType
+from hvpy.metrics import CallEvent
+from hvpy.retry import NON_IDEMPOTENT_ENDPOINTS
+from hvpy.store import get_store
+from hvpy.utils import _partial_filename, _prepare_filename
 
-__all__ = ["execute_api_call", "parse_response"]
+__all__ = ["download_api_call", "execute_api_call", "parse_response"]
+
+CHUNK_SIZE = 1024 * 1024
+"""
+Size in bytes of the chunks written to disk by `download_api_call`.
+"""
+MAX_RESUMES = 3
+"""
+Number of times a broken raw transfer is resumed before giving up.
+"""
+
+log = logging.getLogger(__name__)
 
 
 def parse_response(response: requests.Response, output_type: OutputType) -> Union[bytes, str, Dict[str, Any]]:
@@ -33,20 +59,397 @@ def parse_response(response: requests.Response, output_type: OutputType) -> Unio
         raise ValueError(f"Unknown output type: {output_type}")
 
 
-def execute_api_call(input_parameters: HvpyParameters) -> Union[bytes, str, Dict[str, Any]]:
+def _total_size(response: requests.Response) -> Optional[int]:
+    """
+    Works out the full size of the resource from a (partial) response.
+    """
+    content_range = response.headers.get("Content-Range")
+    if content_range:
+        match = re.search(r"/(\d+)$", content_range)
+        return int(match.group(1)) if match else None
+    length = response.headers.get("Content-Length")
+    return int(length) if length is not None else None
+
+
+def _emit(client: Any, kind: str, input_parameters: HvpyParameters, **fields: Any) -> None:
+    """
+    Passes an event to the hooks of the client.
+
+    Exceptions raised by hooks are logged and otherwise ignored.
+    """
+    event = CallEvent(kind, input_parameters.endpoint, **fields)
+    for hook in client.hooks:
+        # A broken hook must not fail the call it observes.
+        try:
+            hook(event)
+        except Exception:
+            log.exception("Hook %r failed on a %s event", hook, kind)
+
+
+def _get(client: Client, input_parameters: HvpyParameters, **kwargs) -> requests.Response:
+    """
+    Sends the request within the rate limits of the client, trying again after
+    transient failures as its retry policy allows.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if client.rate_limiter is not None:
+            client.rate_limiter.acquire(input_parameters.endpoint)
+        if client.hooks:
+            _emit(client, "request", input_parameters, attempt=attempt)
+        try:
+            response = client.get(input_parameters.url, params=input_parameters.model_dump(exclude_none=True), **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if not client.retry.should_retry(input_parameters, attempt):
+                raise
+            if client.hooks:
+                _emit(client, "retry", input_parameters, attempt=attempt, error=e)
+            client.retry.sleep(attempt)
+            continue
+        if response.status_code >= 400 and client.retry.should_retry(input_parameters, attempt, response.status_code):
+            response.close()
+            if client.hooks:
+                _emit(client, "retry", input_parameters, attempt=attempt, status=response.status_code)
+            client.retry.sleep(attempt, response.headers)
+            continue
+        return response
+
+
+def _validator(response: requests.Response) -> Optional[str]:
+    """
+    Returns the ETag or Last-Modified date of a response, which tells whether
+    the resource changed between two requests.
+
+    Weak ETags cannot be used in ``If-Range`` headers.
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _transfer(
+    client: Client,
+    input_parameters: HvpyParameters,
+    sink: BinaryIO,
+    offset: int = 0,
+    progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_resumes: int = MAX_RESUMES,
+    validator: Optional[str] = None,
+    on_validator: Optional[Callable[[str], Any]] = None,
+) -> int:
+    """
+    Streams the raw response into ``sink``, which already holds the first
+    ``offset`` bytes.
+
+    Broken transfers are resumed with HTTP Range requests, and the number of
+    bytes received is checked against the size announced by the server.
+    Ranges are only honoured for the resource identified by ``validator``,
+    otherwise ``sink`` is truncated back to where the transfer started and
+    the whole resource is written again. ``on_validator`` is called with
+    the validator of the resource when it is first known or changes.
+
+    Returns
+    -------
+    int
+        The number of bytes written, including ``offset``.
+    """
+    start = time.perf_counter()
+    initial = offset
+    status = None
+    try:
+        origin = sink.tell() - offset
+    except (AttributeError, OSError):
+        origin = None
+    try:
+        resumes = 0
+        while True:
+            # Compressed bodies would make byte offsets meaningless.
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if validator is not None:
+                    headers["If-Range"] = validator
+            total = None
+            response = None
+            try:
+                response = _get(client, input_parameters, headers=headers, stream=True)
+                status = response.status_code
+                with response:
+                    if response.status_code == 416 and _total_size(response) == offset:
+                        # We already have every byte.
+                        break
+                    response.raise_for_status()
+                    total = _total_size(response)
+                    if offset and response.status_code != 206:
+                        # The server ignored the range or the resource changed, start over.
+                        if origin is None:
+                            raise IOError("The download cannot be restarted as the sink is not seekable.")
+                        sink.seek(origin)
+                        sink.truncate()
+                        offset = 0
+                    current = _validator(response)
+                    if current is not None and current != validator:
+                        validator = current
+                        if on_validator is not None:
+                            on_validator(current)
+                    for chunk in response.iter_content(chunk_size):
+                        sink.write(chunk)
+                        offset += len(chunk)
+                        if progress is not None:
+                            progress(offset, total)
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+                # Only transfers that broke after the server answered are resumed.
+                if response is None or resumes >= max_resumes:
+                    raise
+                resumes += 1
+                continue
+            if total is None or offset == total:
+                break
+            if resumes >= max_resumes:
+                raise IOError(f"Incomplete download: received {offset} of {total} bytes.")
+            resumes += 1
+    except Exception as e:
+        if client.hooks:
+            _emit(client, "error", input_parameters, elapsed=time.perf_counter() - start, error=e)
+        raise
+    if client.hooks:
+        # Only the bytes received now, not those a resumed download already had.
+        elapsed = time.perf_counter() - start
+        _emit(client, "response", input_parameters, status=status, elapsed=elapsed, nbytes=max(offset - initial, 0))
+    return offset
+
+
+def execute_api_call(
+    input_parameters: HvpyParameters,
+    client: Optional[Client] = None,
+) -> Union[bytes, str, Dict[str, Any]]:
     """
     Executes the API call and returns a parsed response.
 
+    Responses are served from and stored in the cache returned by
+    `hvpy.cache.get_cache`, the catalog returned by
+    `hvpy.catalog.get_catalog` and the store returned by
+    `hvpy.store.get_store`, if any. Identical calls made concurrently
+    share one request, unless the client was created with
+    ``coalesce=False``. Transient failures are retried according to the
+    retry policy of the client. Calls for dates without images are clamped
+    or rejected by the availability index returned by
+    `hvpy.availability.get_availability`, if any.
+
     Parameters
     ----------
     input_parameters
         The input parameters.
+    client
+        The client to send the request with.
+        Default is `None` (the one returned by `hvpy.client.get_client`), optional.
 
     Returns
     -------
     Union[bytes, str, Dict[str, Any]]
         Parsed response from the API.
     """
-    response = requests.get(input_parameters.url, params=input_parameters.model_dump())
-    response.raise_for_status()
-    return parse_response(response, input_parameters.get_output_type())
+    client = client or get_client()
+    input_parameters = _clamp(input_parameters)
+    cache = get_cache()
+    if cache is None or not cache.caches(input_parameters):
+        return _coalesce(input_parameters, client, lambda: _call(input_parameters, client))
+    result = cache.get(input_parameters)
+    if client.hooks:
+        _emit(client, "cache_miss" if result is MISSING else "cache_hit", input_parameters, source="memory")
+    if result is not MISSING:
+        return result
+
+    def fetch() -> Union[bytes, str, Dict[str, Any]]:
+        result = _call(input_parameters, client)
+        cache.set(input_parameters, result)
+        return result
+
+    return _coalesce(input_parameters, client, fetch)
+
+
+def _coalesce(
+    input_parameters: HvpyParameters,
+    client: Client,
+    fetch: Callable[[], Union[bytes, str, Dict[str, Any]]],
+) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Calls ``fetch``, or waits for an identical call in flight.
+    """
+    if client.flights is None or input_parameters.endpoint in NON_IDEMPOTENT_ENDPOINTS:
+        return fetch()
+    if not client.hooks:
+        return client.flights.do((input_parameters.endpoint, cache_key(input_parameters)), fetch)
+    leader = False
+
+    def lead() -> Union[bytes, str, Dict[str, Any]]:
+        nonlocal leader
+        leader = True
+        return fetch()
+
+    try:
+        return client.flights.do((input_parameters.endpoint, cache_key(input_parameters)), lead)
+    finally:
+        if not leader:
+            _emit(client, "coalesced", input_parameters)
+
+
+def _call(input_parameters: HvpyParameters, client: Client) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Returns the parsed response, from the catalog or the disk store if
+    possible.
+    """
+    data, save = _lookup(input_parameters, client)
+    if data is not MISSING:
+        return data
+    data = _send(input_parameters, client)
+    if save is not None:
+        save(data)
+    return data
+
+
+def _lookup(input_parameters: HvpyParameters, client: Any) -> Tuple[Any, Optional[Callable[[Any], Any]]]:
+    """
+    Looks the response up in the catalog or the disk store, for the synchronous
+    and asynchronous cores alike.
+
+    Returns
+    -------
+    `tuple`
+        The parsed response, or ``MISSING``, and the function to record the
+        response with once it is fetched, `None` if it is not kept.
+    """
+    catalog = get_catalog()
+    if catalog is not None and catalog.catalogs(input_parameters):
+        data = catalog.get(input_parameters)
+        if client.hooks:
+            _emit(client, "cache_miss" if data is None else "cache_hit", input_parameters, source="catalog")
+        if data is None:
+            return MISSING, functools.partial(catalog.put, input_parameters)
+        return data, None
+    store = get_store()
+    if store is not None and store.path(input_parameters) is not None:
+        data = store.get(input_parameters)
+        if client.hooks:
+            _emit(client, "cache_miss" if data is None else "cache_hit", input_parameters, source="disk")
+        if data is None:
+            return MISSING, lambda data: store.put(
+                input_parameters, data if isinstance(data, bytes) else data.encode("utf-8")
+            )
+        if input_parameters.get_output_type() == OutputType.STRING:
+            data = data.decode("utf-8")
+        return data, None
+    return MISSING, None
+
+
+def _send(input_parameters: HvpyParameters, client: Client) -> Union[bytes, str, Dict[str, Any]]:
+    """
+    Sends the request and parses the response.
+    """
+    if input_parameters.get_output_type() == OutputType.RAW:
+        buffer = io.BytesIO()
+        _transfer(client, input_parameters, buffer)
+        return buffer.getvalue()
+    start = time.perf_counter()
+    try:
+        response = _get(client, input_parameters)
+        response.raise_for_status()
+        result = parse_response(response, input_parameters.get_output_type())
+    except Exception as e:
+        if client.hooks:
+            _emit(client, "error", input_parameters, elapsed=time.perf_counter() - start, error=e)
+        raise
+    if client.hooks:
+        _emit(
+            client,
+            "response",
+            input_parameters,
+            status=response.status_code,
+            elapsed=time.perf_counter() - start,
+            nbytes=len(response.content),
+        )
+    return result
+
+
+def download_api_call(
+    input_parameters: HvpyParameters,
+    sink: Union[str, Path, BinaryIO],
+    overwrite: bool = False,
+    progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    client: Optional[Client] = None,
+) -> Union[Path, BinaryIO]:
+    """
+    Executes the API call and streams the raw response to a file.
+
+    Unlike `execute_api_call`, the response is never held in memory as a
+    whole, which matters for large JPX files and movies.
+
+    When saving to a path, the data is first written to ``<filename>.part``
+    and only renamed once complete. If a previous download left such a
+    file behind, the transfer resumes where it stopped, provided the server
+    confirms with the ETag or Last-Modified date kept in
+    ``<filename>.part.validator`` that the resource did not change.
+
+    Parameters
+    ----------
+    input_parameters
+        The input parameters.
+    sink
+        The path to save the response to, or a binary file-like object to write it to.
+    overwrite
+        Whether to overwrite the file if it already exists.
+        Default is `False`.
+    progress
+        Called as ``progress(downloaded, total)`` after every chunk, where
+        ``total`` is the size announced by the server or `None`.
+        Default is `None`, optional.
+    chunk_size
+        Size in bytes of the chunks read from the network.
+        Default is `CHUNK_SIZE`.
+    client
+        The client to send the request with.
+        Default is `None` (the one returned by `hvpy.client.get_client`), optional.
+
+    Returns
+    -------
+    Union[`~pathlib.Path`, BinaryIO]
+        The path to the saved file, or ``sink`` if it is file-like.
+    """
+    client = client or get_client()
+    if hasattr(sink, "write"):
+        _transfer(client, input_parameters, sink, progress=progress, chunk_size=chunk_size)
+        return sink
+    filename = _prepare_filename(sink, overwrite=overwrite)
+    partial = _partial_filename(filename)
+    validator_file = partial.with_name(partial.name + ".validator")
+    offset = partial.stat().st_size if partial.exists() else 0
+    validator = validator_file.read_text() if offset and validator_file.exists() else None
+    if validator is None:
+        # Nothing tells whether a partial file belongs to the same resource.
+        offset = 0
+        partial.unlink(missing_ok=True)
+    try:
+        with partial.open("ab") as f:
+            _transfer(
+                client,
+                input_parameters,
+                f,
+                offset=offset,
+                progress=progress,
+                chunk_size=chunk_size,
+                validator=validator,
+                on_validator=validator_file.write_text,
+            )
+    except BaseException:
+        # Keep what was received for the next attempt to resume from.
+        if not partial.exists() or partial.stat().st_size == 0:
+            partial.unlink(missing_ok=True)
+            validator_file.unlink(missing_ok=True)
+        raise
+    os.replace(partial, filename)
+    validator_file.unlink(missing_ok=True)
+    return filename
@@ -3,10 +3,14 @@ from typing import Union, Optional
 from pathlib import Path
 from datetime import datetime
 
+from hvpy.api_groups.movies.download_movie import downloadMovieInputParameters
 from hvpy.api_groups.movies.queue_movie import queueMovieInputParameters
+from hvpy.api_groups.screenshots.download_screenshot import downloadScreenshotInputParameters
 from hvpy.api_groups.screenshots.take_screenshot import takeScreenshotInputParameters
-from hvpy.facade import downloadMovie, downloadScreenshot, getMovieStatus, queueMovie, takeScreenshot
-from hvpy.utils import _add_shared_docstring, save_file
+from hvpy.core import download_api_call
+from hvpy.facade import getMovieStatus, queueMovie, takeScreenshot
+from hvpy.polling import FixedPolling, PollingStrategy
+from hvpy.utils import _add_shared_docstring
 
 __all__ = [
     "createMovie",
@@ -47,6 +51,7 @@ def createMovie(
     filename: Optional[Union[str, Path]] = None,
     hq: bool = False,
     timeout: float = 5,
+    polling: Optional[PollingStrategy] = None,
 ) -> Path:
     """
     Automatically creates a movie using `queueMovie`, `getMovieStatus` and
@@ -66,6 +71,9 @@ def createMovie(
     timeout
         The timeout in minutes to wait for the movie to be created.
         Default is 5 minutes.
+    polling
+        Decides how long to wait between two checks on the movie.
+        Default is `None` (``FixedPolling(3)``), optional.
     {Insert}
 
     Examples
@@ -93,38 +101,43 @@ def createMovie(
     filename = input_params.pop("filename")
     hq = input_params.pop("hq")
     timeout = input_params.pop("timeout")
+    polling = input_params.pop("polling") or FixedPolling()
     res = queueMovie(**input_params)
     if res.get("error"):
         raise RuntimeError(res["error"])
-    timeout_counter = time.time() + 60 * timeout  # Default 5 minutes
+    start = time.time()
+    timeout_counter = start + 60 * timeout  # Default 5 minutes
     title = ""
+    polls = 0
+    status = res
     while True:
+        delay = polling.delay(status, polls, time.time() - start)
+        time.sleep(min(delay, max(timeout_counter - time.time(), 0)))
         status = getMovieStatus(
             id=res["id"],
             format=format,
+            verbose=polling.verbose,
             token=res["token"],
         )
-        if status["status"] in [0, 1]:
-            time.sleep(3)
+        polls += 1
         if status["status"] == 2:
             title = status["title"]
             break
-        if time.time() > timeout_counter:
-            raise RuntimeError(f"Exceeded timeout of {timeout} minutes.")
         if status["status"] == 3:
             raise RuntimeError(status["error"])
-    binary_data = downloadMovie(
-        id=res["id"],
-        format=format,
-        hq=hq,
-    )
+        if time.time() > timeout_counter:
+            raise RuntimeError(f"Exceeded timeout of {timeout} minutes.")
     if filename is None:
         filename = f"{title}.{format}"
     else:
         filename = f"{filename}.{format}"
-    filename = save_file(
-        data=binary_data,
-        filename=filename,
+    filename = download_api_call(
+        downloadMovieInputParameters(
+            id=res["id"],
+            format=format,
+            hq=hq,
+        ),
+        sink=filename,
         overwrite=overwrite,
     )
     return filename
@@ -196,16 +209,13 @@ def createScreenshot(
     res = takeScreenshot(**input_params)
     if res.get("error"):
         raise RuntimeError(res["error"])
-    binary_data = downloadScreenshot(
-        id=res["id"],
-    )
     if filename is None:
         filename = f"{res['id']}_{date.date()}.png"
     else:
         filename = f"{filename}.png"
-    filename = save_file(
-        data=binary_data,
-        filename=filename,
+    filename = download_api_call(
+        downloadScreenshotInputParameters(id=res["id"]),
+        sink=filename,
         overwrite=overwrite,
     )
     return filename
@@ -1,5 +1,6 @@
+import functools
 from enum import Enum, auto
-from typing import Any, Dict
+from typing import Any, Dict, Tuple, FrozenSet
 
 from pydantic import BaseModel
 
@@ -23,22 +24,66 @@ class OutputType(Enum):
     """
 
 
+@functools.lru_cache(maxsize=None)
+def _fields(cls) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, Any], FrozenSet[str]]:
+    """
+    Returns the ``(field, query key)`` pairs, the defaults and the required
+    fields of a parameter model.
+    """
+    # pydantic doesn't allow using lowercase 'json' as a field
+    keys = tuple((name, "json" if name == "Json" else name) for name in cls.model_fields)
+    defaults = {name: None if field.is_required() else field.default for name, field in cls.model_fields.items()}
+    required = frozenset(name for name, field in cls.model_fields.items() if field.is_required())
+    return keys, defaults, required
+
+
 class HvpyParameters(BaseModel):
     """
     Base model for all Helioviewer API parameters.
     """
 
-    def model_dump(self) -> Dict[str, Any]:
-        # pydantic doesn't allow using lowercase 'json' as a field
-        import warnings
+    @classmethod
+    def _trusted(cls, **values: Any) -> "HvpyParameters":
+        """
+        Creates the parameters without validating them.
+
+        This is several times faster than validation, for internal
+        callers passing values that are already valid (e.g. dates as ISO
+        strings and datasources as integers) in hot loops.
+        """
+        _, defaults, required = _fields(cls)
+        if not required <= values.keys():
+            raise TypeError(f"Missing parameters: {', '.join(sorted(required - values.keys()))}")
+        data = dict(defaults)
+        data.update(values)
+        self = cls.__new__(cls)
+        object.__setattr__(self, "__dict__", data)
+        object.__setattr__(self, "__pydantic_fields_set__", set(values))
+        object.__setattr__(self, "__pydantic_extra__", None)
+        object.__setattr__(self, "__pydantic_private__", None)
+        return self
 
-        with warnings.catch_warnings():
-            # Our datetime fields are strings(???) and pydantic complains about that
-            warnings.simplefilter("ignore")
-            dump = super().model_dump()
-        if "Json" in dump:
-            dump["json"] = dump["Json"]
-            del dump["Json"]
+    def model_dump(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """
+        Returns the parameters as sent to the API.
+
+        Field values are already converted by the validators, so they are
+        copied as they are rather than going through the pydantic serializer.
+
+        Parameters
+        ----------
+        exclude_none
+            Leave out parameters that are `None`.
+            Default is `False`.
+        """
+        keys, _, _ = _fields(type(self))
+        values = self.__dict__
+        dump = {}
+        for name, key in keys:
+            value = values[name]
+            if value is None and exclude_none:
+                continue
+            dump[key] = value.copy() if isinstance(value, (list, dict)) else value
         return dump
 
     def get_output_type(self) -> OutputType:
@@ -54,9 +99,16 @@ class HvpyParameters(BaseModel):
         """
         return OutputType.RAW
 
+    @property
+    def endpoint(self) -> str:
+        """
+        Name of the API endpoint.
+        """
+        return self.__class__.__name__[:-15]
+
     @property
     def url(self) -> str:
         """
         Final API endpoint URL.
         """
-        return get_api_url() + self.__class__.__name__[:-15] + "/"
+        return get_api_url() + self.endpoint + "/"
@@ -0,0 +1,462 @@
+import re
+import mmap
+import struct
+from typing import Any, Dict, List, Union, Callable, Iterable, Iterator, Optional, Sequence, NamedTuple
+from pathlib import Path
+from datetime import datetime
+from xml.etree import ElementTree
+
+__all__ = ["HeaderTable", "JP2Header", "parse_jp2_header", "parse_jp2_headers", "read_jp2_header"]
+
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+"""
+Declaration the ``getJP2Header`` endpoint puts in front of the XML box.
+"""
+_SIGNATURE = b"\x00\x00\x00\x0cjP  \r\n\x87\n"
+_SUPERBOXES = {b"jp2h", b"asoc", b"res "}
+_BOX = struct.Struct(">I4s")
+_XLBOX = struct.Struct(">Q")
+
+_Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _boxes(data: _Buffer, start: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Yields the type, and start and end offsets of the contents, of the boxes
+    between ``start`` and ``end``.
+
+    Only the box headers are read, so walking past the codestream costs
+    nothing.
+    """
+    end = len(data) if end is None else end
+    offset = start
+    while offset + _BOX.size <= end:
+        length, kind = _BOX.unpack_from(data, offset)
+        header = _BOX.size
+        if length == 1:
+            if offset + header + _XLBOX.size > end:
+                raise ValueError(f"Truncated JP2 box at offset {offset}")
+            (length,) = _XLBOX.unpack_from(data, offset + header)
+            header += _XLBOX.size
+        elif length == 0:
+            # The last box extends to the end of the file.
+            length = end - offset
+        if length < header or offset + length > end:
+            raise ValueError(f"Invalid JP2 box {kind!r} at offset {offset}")
+        yield kind, offset + header, offset + length
+        offset += length
+
+
+def _find_xml(data: _Buffer, start: int = 0, end: Optional[int] = None) -> Optional[bytes]:
+    """
+    Returns the contents of the first XML box holding a Helioviewer header.
+    """
+    if start == 0 and data[: len(_SIGNATURE)] != _SIGNATURE:
+        raise ValueError("Not a JPEG2000 image")
+    for kind, content, stop in _boxes(data, start, end):
+        if kind == b"xml ":
+            xml = bytes(data[content:stop])
+            if b"<meta" in xml:
+                return xml
+        elif kind in _SUPERBOXES:
+            xml = _find_xml(data, content, stop)
+            if xml is not None:
+                return xml
+    return None
+
+
+def read_jp2_header(source: Union[str, Path, bytes, bytearray, memoryview]) -> str:
+    """
+    Reads the XML header embedded in a JPEG2000 image.
+
+    This returns the same XML as `hvpy.getJP2Header` for an image downloaded
+    with `hvpy.getJP2Image`, without sending a request. Files are memory
+    mapped and only the box headers are read to find the XML box, so the
+    codestream is never loaded.
+
+    Parameters
+    ----------
+    source
+        Path to a JPEG2000 file, or its contents.
+
+    Returns
+    -------
+    `str`
+        The XML header.
+
+    Raises
+    ------
+    ValueError
+        If the image is not a valid JPEG2000 file or has no XML header.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> from hvpy import DataSource, getJP2Image, read_jp2_header
+    >>> read_jp2_header(getJP2Image(date=datetime(2022, 1, 1), sourceId=DataSource.AIA_171))
+    '<?xml version="1.0" encoding="utf-8"?><meta><fits>...'
+    """
+    if isinstance(source, (str, Path)):
+        with open(Path(source).expanduser(), "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                data = b""
+            try:
+                xml = _find_xml(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+    else:
+        xml = _find_xml(memoryview(source))
+    if xml is None:
+        raise ValueError("No XML header found in JPEG2000 image")
+    header = xml.rstrip(b"\0").decode("utf-8", errors="replace").strip()
+    if not header.startswith("<?xml"):
+        header = XML_DECLARATION + header
+    return header
+
+
+_JSONP = re.compile(r"^\s*[\w.$]+\(\s*'(.*)'\s*\)\s*;?\s*$", re.DOTALL)
+
+
+def _to_value(text: Optional[str]) -> Any:
+    """
+    Converts the text of a FITS keyword to an `int`, `float` or `str`.
+    """
+    if text is None:
+        return None
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+_DATE = re.compile(
+    r"(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[T ](\d{1,2}):(\d{1,2})(?::(\d{1,2})(?:\.(\d*))?)?)?Z?",
+    re.IGNORECASE,
+)
+# The format of DATE-OBS before 2000, the time being in TIME-OBS.
+_OLD_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2})")
+
+
+def _to_date(text: Optional[str], time: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parses ``DATE-OBS``, `None` if it cannot be parsed.
+
+    Dates may be separated by ``/`` and have any number of decimals. A date
+    without a time takes the one in ``time``, from ``TIME-OBS``.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    old = _OLD_DATE.fullmatch(text)
+    if old:
+        day, month, year = old.groups()
+        text = f"19{year}-{month}-{day}"
+    if time and time.strip() and not any(c in text for c in ":Tt "):
+        text = f"{text}T{time.strip()}"
+    match = _DATE.fullmatch(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        return datetime(
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+            # Only microseconds fit in a datetime.
+            int((fraction or "")[:6].ljust(6, "0")),
+        )
+    except ValueError:
+        return None
+
+
+def _to_float(text: Optional[str]) -> Optional[float]:
+    try:
+        return float(text) if text and text.strip() else None
+    except ValueError:
+        return None
+
+
+def _to_int(text: Optional[str]) -> Optional[int]:
+    try:
+        return int(float(text)) if text and text.strip() else None
+    except ValueError:
+        return None
+
+
+def _to_str(text: Optional[str]) -> Optional[str]:
+    return text.strip() if text is not None else None
+
+
+def _field(fits: Optional[ElementTree.Element], keyword: str, convert: Callable[..., Any]) -> Any:
+    """
+    Converts a typed field, `None` if it is missing.
+    """
+    if fits is None:
+        return None
+    if convert is _to_date:
+        return _to_date(fits.findtext(keyword), fits.findtext("TIME-OBS"))
+    return convert(fits.findtext(keyword))
+
+
+# Typed fields of JP2Header and HeaderTable, with their FITS keyword.
+_FIELDS = (
+    ("date", "DATE-OBS", _to_date),
+    ("telescope", "TELESCOP", _to_str),
+    ("instrument", "INSTRUME", _to_str),
+    ("detector", "DETECTOR", _to_str),
+    ("wavelength", "WAVELNTH", _to_float),
+    ("exposure", "EXPTIME", _to_float),
+    ("width", "NAXIS1", _to_int),
+    ("height", "NAXIS2", _to_int),
+    ("scale", "CDELT1", _to_float),
+    ("refPixelX", "CRPIX1", _to_float),
+    ("refPixelY", "CRPIX2", _to_float),
+    ("rsun", "RSUN_OBS", _to_float),
+    ("dsun", "DSUN_OBS", _to_float),
+)
+
+
+def _section(element: Optional[ElementTree.Element]) -> Dict[str, Any]:
+    """
+    Converts a section of the header to a dictionary.
+
+    Repeated keywords, like ``HISTORY`` and ``COMMENT``, are joined with newlines.
+    """
+    values: Dict[str, Any] = {}
+    if element is None:
+        return values
+    for child in element:
+        value = _to_value(child.text)
+        if child.tag in values and isinstance(value, str):
+            values[child.tag] = f"{values[child.tag]}\n{value}"
+        else:
+            values[child.tag] = value
+    return values
+
+
+def _parse(header: Union[str, bytes]) -> ElementTree.Element:
+    """
+    Parses a header, optionally wrapped in a JSONP ``callback``.
+    """
+    if isinstance(header, bytes):
+        header = header.decode("utf-8", errors="replace")
+    match = _JSONP.match(header)
+    if match:
+        header = match.group(1).replace("\\'", "'")
+    try:
+        return ElementTree.fromstring(header.strip())
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Invalid JP2 header: {e}") from e
+
+
+class JP2Header:
+    """
+    Parsed XML header of a JPEG2000 image.
+
+    The commonly used FITS keywords are available as typed attributes (`None`
+    when missing). Every other keyword is converted only when asked for,
+    either with ``header["KEYWORD"]`` or through the `fits` and `helioviewer`
+    dictionaries.
+
+    Use `parse_jp2_header` to create one.
+    """
+
+    __slots__ = tuple(name for name, _, _ in _FIELDS) + ("_fits_element", "_hv_element", "_fits", "_helioviewer")
+
+    date: Optional[datetime]
+    """
+    Observation datetime (``DATE-OBS`` and ``TIME-OBS``).
+    """
+    telescope: Optional[str]
+    """
+    Telescope (``TELESCOP``).
+    """
+    instrument: Optional[str]
+    """
+    Instrument (``INSTRUME``).
+    """
+    detector: Optional[str]
+    """
+    Detector (``DETECTOR``).
+    """
+    wavelength: Optional[float]
+    """
+    Wavelength (``WAVELNTH``).
+    """
+    exposure: Optional[float]
+    """
+    Exposure time in seconds (``EXPTIME``).
+    """
+    width: Optional[int]
+    """
+    Image width in pixels (``NAXIS1``).
+    """
+    height: Optional[int]
+    """
+    Image height in pixels (``NAXIS2``).
+    """
+    scale: Optional[float]
+    """
+    Image scale in arcseconds per pixel (``CDELT1``).
+    """
+    refPixelX: Optional[float]
+    """
+    Reference pixel x-coordinate (``CRPIX1``).
+    """
+    refPixelY: Optional[float]
+    """
+    Reference pixel y-coordinate (``CRPIX2``).
+    """
+    rsun: Optional[float]
+    """
+    Radius of the Sun in arcseconds (``RSUN_OBS``).
+    """
+    dsun: Optional[float]
+    """
+    Distance to the Sun in meters (``DSUN_OBS``).
+    """
+
+    def __init__(self, root: ElementTree.Element):
+        fits = root.find("fits")
+        self._fits_element = fits
+        self._hv_element = root.find("helioviewer")
+        self._fits: Optional[Dict[str, Any]] = None
+        self._helioviewer: Optional[Dict[str, Any]] = None
+        for name, keyword, convert in _FIELDS:
+            setattr(self, name, _field(fits, keyword, convert))
+
+    @property
+    def fits(self) -> Dict[str, Any]:
+        """
+        Every FITS keyword of the header.
+        """
+        if self._fits is None:
+            self._fits = _section(self._fits_element)
+        return self._fits
+
+    @property
+    def helioviewer(self) -> Dict[str, Any]:
+        """
+        The Helioviewer metadata of the header, like ``HV_ROTATION``.
+        """
+        if self._helioviewer is None:
+            self._helioviewer = _section(self._hv_element)
+        return self._helioviewer
+
+    def __getitem__(self, keyword: str) -> Any:
+        if keyword in self.fits:
+            return self.fits[keyword]
+        return self.helioviewer[keyword]
+
+    def get(self, keyword: str, default: Any = None) -> Any:
+        """
+        Returns the value of a FITS or Helioviewer keyword, ``default`` if it
+        is missing.
+        """
+        try:
+            return self[keyword]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"<JP2Header {self.telescope} {self.instrument} {self.detector} {self.wavelength} {self.date}>"
+
+
+def parse_jp2_header(header: Union[str, bytes]) -> JP2Header:
+    """
+    Parses the XML header of a JPEG2000 image.
+
+    Parameters
+    ----------
+    header
+        The XML returned by `hvpy.getJP2Header` (also when wrapped by ``callback``)
+        or `read_jp2_header`.
+
+    Returns
+    -------
+    `hvpy.jp2.JP2Header`
+        The parsed header.
+
+    Examples
+    --------
+    >>> from hvpy import getJP2Header
+    >>> from hvpy.jp2 import parse_jp2_header
+    >>> header = parse_jp2_header(getJP2Header(id=7654321))
+    >>> header.date
+    datetime.datetime(...)
+    """
+    return JP2Header(_parse(header))
+
+
+class HeaderTable(NamedTuple):
+    """
+    Columnar table of JPEG2000 headers, one row per header.
+
+    The columns are the typed attributes of `JP2Header`.
+    """
+
+    date: List[Optional[datetime]]
+    telescope: List[Optional[str]]
+    instrument: List[Optional[str]]
+    detector: List[Optional[str]]
+    wavelength: List[Optional[float]]
+    exposure: List[Optional[float]]
+    width: List[Optional[int]]
+    height: List[Optional[int]]
+    scale: List[Optional[float]]
+    refPixelX: List[Optional[float]]
+    refPixelY: List[Optional[float]]
+    rsun: List[Optional[float]]
+    dsun: List[Optional[float]]
+    keywords: Dict[str, List[Any]]
+    """
+    Extra columns for the requested FITS or Helioviewer keywords.
+    """
+
+
+def parse_jp2_headers(headers: Iterable[Union[str, bytes]], keywords: Sequence[str] = ()) -> HeaderTable:
+    """
+    Parses many JPEG2000 headers into a columnar table.
+
+    Only the typed fields and the requested keywords are converted, no
+    per-header object is kept.
+
+    Parameters
+    ----------
+    headers
+        The XML headers, as returned by `hvpy.getJP2Header` or `read_jp2_header`.
+    keywords
+        Other FITS or Helioviewer keywords to extract, missing values are `None`.
+        Default is no extra keywords.
+
+    Returns
+    -------
+    `hvpy.jp2.HeaderTable`
+        One row per header.
+    """
+    table = HeaderTable(*[[] for _ in _FIELDS], {keyword: [] for keyword in keywords})
+    columns = list(zip(table, _FIELDS))
+    for header in headers:
+        root = _parse(header)
+        fits = root.find("fits")
+        hv = root.find("helioviewer")
+        for column, (_, keyword, convert) in columns:
+            column.append(_field(fits, keyword, convert))
+        for keyword, column in table.keywords.items():
+            text = fits.findtext(keyword) if fits is not None else None
+            if text is None and hv is not None:
+                text = hv.findtext(keyword)
+            column.append(_to_value(text))
+    return table
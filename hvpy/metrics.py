@@ -0,0 +1,287 @@
+import abc
+import bisect
+import threading
+from typing import Any, Dict, List, Tuple, TextIO, Optional, Sequence, NamedTuple
+
+__all__ = ["DEFAULT_BUCKETS", "CallEvent", "Exporter", "MetricsCollector", "PrometheusExporter"]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+"""
+Upper bounds in seconds of the latency histogram buckets.
+"""
+
+
+class CallEvent(NamedTuple):
+    """
+    Something that happened during an API call, passed to the hooks of the
+    client.
+
+    The kinds of events are:
+
+    * ``"request"``: an attempt is about to be sent.
+    * ``"retry"``: an attempt failed and will be sent again.
+    * ``"response"``: the call succeeded and its body was received.
+    * ``"error"``: the call failed.
+    * ``"cache_hit"`` and ``"cache_miss"``: the cache (``source="memory"``),
+      the image catalog (``source="catalog"``) or the disk store
+      (``source="disk"``) was consulted.
+    * ``"coalesced"``: the call was served by an identical call in flight.
+    """
+
+    kind: str
+    """
+    What happened.
+    """
+    endpoint: str
+    """
+    The API endpoint called.
+    """
+    attempt: int = 0
+    """
+    How many times the request has been sent, for requests and retries.
+    """
+    status: Optional[int] = None
+    """
+    HTTP status code, for responses and retries after an error response.
+    """
+    elapsed: float = 0.0
+    """
+    Seconds since the first attempt was sent, for responses and errors.
+    """
+    nbytes: int = 0
+    """
+    Size of the response body in bytes, for responses.
+    """
+    error: Optional[BaseException] = None
+    """
+    The exception raised, for errors and retries after a connection error.
+    """
+    source: str = ""
+    """
+    ``"memory"``, ``"catalog"`` or ``"disk"``, for cache events.
+    """
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+class MetricsCollector:
+    """
+    Collects metrics about API calls, per endpoint.
+
+    Pass it as a hook to the client to collect the number of requests,
+    responses per status code, retries, errors, cache hits and misses,
+    coalesced calls, bytes received and a histogram of call latencies.
+
+    Parameters
+    ----------
+    buckets
+        Upper bounds in seconds of the latency histogram buckets.
+        Default is `DEFAULT_BUCKETS`.
+
+    Attributes
+    ----------
+    counters
+        The counters named in `COUNTERS`, by endpoint.
+    responses
+        Number of responses by endpoint and status code.
+    cache
+        Number of lookups by endpoint, cache (``"memory"``, ``"catalog"``
+        or ``"disk"``) and whether they hit.
+
+    Examples
+    --------
+    >>> from hvpy import Client, getStatus, set_client
+    >>> from hvpy.metrics import MetricsCollector
+    >>> metrics = MetricsCollector()
+    >>> set_client(Client(hooks=[metrics]))
+    >>> getStatus()
+    {...}
+    >>> metrics.counters["requests"]["getStatus"]
+    1
+    >>> set_client(None)
+    """
+
+    COUNTERS = ("requests", "retries", "errors", "coalesced", "bytes")
+    """
+    Names of the per-endpoint counters.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets every metric back to zero.
+        """
+        with self._lock:
+            self.counters: Dict[str, Dict[str, int]] = {name: {} for name in self.COUNTERS}
+            self.responses: Dict[Tuple[str, int], int] = {}
+            self.cache: Dict[Tuple[str, str, bool], int] = {}
+            self.latencies: Dict[str, _Histogram] = {}
+
+    def __call__(self, event: CallEvent) -> None:
+        with self._lock:
+            if event.kind == "request":
+                self._count("requests", event.endpoint)
+            elif event.kind == "retry":
+                self._count("retries", event.endpoint)
+            elif event.kind == "coalesced":
+                self._count("coalesced", event.endpoint)
+            elif event.kind in ("cache_hit", "cache_miss"):
+                key = (event.endpoint, event.source, event.kind == "cache_hit")
+                self.cache[key] = self.cache.get(key, 0) + 1
+            elif event.kind in ("response", "error"):
+                if event.kind == "response":
+                    key = (event.endpoint, event.status)
+                    self.responses[key] = self.responses.get(key, 0) + 1
+                    self._count("bytes", event.endpoint, event.nbytes)
+                else:
+                    self._count("errors", event.endpoint)
+                histogram = self.latencies.get(event.endpoint)
+                if histogram is None:
+                    histogram = self.latencies[event.endpoint] = _Histogram(self.buckets)
+                histogram.counts[bisect.bisect_left(self.buckets, event.elapsed)] += 1
+                histogram.sum += event.elapsed
+
+    def _count(self, name: str, endpoint: str, value: int = 1) -> None:
+        counter = self.counters[name]
+        counter[endpoint] = counter.get(endpoint, 0) + value
+
+    def histogram(self, endpoint: str) -> Tuple[List[Tuple[float, int]], float, int]:
+        """
+        Returns the latency histogram of an endpoint.
+
+        Returns
+        -------
+        `tuple`
+            The cumulative ``(upper bound, count)`` pairs, ending with
+            ``(inf, count)``, the sum of the latencies and their count.
+        """
+        with self._lock:
+            histogram = self.latencies.get(endpoint) or _Histogram(self.buckets)
+            counts, total = list(histogram.counts), histogram.sum
+        cumulative = []
+        running = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, total, running
+
+    def endpoints(self) -> List[str]:
+        """
+        Returns every endpoint with metrics, sorted.
+        """
+        with self._lock:
+            names = set(self.latencies)
+            for counter in self.counters.values():
+                names.update(counter)
+            names.update(endpoint for endpoint, _ in self.responses)
+            names.update(endpoint for endpoint, _, _ in self.cache)
+        return sorted(names)
+
+
+class Exporter(abc.ABC):
+    """
+    Sends the metrics of a collector to a monitoring backend.
+
+    Subclasses implement `export`, reading the attributes and methods of
+    the `MetricsCollector`.
+    """
+
+    @abc.abstractmethod
+    def export(self, collector: MetricsCollector) -> Any:
+        """
+        Exports the current metrics of ``collector``.
+        """
+
+
+def _labels(**labels: Any) -> str:
+    escaped = (
+        k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExporter(Exporter):
+    """
+    Renders the metrics in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    prefix
+        Prefix of the metric names.
+        Default is ``"hvpy"``.
+    stream
+        Where `export` writes the metrics.
+        Default is `None` (only return them), optional.
+    """
+
+    def __init__(self, prefix: str = "hvpy", stream: Optional[TextIO] = None):
+        self.prefix = prefix
+        self.stream = stream
+
+    def export(self, collector: MetricsCollector) -> str:
+        """
+        Returns the metrics as text, also writing them to ``stream`` if set.
+        """
+        p = self.prefix
+        lines = []
+
+        def metric(name: str, kind: str, help: str) -> None:
+            lines.append(f"# HELP {p}_{name} {help}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+
+        endpoints = collector.endpoints()
+        # Hooks may update the collector from other threads meanwhile.
+        with collector._lock:
+            counters = {name: dict(values) for name, values in collector.counters.items()}
+            responses = dict(collector.responses)
+            cache = dict(collector.cache)
+            timed = set(collector.latencies)
+        descriptions = {
+            "requests": ("requests_total", "Requests sent to the Helioviewer API."),
+            "retries": ("retries_total", "Requests sent again after a transient failure."),
+            "errors": ("errors_total", "API calls that failed."),
+            "coalesced": ("coalesced_total", "API calls served by an identical call in flight."),
+            "bytes": ("received_bytes_total", "Bytes received in response bodies."),
+        }
+        for counter, (name, help) in descriptions.items():
+            metric(name, "counter", help)
+            values = counters[counter]
+            for endpoint in endpoints:
+                if endpoint in values:
+                    lines.append(f"{p}_{name}{_labels(endpoint=endpoint)} {values[endpoint]}")
+        metric("responses_total", "counter", "Responses received, by status code.")
+        for (endpoint, status), count in sorted(responses.items()):
+            lines.append(f"{p}_responses_total{_labels(endpoint=endpoint, status=status)} {count}")
+        metric("cache_lookups_total", "counter", "Cache, catalog and disk store lookups.")
+        for (endpoint, source, hit), count in sorted(cache.items()):
+            labels = _labels(endpoint=endpoint, cache=source, result="hit" if hit else "miss")
+            lines.append(f"{p}_cache_lookups_total{labels} {count}")
+        metric("call_duration_seconds", "histogram", "Duration of API calls, including retries.")
+        for endpoint in endpoints:
+            if endpoint not in timed:
+                continue
+            buckets, total, count = collector.histogram(endpoint)
+            for bound, cumulative in buckets:
+                labels = _labels(endpoint=endpoint, le=_number(bound))
+                lines.append(f"{p}_call_duration_seconds_bucket{labels} {cumulative}")
+            lines.append(f"{p}_call_duration_seconds_sum{_labels(endpoint=endpoint)} {_number(total)}")
+            lines.append(f"{p}_call_duration_seconds_count{_labels(endpoint=endpoint)} {count}")
+        text = "\n".join(lines) + "\n"
+        if self.stream is not None:
+            self.stream.write(text)
+        return text
@@ -1,19 +1,25 @@
-from hvpy.api_groups.communications.get_news_feed import getNewsFeedInputParameters
-from hvpy.api_groups.communications.shorten_url import shortenURLInputParameters
-from hvpy.api_groups.jpeg2000.get_jp2_header import getJP2HeaderInputParameters
-from hvpy.api_groups.jpeg2000.get_jp2_image import getJP2ImageInputParameters
-from hvpy.api_groups.jpeg2000.get_jpx import getJPXInputParameters
-from hvpy.api_groups.jpeg2000.get_jpx_closest_to_mid_point import getJPXClosestToMidPointInputParameters
-from hvpy.api_groups.jpeg2000.get_status import getStatusInputParameters
-from hvpy.api_groups.movies.download_movie import downloadMovieInputParameters
-from hvpy.api_groups.movies.get_movie_status import getMovieStatusInputParameters
-from hvpy.api_groups.movies.queue_movie import queueMovieInputParameters
-from hvpy.api_groups.movies.re_queue_movie import reQueueMovieInputParameters
-from hvpy.api_groups.official_clients.get_closest_image import getClosestImageInputParameters
-from hvpy.api_groups.official_clients.get_data_sources import getDataSourcesInputParameters
-from hvpy.api_groups.screenshots.download_screenshot import downloadScreenshotInputParameters
-from hvpy.api_groups.screenshots.get_tile import getTileInputParameters
-from hvpy.api_groups.screenshots.take_screenshot import takeScreenshotInputParameters
+import importlib
+
+# Parameter classes are imported on first use, each pydantic model being
+# slow to build.
+_MODULES = {
+    "getNewsFeedInputParameters": "hvpy.api_groups.communications.get_news_feed",
+    "shortenURLInputParameters": "hvpy.api_groups.communications.shorten_url",
+    "getJP2HeaderInputParameters": "hvpy.api_groups.jpeg2000.get_jp2_header",
+    "getJP2ImageInputParameters": "hvpy.api_groups.jpeg2000.get_jp2_image",
+    "getJPXInputParameters": "hvpy.api_groups.jpeg2000.get_jpx",
+    "getJPXClosestToMidPointInputParameters": "hvpy.api_groups.jpeg2000.get_jpx_closest_to_mid_point",
+    "getStatusInputParameters": "hvpy.api_groups.jpeg2000.get_status",
+    "downloadMovieInputParameters": "hvpy.api_groups.movies.download_movie",
+    "getMovieStatusInputParameters": "hvpy.api_groups.movies.get_movie_status",
+    "queueMovieInputParameters": "hvpy.api_groups.movies.queue_movie",
+    "reQueueMovieInputParameters": "hvpy.api_groups.movies.re_queue_movie",
+    "getClosestImageInputParameters": "hvpy.api_groups.official_clients.get_closest_image",
+    "getDataSourcesInputParameters": "hvpy.api_groups.official_clients.get_data_sources",
+    "downloadScreenshotInputParameters": "hvpy.api_groups.screenshots.download_screenshot",
+    "getTileInputParameters": "hvpy.api_groups.screenshots.get_tile",
+    "takeScreenshotInputParameters": "hvpy.api_groups.screenshots.take_screenshot",
+}
 
 __all__ = [
     "getJP2ImageInputParameters",
@@ -33,3 +39,15 @@ __all__ = [
     "shortenURLInputParameters",
     "getTileInputParameters",
 ]
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        value = getattr(importlib.import_module(_MODULES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -0,0 +1,134 @@
+import abc
+from typing import Any, Dict, Optional
+
+__all__ = ["ETAPolling", "ExponentialPolling", "FixedPolling", "PollingStrategy"]
+
+
+class PollingStrategy(abc.ABC):
+    """
+    Decides how long to wait before checking on a movie again.
+
+    Strategies hold no per-movie state, so one instance can be shared by
+    every movie of a batch.
+    """
+
+    verbose = False
+    """
+    Whether the strategy needs the verbose ``getMovieStatus`` response.
+    """
+
+    @abc.abstractmethod
+    def delay(self, status: Dict[str, Any], polls: int, elapsed: float) -> float:
+        """
+        Returns the number of seconds to wait before the next
+        ``getMovieStatus`` call.
+
+        Parameters
+        ----------
+        status
+            The last ``getMovieStatus`` response, or the ``queueMovie`` response before the first poll.
+        polls
+            How many times the status was checked so far.
+        elapsed
+            Seconds since the movie was queued.
+        """
+
+
+class FixedPolling(PollingStrategy):
+    """
+    Checks on the movie at a fixed interval.
+
+    Parameters
+    ----------
+    interval
+        Seconds between two checks.
+        Default is 3.
+    """
+
+    def __init__(self, interval: float = 3):
+        self.interval = interval
+
+    def delay(self, status: Dict[str, Any], polls: int, elapsed: float) -> float:
+        return self.interval
+
+
+class ExponentialPolling(PollingStrategy):
+    """
+    Checks on the movie less and less often.
+
+    Parameters
+    ----------
+    initial
+        Seconds before the first check.
+        Default is 3.
+    factor
+        How much the interval grows after every check.
+        Default is 1.5.
+    maximum
+        Maximum number of seconds between two checks.
+        Default is 30.
+    """
+
+    def __init__(self, initial: float = 3, factor: float = 1.5, maximum: float = 30):
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+
+    def delay(self, status: Dict[str, Any], polls: int, elapsed: float) -> float:
+        return min(self.initial * self.factor**polls, self.maximum)
+
+
+class ETAPolling(PollingStrategy):
+    """
+    Checks on the movie when the server expects it to be done.
+
+    The wait is the ``eta`` reported by ``queueMovie`` and the verbose
+    ``getMovieStatus`` responses or, failing that, an estimate from the
+    reported ``progress``. Once the estimate has passed, or when the server
+    gives no hint, ``fallback`` decides.
+
+    Parameters
+    ----------
+    min_interval
+        Minimum number of seconds between two checks.
+        Default is 1.
+    max_interval
+        Maximum number of seconds between two checks.
+        Default is 60.
+    fallback
+        Strategy used when the server gives no usable hint.
+        Default is `None` (``ExponentialPolling(initial=min_interval, maximum=max_interval)``), optional.
+    """
+
+    verbose = True
+
+    def __init__(self, min_interval: float = 1, max_interval: float = 60, fallback: Optional[PollingStrategy] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fallback = fallback or ExponentialPolling(initial=min_interval, maximum=max_interval)
+
+    def estimate(self, status: Dict[str, Any], elapsed: float) -> Optional[float]:
+        """
+        Returns the seconds left according to the server, `None` if unknown.
+        """
+        try:
+            eta = float(status["eta"])
+        except (KeyError, TypeError, ValueError):
+            eta = None
+        if eta is not None and eta > 0:
+            return eta
+        try:
+            progress = float(status["progress"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if progress > 1:
+            progress /= 100
+        if 0 < progress < 1 and elapsed > 0:
+            return elapsed * (1 - progress) / progress
+        return None
+
+    def delay(self, status: Dict[str, Any], polls: int, elapsed: float) -> float:
+        eta = self.estimate(status, elapsed)
+        if eta is None:
+            return self.fallback.delay(status, polls, elapsed)
+        return min(max(eta, self.min_interval), self.max_interval)
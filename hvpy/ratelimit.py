@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import struct
+import threading
+import contextlib
+from typing import Dict, Tuple, Union, Iterator, Optional
+from pathlib import Path
+
+__all__ = ["FileTokenBucket", "RateLimiter", "TokenBucket"]
+
+
+class TokenBucket:
+    """
+    Token bucket shared by the threads of a process.
+
+    Tokens are added at ``rate`` per second up to ``burst``, and every
+    request takes one. A request finding the bucket empty reserves its
+    token anyway and waits until it would have been available, so waiting
+    requests are served in order.
+
+    Parameters
+    ----------
+    rate
+        Tokens added per second, i.e. the sustained request rate.
+    burst
+        Maximum number of tokens in the bucket.
+        Default is `None` (same as ``rate``, at least 1), optional.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate ({rate}) must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float, available: float, last: float) -> Tuple[float, float, float]:
+        """
+        Refills the bucket and takes ``tokens`` from it.
+
+        Returns
+        -------
+        The seconds to wait, and the new token count and timestamp.
+        """
+        now = time.monotonic()
+        # The stored timestamp may come from before a reboot.
+        available = min(self.burst, available + max(now - last, 0) * self.rate)
+        available -= tokens
+        wait = -available / self.rate if available < 0 else 0.0
+        return wait, available, now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Takes ``tokens`` from the bucket without waiting.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait before using them.
+        """
+        with self._lock:
+            wait, self._tokens, self._last = self._take(tokens, self._tokens, self._last)
+        return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Takes ``tokens`` from the bucket, waiting until they are available.
+
+        Returns
+        -------
+        float
+            The number of seconds waited.
+        """
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+@contextlib.contextmanager
+def _locked(f) -> Iterator[None]:
+    """
+    Holds an exclusive lock on the open file ``f``.
+    """
+    if sys.platform == "win32":  # pragma: no cover
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket shared by every process of a host.
+
+    The state of the bucket lives in a small file which is locked while it
+    is updated, so every process opening the same file shares the budget.
+
+    Parameters
+    ----------
+    path
+        The file holding the state of the bucket, created if needed.
+    rate
+        Tokens added per second, i.e. the sustained request rate.
+    burst
+        Maximum number of tokens in the bucket.
+        Default is `None` (same as ``rate``, at least 1), optional.
+    """
+
+    _STATE = struct.Struct("<dd")
+
+    def __init__(self, path: Union[str, Path], rate: float, burst: Optional[float] = None):
+        super().__init__(rate, burst)
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._file = os.fdopen(fd, "r+b", buffering=0)
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock, _locked(self._file):
+            self._file.seek(0)
+            state = self._file.read(self._STATE.size)
+            if len(state) == self._STATE.size:
+                available, last = self._STATE.unpack(state)
+            else:
+                available, last = self.burst, time.monotonic()
+            wait, available, last = self._take(tokens, available, last)
+            self._file.seek(0)
+            self._file.write(self._STATE.pack(available, last))
+        return wait
+
+    def close(self) -> None:
+        """
+        Closes the state file.
+        """
+        self._file.close()
+
+
+class RateLimiter:
+    """
+    Limits the rate of requests sent to each API endpoint.
+
+    Parameters
+    ----------
+    rate
+        Requests per second allowed for endpoints without a budget of their own.
+        Default is `None` (unlimited), optional.
+    budgets
+        Requests per second allowed for specific endpoints, e.g. ``{"getTile": 20}``.
+        Default is `None`, optional.
+    burst
+        Number of requests that can be sent at once after a quiet period, as a
+        multiple of the rate (but at least one request).
+        Default is 1 (one second worth of requests).
+    directory
+        Directory holding the state of the buckets, to share the budgets with
+        other processes on this host. Every process must use the same rates.
+        Default is `None` (share within this process only), optional.
+
+    Examples
+    --------
+    >>> from hvpy import Client, set_client
+    >>> from hvpy.ratelimit import RateLimiter
+    >>> set_client(Client(rate_limiter=RateLimiter(rate=10, budgets={"getTile": 50})))
+    >>> set_client(None)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        budgets: Optional[Dict[str, float]] = None,
+        burst: float = 1,
+        directory: Optional[Union[str, Path]] = None,
+    ):
+        self.rate = rate
+        self.budgets = dict(budgets or {})
+        self.burst = burst
+        self.directory = Path(directory).expanduser() if directory is not None else None
+        self.waited: Dict[str, float] = {}
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        """
+        Returns the bucket of an endpoint, `None` if it is unlimited.
+        """
+        try:
+            return self._buckets[endpoint]
+        except KeyError:
+            pass
+        with self._lock:
+            if endpoint not in self._buckets:
+                # Endpoints without a budget share the default bucket.
+                name = endpoint if endpoint in self.budgets else "default"
+                rate = self.budgets.get(endpoint, self.rate)
+                if rate is None:
+                    bucket = None
+                elif name in self._buckets:
+                    bucket = self._buckets[name]
+                elif self.directory is not None:
+                    bucket = FileTokenBucket(self.directory / f"{name}.bucket", rate, max(rate * self.burst, 1))
+                else:
+                    bucket = TokenBucket(rate, max(rate * self.burst, 1))
+                self._buckets[name] = self._buckets[endpoint] = bucket
+            return self._buckets[endpoint]
+
+    def reserve(self, endpoint: str) -> float:
+        """
+        Reserves a request to ``endpoint`` without waiting.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait before sending it.
+        """
+        bucket = self.bucket(endpoint)
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve()
+        if wait:
+            with self._lock:
+                self.waited[endpoint] = self.waited.get(endpoint, 0) + wait
+        return wait
+
+    def acquire(self, endpoint: str) -> float:
+        """
+        Waits until a request to ``endpoint`` can be sent.
+
+        Returns
+        -------
+        float
+            The number of seconds waited.
+        """
+        wait = self.reserve(endpoint)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def close(self) -> None:
+        """
+        Closes the state files of the buckets shared with other processes.
+
+        The buckets are opened again if the limiter is used afterwards.
+        """
+        with self._lock:
+            buckets = set(self._buckets.values())
+            self._buckets.clear()
+        for bucket in buckets:
+            if isinstance(bucket, FileTokenBucket):
+                bucket.close()
+
+    def __enter__(self) -> "RateLimiter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import Any, Dict, List, Tuple, Union, Iterator, Optional, NamedTuple
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from hvpy.client import Client
+from hvpy.core import execute_api_call
+from hvpy.datasource import DataSource
+from hvpy.parameters import getDataSourcesInputParameters
+from hvpy.utils import _from_timestamp, _to_timestamp
+
+__all__ = ["RETRY_AFTER", "DataSourceInfo", "DataSourceRegistry", "get_registry", "set_registry"]
+
+RETRY_AFTER = 60
+"""
+Seconds to wait before fetching the datasources again after a failure, while
+stale ones are used.
+"""
+
+
+class DataSourceInfo(NamedTuple):
+    """
+    Metadata of a datasource, as listed by ``getDataSources``.
+    """
+
+    sourceId: int
+    """
+    Unique image datasource identifier.
+    """
+    nickname: str
+    """
+    Short name of the datasource, e.g. ``"AIA 171"``.
+    """
+    path: Tuple[str, ...]
+    """
+    The observatory, instrument, detector and measurement, as far as they
+    apply.
+    """
+    instrument: Optional[str]
+    """
+    The instrument, e.g. ``"AIA"``.
+    """
+    start: Optional[datetime]
+    """
+    Datetime of the first image, in UTC.
+    """
+    end: Optional[datetime]
+    """
+    Datetime of the last image, in UTC.
+    """
+    layeringOrder: Optional[int]
+    """
+    Default layering order of the datasource.
+    """
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    try:
+        return _from_timestamp(_to_timestamp(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _walk(tree: Dict[str, Any], path: Tuple[str, ...] = ()) -> Iterator[DataSourceInfo]:
+    """
+    Yields every datasource of a ``getDataSources`` response, in both its plain
+    and verbose layout.
+    """
+    for key, value in tree.items():
+        if not isinstance(value, dict):
+            continue
+        here = path if key == "children" else path + (key,)
+        if "sourceId" not in value:
+            yield from _walk(value, here)
+            continue
+        labels = {label.get("label"): label.get("name") for label in value.get("uiLabels") or ()}
+        yield DataSourceInfo(
+            sourceId=int(value["sourceId"]),
+            nickname=value.get("nickname") or " ".join(here),
+            path=here,
+            instrument=labels.get("Instrument", here[1] if len(here) > 1 else None),
+            start=_parse_date(value.get("start")),
+            end=_parse_date(value.get("end")),
+            layeringOrder=value.get("layeringOrder"),
+        )
+
+
+class DataSourceRegistry:
+    """
+    Indexed datasource metadata, fetched with ``getDataSources`` once and
+    refreshed when it gets older than ``ttl``.
+
+    Unlike `hvpy.DataSource`, the registry lists the datasources the server
+    has right now, with the dates of their first and last images. Lookups
+    by source identifier, nickname or instrument are dictionary lookups.
+
+    Parameters
+    ----------
+    path
+        JSON file to keep the ``getDataSources`` response in across runs, created if needed.
+        Default is `None` (the response is only kept in memory), optional.
+    ttl
+        How long the response is used before it is fetched again.
+        Default is one day.
+    client
+        The client to send the requests with.
+        Default is `None` (the default client), optional.
+
+    Examples
+    --------
+    >>> from hvpy import DataSource
+    >>> from hvpy.registry import DataSourceRegistry
+    >>> registry = DataSourceRegistry()
+    >>> registry[DataSource.AIA_171].nickname
+    'AIA 171'
+    >>> [source.sourceId for source in registry.by_instrument("AIA")]
+    [8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        ttl: timedelta = timedelta(days=1),
+        client: Optional[Client] = None,
+    ):
+        self.path = None if path is None else Path(path).expanduser()
+        self.ttl = ttl
+        self.client = client
+        self.fetched = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, DataSourceInfo] = {}
+        self._by_nickname: Dict[str, DataSourceInfo] = {}
+        self._by_instrument: Dict[str, List[DataSourceInfo]] = {}
+
+    def _index(self, response: Dict[str, Any], fetched: float) -> None:
+        sources = sorted(_walk(response), key=lambda source: source.sourceId)
+        by_instrument: Dict[str, List[DataSourceInfo]] = {}
+        for source in sources:
+            if source.instrument is not None:
+                by_instrument.setdefault(source.instrument.casefold(), []).append(source)
+        self._by_id = {source.sourceId: source for source in sources}
+        self._by_nickname = {source.nickname.casefold(): source for source in sources}
+        self._by_instrument = by_instrument
+        self.fetched = fetched
+
+    def _load(self) -> None:
+        """
+        Indexes the response kept on disk, if any.
+        """
+        try:
+            fetched = self.path.stat().st_mtime
+            response = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        self._index(response, fetched)
+
+    def _save(self, response: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(response, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def refresh(self) -> None:
+        """
+        Fetches the datasources from the API, whatever the age of the ones
+        known.
+        """
+        response = execute_api_call(getDataSourcesInputParameters(verbose=True), client=self.client)
+        if not isinstance(response, dict) or response.get("error"):
+            raise RuntimeError(f"Could not fetch the datasources: {response}")
+        with self._lock:
+            self._index(response, time.time())
+            if self.path is not None:
+                self._save(response)
+
+    def _fresh(self) -> None:
+        """
+        Makes sure the datasources are younger than ``ttl``.
+
+        If they cannot be fetched, they are not tried again for another
+        `RETRY_AFTER` seconds, in which stale ones are used if there are
+        any.
+        """
+        now = time.time()
+        if now - self.fetched < self.ttl.total_seconds() or now < self._retry_at:
+            return
+        with self._lock:
+            if not self.fetched and self.path is not None:
+                self._load()
+            stale = bool(self._by_id)
+        if time.time() - self.fetched < self.ttl.total_seconds():
+            return
+        try:
+            self.refresh()
+        except Exception:
+            self._retry_at = time.time() + RETRY_AFTER
+            if not stale:
+                raise
+
+    def get(self, sourceId: Union[int, DataSource]) -> Optional[DataSourceInfo]:
+        """
+        Returns a datasource by identifier, `None` if the server does not list
+        it.
+        """
+        self._fresh()
+        return self._by_id.get(sourceId.value if isinstance(sourceId, DataSource) else sourceId)
+
+    def __getitem__(self, sourceId: Union[int, DataSource]) -> DataSourceInfo:
+        source = self.get(sourceId)
+        if source is None:
+            raise KeyError(sourceId)
+        return source
+
+    def __contains__(self, sourceId: Union[int, DataSource]) -> bool:
+        return self.get(sourceId) is not None
+
+    def __iter__(self) -> Iterator[DataSourceInfo]:
+        self._fresh()
+        return iter(list(self._by_id.values()))
+
+    def __len__(self) -> int:
+        self._fresh()
+        return len(self._by_id)
+
+    def by_nickname(self, nickname: str) -> Optional[DataSourceInfo]:
+        """
+        Returns a datasource by nickname, ignoring case, `None` if there is
+        none.
+        """
+        self._fresh()
+        return self._by_nickname.get(nickname.casefold())
+
+    def by_instrument(self, instrument: str) -> List[DataSourceInfo]:
+        """
+        Returns the datasources of an instrument, ignoring case, by identifier.
+        """
+        self._fresh()
+        return list(self._by_instrument.get(instrument.casefold(), ()))
+
+    def date_range(self, sourceId: Union[int, DataSource]) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Returns the datetimes of the first and last images of a datasource, in
+        UTC.
+
+        Raises
+        ------
+        KeyError
+            If the server does not list the datasource.
+        """
+        source = self[sourceId]
+        return source.start, source.end
+
+
+_registry: Optional[DataSourceRegistry] = None
+
+
+def get_registry() -> DataSourceRegistry:
+    """
+    Returns the registry used by default, creating one that keeps the
+    datasources in memory on first use.
+    """
+    global _registry
+    if _registry is None:
+        _registry = DataSourceRegistry()
+    return _registry
+
+
+def set_registry(registry: Optional[DataSourceRegistry]) -> None:
+    """
+    Sets the registry used by default.
+
+    Parameters
+    ----------
+    registry : `hvpy.registry.DataSourceRegistry`
+        The registry to use, `None` to create a new one on first use.
+    """
+    global _registry
+    _registry = registry
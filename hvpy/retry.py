@@ -0,0 +1,143 @@
+import time
+import random
+import threading
+from typing import Dict, Mapping, Optional, Collection
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from hvpy.io import HvpyParameters
+
+__all__ = ["NON_IDEMPOTENT_ENDPOINTS", "RetryPolicy"]
+
+NON_IDEMPOTENT_ENDPOINTS = frozenset({"queueMovie", "reQueueMovie", "takeScreenshot", "shortenURL"})
+"""
+Endpoints that create something on the server, and so are not retried by
+default.
+"""
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Parses the ``Retry-After`` header, given either in seconds or as a date.
+    """
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when failed requests are sent again.
+
+    The delay before attempt ``n + 1`` is ``backoff_factor * 2 ** (n - 1)``
+    seconds, capped at ``max_backoff``, unless the server asked for a
+    specific delay with a ``Retry-After`` header. With ``jitter`` the
+    delay is drawn uniformly between zero and that value, so that clients
+    that failed together do not retry together.
+
+    Parameters
+    ----------
+    max_attempts
+        Maximum number of times a request is sent, including the first one.
+        Default is 4.
+    backoff_factor
+        Base delay in seconds.
+        Default is 0.5.
+    max_backoff
+        Maximum delay in seconds, also applied to ``Retry-After``.
+        Default is 60.
+    jitter
+        Randomize the delays.
+        Default is `True`.
+    statuses
+        HTTP status codes that are retried.
+        Default is 429, 502, 503 and 504.
+    retry_connection_errors
+        Also retry requests that failed to connect or timed out.
+        Default is `True`.
+    idempotent_only
+        Only retry endpoints that are not in `NON_IDEMPOTENT_ENDPOINTS`.
+        Default is `True`.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60,
+        jitter: bool = True,
+        statuses: Collection[int] = (429, 502, 503, 504),
+        retry_connection_errors: bool = True,
+        idempotent_only: bool = True,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.idempotent_only = idempotent_only
+        self.retries: Dict[str, int] = {}
+        self.exhausted: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def should_retry(
+        self,
+        input_parameters: HvpyParameters,
+        attempt: int,
+        status: Optional[int] = None,
+    ) -> bool:
+        """
+        Whether a request that failed on its ``attempt``-th try is sent again.
+
+        Parameters
+        ----------
+        input_parameters
+            The parameters of the request.
+        attempt
+            How many times the request has been sent.
+        status
+            The HTTP status code received, `None` for a connection error.
+        """
+        if self.idempotent_only and input_parameters.endpoint in NON_IDEMPOTENT_ENDPOINTS:
+            return False
+        if status is None and not self.retry_connection_errors:
+            return False
+        if status is not None and status not in self.statuses:
+            return False
+        counter = self.retries if attempt < self.max_attempts else self.exhausted
+        with self._lock:
+            counter[input_parameters.endpoint] = counter.get(input_parameters.endpoint, 0) + 1
+        return attempt < self.max_attempts
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Returns how many seconds to wait before sending the next attempt.
+
+        Parameters
+        ----------
+        attempt
+            How many times the request has been sent.
+        headers
+            The headers of the failed response, if any.
+        """
+        retry_after = _retry_after(headers) if headers is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        delay = min(self.backoff_factor * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def sleep(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Waits for `delay` seconds.
+        """
+        time.sleep(self.delay(attempt, headers))
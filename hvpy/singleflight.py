@@ -0,0 +1,120 @@
+import copy
+import asyncio
+import threading
+from typing import Any, Dict, TypeVar, Callable, Hashable, Awaitable
+from concurrent.futures import Future
+
+__all__ = ["AsyncSingleFlight", "SingleFlight"]
+
+T = TypeVar("T")
+
+
+def _share(result: T) -> T:
+    """
+    Copies mutable results, so that callers sharing them cannot affect each
+    other.
+    """
+    if isinstance(result, (dict, list)):
+        return copy.deepcopy(result)
+    return result
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls made concurrently by several threads.
+
+    The first thread to make a call runs it, the threads making the same
+    call while it is in flight wait for it and share its result, or its
+    exception. Calls made after it has finished run again. ``shared``
+    counts the calls that were served by a call already in flight.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: Dict[Hashable, "Future[Any]"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Runs ``fn``, unless a call with the same ``key`` is in flight.
+
+        Parameters
+        ----------
+        key
+            Identifies the call.
+        fn
+            Makes the call.
+
+        Returns
+        -------
+        The result of ``fn``, copied for the callers that shared it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return _share(future.result())
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical calls made concurrently by several coroutines.
+
+    Works like `SingleFlight`, for the coroutines of a single event loop.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Awaits ``fn()``, unless a call with the same ``key`` is in flight.
+
+        Parameters
+        ----------
+        key
+            Identifies the call.
+        fn
+            Makes the call.
+
+        Returns
+        -------
+        The result of ``fn()``, copied for the callers that shared it.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            # Followers being cancelled must not cancel the call itself.
+            return _share(await asyncio.shield(future))
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting, which asyncio would log.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
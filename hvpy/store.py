@@ -0,0 +1,201 @@
+import os
+import tempfile
+import threading
+from typing import Dict, Union, Optional
+from pathlib import Path
+from collections import OrderedDict
+
+from hvpy.io import HvpyParameters
+
+__all__ = ["DiskStore", "get_store", "set_store"]
+
+
+def _shard(value: Union[int, str]) -> str:
+    """
+    Spreads entries over 100 sub-directories so none of them grows too large.
+    """
+    return f"{value:>02}"[-2:]
+
+
+class DiskStore:
+    """
+    Persistent on-disk store for immutable API responses.
+
+    The XML headers and tiles of an image never change once published, so
+    they can be kept on disk and reused across runs:
+
+    * ``getJP2Header`` responses are stored under ``headers/<shard>/<id>.xml``.
+    * ``getTile`` responses are stored under ``tiles/<shard>/<id>/<imageScale>_<x>_<y>.png``.
+
+    ``getJP2Image`` is addressed by date and returns the closest image,
+    which changes as images are ingested, so it is not stored. Neither are
+    other endpoints, nor requests wrapped in a ``callback``. Files are
+    written atomically and the least recently used ones are deleted once
+    the store outgrows ``max_bytes``. The files already in ``directory``
+    are only listed once something is stored.
+
+    Parameters
+    ----------
+    directory
+        Directory to keep the files in, created if needed.
+    max_bytes
+        Maximum total size of the stored files, in bytes.
+        Default is 10 GiB.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 10 * 1024**3):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes: "Optional[OrderedDict[Path, int]]" = None
+        self._nbytes = 0
+
+    def _index(self) -> "OrderedDict[Path, int]":
+        """
+        Returns the sizes of the stored files, least recently used first,
+        listing the directory the first time.
+
+        Must be called with the lock held.
+        """
+        if self._sizes is None:
+            files = []
+            for path in self.directory.rglob("*"):
+                if path.suffix != ".tmp" and path.is_file():
+                    info = path.stat()
+                    files.append((info.st_mtime, path, info.st_size))
+            self._sizes = OrderedDict((path, size) for _, path, size in sorted(files))
+            self._nbytes = sum(self._sizes.values())
+        return self._sizes
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Total size of the stored files, in bytes.
+        """
+        with self._lock:
+            self._index()
+            return self._nbytes
+
+    def path(self, input_parameters: HvpyParameters) -> Optional[Path]:
+        """
+        Returns where the response for these parameters is stored, or `None` if
+        it is not stored.
+        """
+        params = input_parameters.model_dump()
+        endpoint = input_parameters.endpoint
+        if endpoint == "getJP2Header" and params["callback"] is None:
+            return self.directory / "headers" / _shard(params["id"]) / f"{params['id']}.xml"
+        if endpoint == "getTile" and all(params[k] is None for k in ("difference", "diffCount", "diffTime")):
+            name = f"{params['imageScale']}_{params['x']}_{params['y']}.png"
+            return self.directory / "tiles" / _shard(params["id"]) / str(params["id"]) / name
+        return None
+
+    def get(self, input_parameters: HvpyParameters) -> Optional[bytes]:
+        """
+        Returns the stored response for these parameters, or `None`.
+        """
+        path = self.path(input_parameters)
+        try:
+            data = path.read_bytes()
+        except (AttributeError, FileNotFoundError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # The modification time doubles as the last access time for eviction.
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+            if self._sizes is not None:
+                # Files written by another process are not accounted for yet.
+                self._nbytes += len(data) - self._sizes.pop(path, 0)
+                self._sizes[path] = len(data)
+                self._evict()
+        return data
+
+    def put(self, input_parameters: HvpyParameters, data: bytes) -> Optional[Path]:
+        """
+        Stores the response for these parameters.
+
+        Returns
+        -------
+        Optional[`~pathlib.Path`]
+            Where the data was stored, `None` if these parameters are not stored.
+        """
+        path = self.path(input_parameters)
+        if path is None or len(data) > self.max_bytes:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            sizes = self._index()
+            self._nbytes += len(data) - sizes.pop(path, 0)
+            sizes[path] = len(data)
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        while self._nbytes > self.max_bytes and self._sizes:
+            path, size = self._sizes.popitem(last=False)
+            self._nbytes -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Deletes every stored file.
+        """
+        with self._lock:
+            sizes = self._index()
+            for path in sizes:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            sizes.clear()
+            self._nbytes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of hits, misses, files and bytes stored.
+        """
+        with self._lock:
+            files = len(self._index())
+            return {"hits": self.hits, "misses": self.misses, "files": files, "bytes": self._nbytes}
+
+
+_store: Optional[DiskStore] = None
+
+
+def get_store() -> Optional[DiskStore]:
+    """
+    Returns the store API calls consult, `None` if there is none.
+    """
+    return _store
+
+
+def set_store(store: Optional[DiskStore]) -> None:
+    """
+    Sets the store consulted by ``getJP2Header`` and ``getTile``.
+
+    There is no store by default.
+
+    Parameters
+    ----------
+    store : `hvpy.store.DiskStore`
+        The store to use, `None` to stop using one.
+    """
+    global _store
+    _store = store
@@ -0,0 +1,4 @@
+"""
+Tools to test and benchmark code using ``hvpy`` without network access.
+"""
+from .server import MockServer, make_jp2
@@ -0,0 +1,270 @@
+"""
+Benchmarks of ``hvpy`` against a local `hvpy.testing.MockServer`.
+
+Run them with::
+
+    python -m hvpy.testing.benchmarks
+
+Every benchmark talks to a fresh server over the loopback interface, so
+the results measure the overhead of the client and not the network.
+"""
+import io
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from typing import Any, List, Callable, Iterator, Optional, NamedTuple
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from hvpy.batch import MovieBatch, createScreenshots, getTiles, screenshot_grid
+from hvpy.client import Client, set_client
+from hvpy.config import get_api_url, set_api_url
+from hvpy.core import download_api_call, execute_api_call
+from hvpy.datasource import DataSource
+from hvpy.parameters import getClosestImageInputParameters, getJP2ImageInputParameters
+from hvpy.polling import FixedPolling
+from hvpy.retry import RetryPolicy
+from hvpy.testing.server import MockServer
+
+__all__ = ["BenchmarkResult", "BENCHMARKS", "main", "run"]
+
+_START = datetime(2022, 1, 1)
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    Timings of a benchmark.
+    """
+
+    name: str
+    """
+    Name of the benchmark.
+    """
+    seconds: float
+    """
+    Wall-clock duration of the whole benchmark.
+    """
+    latencies: List[float]
+    """
+    Duration of each operation, in seconds.
+    """
+    nbytes: int
+    """
+    Number of bytes received.
+    """
+
+    @property
+    def throughput(self) -> float:
+        """
+        Operations per second.
+        """
+        return len(self.latencies) / self.seconds if self.seconds else float("inf")
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the ``q``-th percentile (between 0 and 100) of the latencies.
+        """
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)] if ordered else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<16} {len(self.latencies):>6} ops {self.throughput:>10.1f} ops/s "
+            f"p50 {1000 * self.percentile(50):>8.2f} ms  p95 {1000 * self.percentile(95):>8.2f} ms  "
+            f"{self.nbytes / self.seconds / 1024**2 if self.seconds else 0:>8.1f} MiB/s"
+        )
+
+
+@contextlib.contextmanager
+def _serving(**options: Any) -> Iterator[MockServer]:
+    """
+    Points ``hvpy`` to a fresh mock server with a fresh client.
+    """
+    api_url = get_api_url()
+    client = Client(pool_maxsize=32, retry=RetryPolicy(backoff_factor=0))
+    with MockServer(**options) as server:
+        set_api_url(server.url)
+        set_client(client)
+        try:
+            yield server
+        finally:
+            set_client(None)
+            set_api_url(api_url)
+            client.close()
+
+
+def _timed(name: str, operations: List[Callable[[], int]], concurrency: int = 1) -> BenchmarkResult:
+    """
+    Runs the operations, each returning the number of bytes received.
+    """
+    latencies: List[float] = []
+    nbytes = 0
+
+    def timed(operation: Callable[[], int]) -> int:
+        start = time.perf_counter()
+        received = operation()
+        latencies.append(time.perf_counter() - start)
+        return received
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        nbytes = sum(timed(operation) for operation in operations)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            nbytes = sum(executor.map(timed, operations))
+    return BenchmarkResult(name, time.perf_counter() - start, latencies, nbytes)
+
+
+def single_calls(scale: float = 1) -> BenchmarkResult:
+    """
+    Sequential ``getClosestImage`` calls.
+    """
+    with _serving():
+        dates = [_START + timedelta(minutes=i) for i in range(int(500 * scale) or 1)]
+        operations = [
+            lambda date=date: len(
+                str(execute_api_call(getClosestImageInputParameters(date=date, sourceId=DataSource.AIA_171)))
+            )
+            for date in dates
+        ]
+        return _timed("single calls", operations)
+
+
+def concurrent_calls(scale: float = 1) -> BenchmarkResult:
+    """
+    Concurrent ``getClosestImage`` calls, with 5 ms of server latency.
+    """
+    with _serving(latency=0.005):
+        dates = [_START + timedelta(minutes=i) for i in range(int(500 * scale) or 1)]
+        operations = [
+            lambda date=date: len(
+                str(execute_api_call(getClosestImageInputParameters(date=date, sourceId=DataSource.AIA_171)))
+            )
+            for date in dates
+        ]
+        return _timed("concurrent calls", operations, concurrency=16)
+
+
+def tiles(scale: float = 1) -> BenchmarkResult:
+    """
+    Mosaics of 16 tiles of 64 KiB with `hvpy.batch.getTiles`.
+    """
+    with _serving(latency=0.002):
+        operations = [
+            lambda i=i: sum(map(len, getTiles(id=i, imageScale=2, viewport=(-2048, -2048, 2048, 2048)).values()))
+            for i in range(int(20 * scale) or 1)
+        ]
+        return _timed("tiles", operations)
+
+
+def movies(scale: float = 1) -> BenchmarkResult:
+    """
+    Movies taking 0.2 s to be created, orchestrated by `hvpy.batch.MovieBatch`.
+    """
+    with _serving(movie_delay=0.2, payload_size=256 * 1024), tempfile.TemporaryDirectory() as directory:
+        count = int(20 * scale) or 1
+        start = time.perf_counter()
+        with MovieBatch(directory, max_workers=8, polling=FixedPolling(0.05)) as batch:
+            futures = [
+                batch.add(
+                    startTime=_START + timedelta(days=i),
+                    endTime=_START + timedelta(days=i, hours=1),
+                    layers="[10,1,100]",
+                    events="",
+                    eventsLabels=False,
+                    imageScale=1,
+                )
+                for i in range(count)
+            ]
+            paths = [future.result() for future in futures]
+        seconds = time.perf_counter() - start
+        nbytes = sum(path.stat().st_size for path in paths)
+        # Individual movies are not timed, report the average.
+        return BenchmarkResult("movies", seconds, [seconds / count] * count, nbytes)
+
+
+def screenshots(scale: float = 1) -> BenchmarkResult:
+    """
+    Screenshots of 256 KiB taking 20 ms to be rendered, pipelined by
+    `hvpy.batch.createScreenshots`.
+    """
+    with _serving(latency=0.02, payload_size=256 * 1024), tempfile.TemporaryDirectory() as directory:
+        count = int(200 * scale) or 1
+        dates = [_START + timedelta(hours=i) for i in range(count)]
+        grid = screenshot_grid(dates, "[10,1,100]", imageScale=2.4)
+        start = time.perf_counter()
+        paths = [path for _, path in createScreenshots(grid, directory, max_workers=16)]
+        seconds = time.perf_counter() - start
+        nbytes = sum(path.stat().st_size for path in paths)
+        # Individual screenshots are not timed, report the average.
+        return BenchmarkResult("screenshots", seconds, [seconds / count] * count, nbytes)
+
+
+def downloads(scale: float = 1) -> BenchmarkResult:
+    """
+    Streaming downloads of 16 MiB JPEG2000 images with
+    `hvpy.core.download_api_call`.
+    """
+    with _serving(payload_size=16 * 1024**2):
+        operations = []
+        for i in range(int(10 * scale) or 1):
+            params = getJP2ImageInputParameters(date=_START + timedelta(minutes=i), sourceId=DataSource.AIA_171)
+
+            def operation(params=params) -> int:
+                sink = io.BytesIO()
+                download_api_call(params, sink)
+                return sink.tell()
+
+            operations.append(operation)
+        return _timed("downloads", operations)
+
+
+BENCHMARKS = {
+    "single": single_calls,
+    "concurrent": concurrent_calls,
+    "tiles": tiles,
+    "movies": movies,
+    "screenshots": screenshots,
+    "downloads": downloads,
+}
+"""
+The available benchmarks, by name.
+"""
+
+
+def run(names: Optional[List[str]] = None, scale: float = 1) -> List[BenchmarkResult]:
+    """
+    Runs benchmarks.
+
+    Parameters
+    ----------
+    names
+        Names of the benchmarks to run, from `BENCHMARKS`.
+        Default is `None` (all of them), optional.
+    scale
+        Multiplies the number of operations of every benchmark.
+        Default is 1.
+    """
+    return [BENCHMARKS[name](scale) for name in names or BENCHMARKS]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(prog="python -m hvpy.testing.benchmarks", description=__doc__.split("\n")[1])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, among {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--scale", type=float, default=1, help="multiplies the number of operations")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        print(BENCHMARKS[name](args.scale), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
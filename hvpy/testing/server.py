@@ -0,0 +1,379 @@
+import re
+import json
+import math
+import time
+import random
+import struct
+import threading
+from typing import Any, Dict, Tuple, Union, Optional
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+from hvpy.datasource import DataSource
+
+__all__ = ["MockServer", "make_jp2"]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def make_jp2(header: str, size: int = 0) -> bytes:
+    """
+    Builds a JPEG2000 file holding an XML header.
+
+    The codestream is filler, so the file can only be used to test reading
+    and transferring images.
+
+    Parameters
+    ----------
+    header
+        The XML header, stored in an ``xml `` box.
+    size
+        Minimum size of the file in bytes, reached by padding the codestream.
+        Default is 0.
+    """
+
+    def box(kind: bytes, contents: bytes) -> bytes:
+        return struct.pack(">I4s", len(contents) + 8, kind) + contents
+
+    head = box(b"jP  ", b"\r\n\x87\n") + box(b"ftyp", b"jp2 \0\0\0\0jp2 ") + box(b"xml ", header.encode())
+    return head + box(b"jp2c", b"\xff\x4f" + b"\0" * max(size - len(head) - 10, 0))
+
+
+def _bool(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("1", "true")
+
+
+def _date(value: str) -> datetime:
+    return datetime.strptime(value.rstrip("Z")[:19], "%Y-%m-%dT%H:%M:%S")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are sent separately, which Nagle's algorithm would delay.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.server.mock._handle(self)
+
+
+class MockServer:
+    """
+    Local stand-in for the Helioviewer API.
+
+    Serves every endpoint used by `hvpy` on a local port, with synthetic but
+    consistent responses, so that the client can be tested and benchmarked
+    without network access. The server runs in background threads, use it as
+    a context manager or call `start` and `stop`. The number of requests
+    received per endpoint is counted in ``requests``.
+
+    Parameters
+    ----------
+    latency
+        Seconds to wait before answering each request.
+        Default is 0.
+    payload_size
+        Size in bytes of JPEG2000 images, movies and screenshots.
+        Default is 1 MiB.
+    tile_size
+        Size in bytes of tiles.
+        Default is 64 KiB.
+    error_rate
+        Fraction of requests answered with a ``503`` error.
+        Default is 0.
+    movie_delay
+        Seconds a movie takes to be created after being queued.
+        Default is 1.
+    cadence
+        Seconds between two images of a datasource.
+        Default is 12.
+    seed
+        Seed of the random errors.
+        Default is `None`, optional.
+
+    Examples
+    --------
+    >>> from datetime import datetime
+    >>> import hvpy
+    >>> from hvpy.config import get_api_url
+    >>> from hvpy.testing import MockServer
+    >>> api_url = get_api_url()
+    >>> with MockServer() as server:
+    ...     hvpy.set_api_url(server.url)
+    ...     hvpy.getClosestImage(date=datetime(2022, 1, 1), sourceId=hvpy.DataSource.AIA_171)["date"]
+    '2022-01-01 00:00:00'
+    >>> hvpy.set_api_url(api_url)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        payload_size: int = 1024 * 1024,
+        tile_size: int = 64 * 1024,
+        error_rate: float = 0,
+        movie_delay: float = 1,
+        cadence: int = 12,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.payload_size = payload_size
+        self.tile_size = tile_size
+        self.error_rate = error_rate
+        self.movie_delay = movie_delay
+        self.cadence = cadence
+        self.requests: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._movies: Dict[str, float] = {}
+        self._screenshots = 0
+        self._payloads: Dict[Tuple[str, int], bytes] = {}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the API, to pass to `hvpy.set_api_url`.
+        """
+        if self._httpd is None:
+            raise RuntimeError("The server is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v2/"
+
+    def start(self) -> "MockServer":
+        """
+        Starts serving on a free local port.
+        """
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="hvpy-mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving.
+        """
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = self._thread = None
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlsplit(request.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_{endpoint}", None)
+        if fail:
+            status, body, content_type = 503, b"Service Unavailable", "text/plain"
+        elif handler is None:
+            status, body, content_type = 404, b"Unknown endpoint", "text/plain"
+        else:
+            try:
+                status, body, content_type = self._render(handler(query), query)
+            except (KeyError, ValueError) as e:
+                status, body, content_type = 400, json.dumps({"error": f"Invalid request: {e}"}).encode(), "text/plain"
+        headers = {"Content-Type": content_type, "Accept-Ranges": "bytes"}
+        match = re.match(r"bytes=(\d+)-$", request.headers.get("Range", ""))
+        if status == 200 and match:
+            start = int(match.group(1))
+            if start >= len(body):
+                status, headers["Content-Range"], body = 416, f"bytes */{len(body)}", b""
+            else:
+                status, headers["Content-Range"] = 206, f"bytes {start}-{len(body) - 1}/{len(body)}"
+                body = body[start:]
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    @staticmethod
+    def _render(result: Union[bytes, str, Dict[str, Any], list], query: Dict[str, str]) -> Tuple[int, bytes, str]:
+        callback = query.get("callback")
+        if isinstance(result, bytes):
+            return 200, result, "application/octet-stream"
+        if isinstance(result, str):
+            if callback:
+                escaped = result.replace("'", "\\'")
+                result = f"{callback}('{escaped}')"
+            return 200, result.encode(), "text/xml" if result.startswith("<") else "text/plain"
+        text = json.dumps(result)
+        if callback:
+            return 200, f"{callback}({text})".encode(), "application/javascript"
+        return 200, text.encode(), "application/json"
+
+    def _payload(self, kind: str, size: int) -> bytes:
+        # Payloads are built once per size, as they can be large.
+        key = (kind, size)
+        if key not in self._payloads:
+            self._payloads[key] = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        return self._payloads[key]
+
+    def _image(self, sourceId: int, date: datetime) -> Dict[str, Any]:
+        """
+        Returns the image of a datasource closest to a date.
+        """
+        step = round((date - _EPOCH).total_seconds() / self.cadence)
+        observed = _EPOCH + timedelta(seconds=step * self.cadence)
+        return {
+            "id": str(sourceId * 10**9 + step % 10**9),
+            "date": observed.strftime("%Y-%m-%d %H:%M:%S"),
+            "name": DataSource(sourceId).name.replace("_", " "),
+            "scale": 0.6,
+            "width": 4096,
+            "height": 4096,
+            "refPixelX": 2048.5,
+            "refPixelY": 2048.5,
+            "rsun": 1600.0,
+            "sunCenterOffsetParams": [],
+            "layeringOrder": 1,
+        }
+
+    @staticmethod
+    def _header(image: Dict[str, Any], sourceId: int) -> str:
+        name = DataSource(sourceId).name.split("_")
+        fits = {
+            "NAXIS1": image["width"],
+            "NAXIS2": image["height"],
+            "DATE-OBS": image["date"].replace(" ", "T") + ".000Z",
+            "TELESCOP": name[0],
+            "INSTRUME": name[0],
+            "DETECTOR": name[-2] if len(name) > 2 else name[0],
+            "WAVELNTH": name[-1],
+            "CDELT1": image["scale"],
+            "CDELT2": image["scale"],
+            "CRPIX1": image["refPixelX"],
+            "CRPIX2": image["refPixelY"],
+            "RSUN_OBS": 960.0,
+        }
+        cards = "".join(f"<{key}>{value}</{key}>" for key, value in fits.items())
+        return f'<?xml version="1.0" encoding="utf-8"?><meta><fits>{cards}</fits><helioviewer><HV_ROTATION>0.0</HV_ROTATION></helioviewer></meta>'
+
+    def _frames(self, start: datetime, end: datetime, cadence: Optional[str]) -> list:
+        step = max(int(cadence or self.cadence), 1)
+        first = math.ceil((start - _EPOCH).total_seconds() / step) * step
+        return list(range(first, int((end - _EPOCH).total_seconds()) + 1, step))
+
+    def _getClosestImage(self, query: Dict[str, str]) -> Dict[str, Any]:
+        return self._image(int(query["sourceId"]), _date(query["date"]))
+
+    def _getJP2Header(self, query: Dict[str, str]) -> str:
+        source, step = divmod(int(query["id"]), 10**9)
+        return self._header(self._image(source, _EPOCH + timedelta(seconds=step * self.cadence)), source)
+
+    def _getJP2Image(self, query: Dict[str, str]) -> Union[bytes, str, Dict[str, Any]]:
+        source = int(query["sourceId"])
+        image = self._image(source, _date(query["date"]))
+        if _bool(query.get("jpip")):
+            uri = f"jpip://127.0.0.1:8090/{source}/{image['id']}.jp2"
+            return {"uri": uri} if _bool(query.get("json")) else uri
+        key = ("jp2", image["id"])
+        if key not in self._payloads:
+            self._payloads[key] = make_jp2(self._header(image, source), self.payload_size)
+        return self._payloads[key]
+
+    def _getJPX(self, query: Dict[str, str]) -> Union[bytes, str, Dict[str, Any]]:
+        frames = self._frames(_date(query["startTime"]), _date(query["endTime"]), query.get("cadence"))
+        return self._jpx(query, frames)
+
+    def _getJPXClosestToMidPoint(self, query: Dict[str, str]) -> Union[bytes, str, Dict[str, Any]]:
+        starts = [int(t) for t in query["startTimes"].split(",")]
+        ends = [int(t) for t in query["endTimes"].split(",")]
+        frames = [(start + end) // 2 // self.cadence * self.cadence for start, end in zip(starts, ends)]
+        return self._jpx(query, frames)
+
+    def _jpx(self, query: Dict[str, str], frames: list) -> Union[bytes, str, Dict[str, Any]]:
+        uri = f"jpip://127.0.0.1:8090/movies/{query['sourceId']}_{frames[0] if frames else 0}.jpx"
+        if _bool(query.get("verbose")):
+            return {"message": None, "uri": uri, "frameRate": 15, "numFrames": len(frames), "frames": frames}
+        if _bool(query.get("jpip")):
+            return uri
+        return self._payload("jpx", self.payload_size)
+
+    def _getStatus(self, query: Dict[str, str]) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {name: {"time": now, "level": 1, "secondsBehind": 60, "measurement": name} for name in ("AIA", "HMI")}
+
+    def _getDataSources(self, query: Dict[str, str]) -> Dict[str, Any]:
+        tree: Dict[str, Any] = {}
+        for order, source in enumerate(DataSource, 1):
+            *path, leaf = source.name.split("_")
+            node = tree
+            for part in path:
+                node = node.setdefault(part, {})
+            node[leaf] = {
+                "sourceId": source.value,
+                "nickname": source.name.replace("_", " "),
+                "layeringOrder": order,
+                "start": "2010-06-02 00:05:39",
+                "end": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        return tree
+
+    def _takeScreenshot(self, query: Dict[str, str]) -> Union[bytes, Dict[str, Any]]:
+        if _bool(query.get("display")):
+            return self._payload("png", self.payload_size)
+        with self._lock:
+            self._screenshots += 1
+            return {"id": self._screenshots}
+
+    def _downloadScreenshot(self, query: Dict[str, str]) -> bytes:
+        return self._payload("png", self.payload_size)
+
+    def _getTile(self, query: Dict[str, str]) -> bytes:
+        return self._payload("tile", self.tile_size)
+
+    def _queueMovie(self, query: Dict[str, str]) -> Dict[str, Any]:
+        with self._lock:
+            movie = f"m{len(self._movies) + 1}"
+            self._movies[movie] = time.monotonic()
+        return {"id": movie, "eta": self.movie_delay, "queue": 0, "token": f"token-{movie}"}
+
+    def _reQueueMovie(self, query: Dict[str, str]) -> Dict[str, Any]:
+        with self._lock:
+            if query["id"] not in self._movies:
+                return {"error": f"Unknown movie {query['id']}"}
+            self._movies[query["id"]] = time.monotonic()
+        return {"id": query["id"], "eta": self.movie_delay, "queue": 0, "token": f"token-{query['id']}"}
+
+    def _getMovieStatus(self, query: Dict[str, str]) -> Dict[str, Any]:
+        queued = self._movies.get(query["id"])
+        if queued is None:
+            return {"status": 3, "error": f"Unknown movie {query['id']}"}
+        elapsed = time.monotonic() - queued
+        if elapsed >= self.movie_delay:
+            return {"status": 2, "title": f"movie_{query['id']}", "frameRate": 15, "numFrames": 30}
+        status = {"status": 0 if elapsed < self.movie_delay / 2 else 1}
+        if _bool(query.get("verbose")):
+            status.update(eta=self.movie_delay - elapsed, progress=elapsed / self.movie_delay)
+        return status
+
+    def _downloadMovie(self, query: Dict[str, str]) -> bytes:
+        queued = self._movies.get(query["id"])
+        if queued is None or time.monotonic() - queued < self.movie_delay:
+            raise ValueError(f"Movie {query['id']} is not ready")
+        return self._payload("movie", self.payload_size)
+
+    def _getNewsFeed(self, query: Dict[str, str]) -> str:
+        return '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Helioviewer</title></channel></rss>'
+
+    def _shortenURL(self, query: Dict[str, str]) -> Dict[str, Any]:
+        return {"status_code": 200, "data": {"url": f"http://hlvwr.org/{abs(hash(query['queryString'])) % 10**6}"}}
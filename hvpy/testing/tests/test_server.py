@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+import requests
+
+import hvpy
+from hvpy.client import Client, set_client
+from hvpy.config import get_api_url
+from hvpy.jp2 import parse_jp2_header
+from hvpy.polling import FixedPolling
+from hvpy.retry import RetryPolicy
+from hvpy.testing import MockServer
+from hvpy.testing.benchmarks import BENCHMARKS, main, run
+
+
+@pytest.fixture
+def server():
+    api_url = get_api_url()
+    with MockServer(movie_delay=0.05, payload_size=10_000, tile_size=100, seed=0) as server:
+        hvpy.set_api_url(server.url)
+        set_client(Client(retry=RetryPolicy(backoff_factor=0)))
+        yield server
+        set_client(None)
+        hvpy.set_api_url(api_url)
+
+
+def test_images(server):
+    image = hvpy.getClosestImage(date=datetime(2022, 1, 1, 0, 0, 7), sourceId=hvpy.DataSource.AIA_171)
+    assert image["date"] == "2022-01-01 00:00:12"
+    header = parse_jp2_header(hvpy.getJP2Header(id=int(image["id"])))
+    assert header.date == datetime(2022, 1, 1, 0, 0, 12)
+    assert header.wavelength == 171
+    jp2 = hvpy.getJP2Image(date=datetime(2022, 1, 1, 0, 0, 7), sourceId=hvpy.DataSource.AIA_171)
+    assert len(jp2) >= 10_000
+    assert hvpy.read_jp2_header(jp2) == hvpy.getJP2Header(id=int(image["id"]))
+    assert hvpy.getJP2Image(date=datetime(2022, 1, 1), sourceId=10, jpip=True).startswith("jpip://")
+    assert len(hvpy.getTile(id=1, x=0, y=0, imageScale=2)) == 100
+    assert hvpy.getJP2Header(id=1, callback="f").startswith("f('<?xml")
+
+
+def test_jpx(server):
+    jpx = hvpy.getJPX(startTime=datetime(2022, 1, 1), endTime=datetime(2022, 1, 1, 0, 1), sourceId=10, verbose=True)
+    assert jpx["frames"] == [1640995200 + 12 * i for i in range(6)]
+    assert len(hvpy.getJPX(startTime=datetime(2022, 1, 1), endTime=datetime(2022, 1, 1, 0, 1), sourceId=10)) == 10_000
+
+
+def test_other_endpoints(server):
+    assert hvpy.getDataSources()["AIA"]["171"]["sourceId"] == 10
+    assert set(hvpy.getStatus()) == {"AIA", "HMI"}
+    assert hvpy.getNewsFeed().startswith("<?xml")
+    assert hvpy.shortenURL(queryString="date=2022-01-01")["status_code"] == 200
+
+
+def test_movies_and_screenshots(server, tmp_path):
+    movie = hvpy.createMovie(
+        startTime=datetime(2022, 1, 1),
+        endTime=datetime(2022, 1, 1, 1),
+        layers="[10,1,100]",
+        events="",
+        eventsLabels=False,
+        imageScale=1,
+        filename=tmp_path / "movie",
+        polling=FixedPolling(0.01),
+    )
+    assert movie.stat().st_size == 10_000
+    assert server.requests["queueMovie"] == 1
+    assert server.requests["getMovieStatus"] >= 1
+    screenshot = hvpy.createScreenshot(
+        date=datetime(2022, 1, 1),
+        layers="[10,1,100]",
+        events="",
+        eventLabels=False,
+        imageScale=1,
+        filename=tmp_path / "s",
+    )
+    assert screenshot.stat().st_size == 10_000
+
+
+def test_errors_and_ranges(server):
+    server.error_rate = 1
+    with pytest.raises(requests.HTTPError, match="503"):
+        hvpy.getStatus()
+    assert server.requests["getStatus"] == 4
+    server.error_rate = 0
+    response = requests.get(server.url + "getTile/?id=1&x=0&y=0&imageScale=2", headers={"Range": "bytes=40-"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == "bytes 40-99/100"
+    assert len(response.content) == 60
+    assert requests.get(server.url + "unknown/").status_code == 404
+
+
+def test_latency():
+    with MockServer(latency=0.05) as server:
+        response = requests.get(server.url + "getStatus/")
+    assert response.elapsed.total_seconds() >= 0.05
+
+
+def test_benchmarks(capsys):
+    api_url = get_api_url()
+    results = run(scale=0.01)
+    assert [result.name for result in results] == [
+        "single calls",
+        "concurrent calls",
+        "tiles",
+        "movies",
+        "screenshots",
+        "downloads",
+    ]
+    assert all(result.latencies and result.throughput > 0 for result in results)
+    assert get_api_url() == api_url
+    assert main(["single", "--scale", "0.01"]) == 0
+    assert "single calls" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["unknown"])
+    assert set(BENCHMARKS) == {"single", "concurrent", "tiles", "movies", "screenshots", "downloads"}
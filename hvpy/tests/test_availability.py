@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from hvpy import DataSource, getClosestImage, getJP2Image, getTile
+from hvpy.availability import AvailabilityIndex, get_availability, set_availability
+from hvpy.parameters import getClosestImageInputParameters
+from hvpy.registry import DataSourceRegistry
+
+
+def source(sourceId, nickname, instrument, detector, start, end):
+    return {
+        "sourceId": sourceId,
+        "nickname": nickname,
+        "start": start,
+        "end": end,
+        "uiLabels": [{"label": "Instrument", "name": instrument}, {"label": "Detector", "name": detector}],
+    }
+
+
+DATA_SOURCES = {
+    "SOHO": {
+        "EIT": {"171": source(0, "EIT 171", "EIT", "EIT", "1996-01-15 20:51:47", "2011-08-01 00:00:00")},
+        "LASCO": {"C2": {"white-light": source(4, "LASCO C2", "LASCO", "C2", "1995-12-08 00:00:00", None)}},
+    },
+    "SDO": {"AIA": {"171": source(10, "AIA 171", "AIA", "AIA", "2010-06-02 00:05:30", "2022-01-01 00:00:00")}},
+}
+STATUS = {
+    "AIA": {"time": "2022-01-02T00:00:00Z", "level": 1},
+    "LASCO-C2": {"time": "2022-01-03T00:00:00Z", "level": 1},
+}
+
+
+def endpoints(fake_api):
+    return [urlsplit(call.url).path.rstrip("/").rsplit("/", 1)[-1] for call in fake_api.calls]
+
+
+@pytest.fixture
+def index(fake_api):
+    fake_api.add("getDataSources", json_body=DATA_SOURCES)
+    fake_api.add("getStatus", json_body=STATUS)
+    fake_api.add("getClosestImage", json_body={"id": "1"})
+    index = AvailabilityIndex(DataSourceRegistry())
+    set_availability(index)
+    yield index
+    set_availability(None)
+
+
+def requested_dates(fake_api):
+    return [parse_qs(urlsplit(call.url).query)["date"][0] for call in fake_api.calls if "getClosestImage" in call.url]
+
+
+def test_window(index):
+    # Only getStatus tells when the last image is, getDataSources may be stale
+    assert index.window(DataSource.EIT_171) == (datetime(1996, 1, 15, 20, 51, 47), None)
+    assert index.window(10) == (datetime(2010, 6, 2, 0, 5, 30), datetime(2022, 1, 2))
+    assert index.window(4) == (datetime(1995, 12, 8), datetime(2022, 1, 3))
+    assert index.window(999) is None
+
+
+def test_clamp(fake_api, index):
+    getClosestImage(date=datetime(2020, 1, 1), sourceId=DataSource.EIT_171)
+    getClosestImage(date=datetime(1990, 1, 1), sourceId=DataSource.EIT_171)
+    getClosestImage(date=datetime(2000, 1, 1), sourceId=DataSource.EIT_171)
+    getClosestImage(date=datetime(2022, 1, 1, 12), sourceId=DataSource.AIA_171)
+    getClosestImage(date=datetime(2023, 1, 1), sourceId=DataSource.AIA_171)
+    assert requested_dates(fake_api) == [
+        "2020-01-01T00:00:00Z",
+        "1996-01-15T20:51:47Z",
+        "2000-01-01T00:00:00Z",
+        "2022-01-01T12:00:00Z",
+        "2022-01-02T00:00:00Z",
+    ]
+    assert index.clamped == 2
+    # The registry and the status are fetched once
+    assert endpoints(fake_api).count("getDataSources") == endpoints(fake_api).count("getStatus") == 1
+
+
+def test_reject(fake_api, index):
+    index.policy = "reject"
+    fake_api.add("getJP2Image", body=b"jp2")
+    with pytest.raises(ValueError, match="AIA 171 has no images after 2022-01-02 00:00:00"):
+        getClosestImage(date=datetime(2023, 1, 1), sourceId=DataSource.AIA_171)
+    with pytest.raises(ValueError, match="AIA 171 has no images before 2010-06-02 00:05:30"):
+        getJP2Image(date=datetime(2010, 1, 1), sourceId=DataSource.AIA_171)
+    assert getJP2Image(date=datetime(2020, 1, 1), sourceId=DataSource.AIA_171) == b"jp2"
+    assert index.rejected == 2
+    assert "getClosestImage" not in endpoints(fake_api)
+    assert endpoints(fake_api).count("getJP2Image") == 1
+
+
+def test_other_calls_are_left_to_the_api(fake_api, index):
+    fake_api.add("getTile", body=b"png")
+    getTile(id=7, x=0, y=0, imageScale=2)
+    # Sources the server does not list
+    getClosestImage(date=datetime(1990, 1, 1), sourceId=DataSource.AIA_94)
+    assert endpoints(fake_api) == ["getTile", "getDataSources", "getClosestImage"]
+    assert index.clamped == 0
+
+
+def test_without_status(fake_api):
+    fake_api.add("getDataSources", json_body=DATA_SOURCES)
+    fake_api.add("getStatus", status=404)
+    index = AvailabilityIndex(DataSourceRegistry(), status_ttl=timedelta(hours=1))
+    params = getClosestImageInputParameters(date=datetime(2030, 1, 1), sourceId=10)
+    # Without getStatus, the last image of a source is not known
+    assert index.window(10) == (datetime(2010, 6, 2, 0, 5, 30), None)
+    assert index.check(params) is params
+    assert endpoints(fake_api).count("getStatus") == 1
+
+
+def test_without_registry(fake_api):
+    fake_api.add("getDataSources", status=404)
+    index = AvailabilityIndex(DataSourceRegistry(), policy="reject")
+    params = getClosestImageInputParameters(date=datetime(1990, 1, 1), sourceId=10)
+    assert index.check(params) is params
+
+
+def test_policy():
+    assert get_availability() is None
+    with pytest.raises(ValueError, match="policy must be"):
+        AvailabilityIndex(policy="skip")
@@ -0,0 +1,308 @@
+import io
+import sys
+import json
+import math
+import threading
+from datetime import datetime, timezone, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import hvpy.batch
+from hvpy import DataSource
+from hvpy.batch import (
+    MovieBatch,
+    ScreenshotBatch,
+    createScreenshots,
+    getClosestFrames,
+    getClosestImages,
+    getTiles,
+    screenshot_grid,
+    stitchTiles,
+    tile_grid,
+)
+from hvpy.polling import FixedPolling
+
+
+def closest_image(request):
+    query = parse_qs(urlsplit(request.url).query)
+    # One image per source and minute
+    minute = query["date"][0][:16]
+    image_id = int(query["sourceId"][0]) * 10000 + int(minute[-2:])
+    body = {"id": str(image_id), "date": minute.replace("T", " ") + ":00", "width": 4096, "height": 2048}
+    return 200, json.dumps(body).encode(), {"Content-Type": "application/json"}
+
+
+def test_getClosestImages(fake_api):
+    fake_api.add("getClosestImage", closest_image)
+    dates = [datetime(2022, 1, 1, 0, 1, 5), datetime(2022, 1, 1, 0, 1, 10), datetime(2022, 1, 1, 0, 2)]
+    table = getClosestImages(dates, [DataSource.AIA_171, 11], concurrency=4)
+    assert table.requested == dates * 2
+    assert table.sourceIds == [10, 10, 10, 11, 11, 11]
+    assert table.ids == [100001, 100001, 100002, 110001, 110001, 110002]
+    assert table.dates[0] == datetime(2022, 1, 1, 0, 1)
+    assert table.widths == [4096] * 6
+    assert table.heights == [2048] * 6
+    assert len(fake_api.calls) == 6
+    unique = table.unique()
+    assert unique.ids == [100001, 100002, 110001, 110002]
+    assert unique.requested == [dates[0], dates[2], dates[0], dates[2]]
+
+
+def test_getClosestImages_deduplicates_requests(fake_api):
+    fake_api.add("getClosestImage", closest_image)
+    date = datetime(2022, 1, 1)
+    table = getClosestImages([date, date, date], DataSource.AIA_171)
+    assert table.ids == [100000] * 3
+    assert len(fake_api.calls) == 1
+
+
+def test_getClosestImages_errors(fake_api):
+    fake_api.add("getClosestImage", json_body={"error": "No images"})
+    with pytest.raises(RuntimeError, match="No images"):
+        getClosestImages([datetime(2022, 1, 1)], DataSource.AIA_171)
+    with pytest.raises(ValueError, match="999 is not a valid DataSource"):
+        getClosestImages([datetime(2022, 1, 1)], 999)
+
+
+def test_tile_grid():
+    assert tile_grid(1, (0, 0, 512, 512)) == [(0, 0)]
+    assert tile_grid(1, (-1, 0, 513, 1)) == [(-1, 0), (0, 0), (1, 0)]
+    assert len(tile_grid(2)) == 16
+    with pytest.raises(ValueError, match="Empty viewport"):
+        tile_grid(1, (10, 0, 10, 10))
+
+
+def tile(request):
+    query = parse_qs(urlsplit(request.url).query)
+    return 200, f"{query['x'][0]},{query['y'][0]}".encode(), {"Content-Type": "image/png"}
+
+
+def test_getTiles(fake_api):
+    fake_api.add("getTile", tile)
+    tiles = getTiles(id=7, imageScale=2, viewport=(-1000, -500, 1000, 500), difference=1)
+    assert tiles == {(-1, -1): b"-1,-1", (0, -1): b"0,-1", (-1, 0): b"-1,0", (0, 0): b"0,0"}
+    assert len(fake_api.calls) == 4
+    assert all(parse_qs(urlsplit(c.url).query)["difference"] == ["1"] for c in fake_api.calls)
+
+
+def test_stitchTiles():
+    Image = pytest.importorskip("PIL.Image")
+
+    def png(color):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (512, 512), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    tiles = {(-1, -1): png("red"), (0, -1): png("green"), (-1, 0): png("blue"), (0, 0): png("white")}
+    mosaic = stitchTiles(tiles)
+    assert mosaic.size == (1024, 1024)
+    assert mosaic.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert mosaic.getpixel((1023, 1023)) == (255, 255, 255, 255)
+    cropped = stitchTiles(tiles, imageScale=2, viewport=(-100, -100, 100, 50))
+    assert cropped.size == (100, 75)
+    assert cropped.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert cropped.getpixel((99, 74)) == (255, 255, 255, 255)
+
+
+def movie_server(fake_api, polls_before_done=2, fail=(), broken=()):
+    """
+    Fakes the movie endpoints, each movie being done after a few polls.
+    """
+    state = {"polls": {}}
+
+    def queue(request):
+        # Movies are named after the day they start on
+        day = int(parse_qs(urlsplit(request.url).query)["startTime"][0][8:10])
+        body = {"id": f"m{day}", "token": "t", "eta": 1}
+        return 200, json.dumps(body).encode(), {}
+
+    def status(request):
+        movie = parse_qs(urlsplit(request.url).query)["id"][0]
+        state["polls"][movie] = state["polls"].get(movie, 0) + 1
+        if movie in fail:
+            body = {"status": 3, "error": f"{movie} failed"}
+        elif movie in broken:
+            body = {"error": f"{movie} is unknown"}
+        elif state["polls"][movie] > polls_before_done:
+            body = {"status": 2, "title": f"title_{movie}"}
+        else:
+            body = {"status": 1}
+        return 200, json.dumps(body).encode(), {}
+
+    def download(request):
+        return 200, parse_qs(urlsplit(request.url).query)["id"][0].encode(), {}
+
+    fake_api.add("queueMovie", queue)
+    fake_api.add("getMovieStatus", status)
+    fake_api.add("downloadMovie", download)
+    return state
+
+
+def movie_params(day):
+    return dict(
+        startTime=datetime(2022, 1, day),
+        endTime=datetime(2022, 1, day, 0, 10),
+        layers="[10,1,100]",
+        events="",
+        eventsLabels=False,
+        imageScale=2,
+    )
+
+
+def test_movie_batch(fake_api, tmp_path):
+    state = movie_server(fake_api)
+    with MovieBatch(directory=tmp_path, polling=FixedPolling(0.01)) as batch:
+        movies = [batch.add(**movie_params(day)) for day in range(1, 6)]
+        named = batch.add(filename="named", **movie_params(6))
+    paths = [movie.result() for movie in movies]
+    assert sorted(paths) == sorted(tmp_path / f"title_m{i}.mp4" for i in range(1, 6))
+    assert named.result() == tmp_path / "named.mp4"
+    assert all(path.read_bytes() == path.stem[6:].encode() for path in paths)
+    assert state["polls"] == {f"m{i}": 3 for i in range(1, 7)}
+    assert len(batch.wait()) == 6
+
+
+def test_movie_batch_failures(fake_api, tmp_path):
+    movie_server(fake_api, polls_before_done=1000, fail=("m1",))
+    with MovieBatch(directory=tmp_path, polling=FixedPolling(0.01), timeout=0.005) as batch:
+        movies = [batch.add(**movie_params(day)) for day in range(1, 3)]
+    errors = sorted(str(movie.exception()) for movie in movies)
+    assert errors == ["Exceeded timeout of 0.005 minutes.", "m1 failed"]
+    with pytest.raises(RuntimeError, match="closed"):
+        batch.add(**movie_params(1))
+
+
+def test_movie_batch_status_errors(fake_api, tmp_path):
+    movie_server(fake_api, broken=("m1",))
+    with MovieBatch(directory=tmp_path, polling=FixedPolling(0.01)) as batch:
+        broken = batch.add(**movie_params(1))
+        movie = batch.add(**movie_params(2))
+    with pytest.raises(RuntimeError, match="m1 is unknown"):
+        broken.result(0)
+    # The other movies are still polled
+    assert movie.result(0) == tmp_path / "title_m2.mp4"
+
+
+def screenshot_server(fake_api, fail=()):
+    """
+    Fakes the screenshot endpoints, screenshots being named after their day and
+    layers.
+    """
+    downloaded = threading.Event()
+
+    def take(request):
+        query = parse_qs(urlsplit(request.url).query)
+        day = int(query["date"][0][8:10])
+        if day in fail:
+            return 200, json.dumps({"error": f"{day} failed"}).encode(), {}
+        if day == 2:
+            # Only rendered once another screenshot is being downloaded
+            assert downloaded.wait(5)
+        return 200, json.dumps({"id": day * 100 + len(query["layers"][0])}).encode(), {}
+
+    def download(request):
+        downloaded.set()
+        return 200, b"png" + parse_qs(urlsplit(request.url).query)["id"][0].encode(), {}
+
+    fake_api.add("takeScreenshot", take)
+    fake_api.add("downloadScreenshot", download)
+
+
+def test_screenshot_grid():
+    dates = [datetime(2022, 1, 1), datetime(2022, 1, 2)]
+    grid = screenshot_grid(dates, ["[10,1,100]", "[11,1,100]"], viewports=(-100, -100, 100, 100), imageScale=2)
+    assert len(grid) == 4
+    assert grid[1] == {
+        "imageScale": 2,
+        "date": dates[1],
+        "layers": "[10,1,100]",
+        "events": None,
+        "viewport": (-100, -100, 100, 100),
+    }
+    grid = screenshot_grid(dates, "[10,1,100]", events=["", "[AR,all,1]"], viewports=[None, (0, 0, 1, 1)])
+    assert len(grid) == 8
+    assert {spec["events"] for spec in grid} == {"", "[AR,all,1]"}
+
+
+def test_screenshot_batch(fake_api, tmp_path):
+    screenshot_server(fake_api)
+    with ScreenshotBatch(directory=tmp_path, max_workers=2) as batch:
+        first = batch.add(date=datetime(2022, 1, 1), layers="[10,1,100]", imageScale=2, viewport=(-10, -20, 30, 40))
+        second = batch.add(filename="named", date=datetime(2022, 1, 2), layers="[10,1,100]", imageScale=2)
+    assert first.result() == tmp_path / "110_2022-01-01.png"
+    assert first.result().read_bytes() == b"png110"
+    assert second.result() == tmp_path / "named.png"
+    query = parse_qs(urlsplit(fake_api.calls[0].url).query)
+    assert [query[k][0] for k in ("x1", "y1", "x2", "y2")] == ["-10", "-20", "30", "40"]
+    assert batch.wait() == [first.result(), second.result()]
+    with pytest.raises(RuntimeError, match="closed"):
+        batch.add(date=datetime(2022, 1, 1), layers="[10,1,100]", imageScale=2)
+
+
+def test_createScreenshots(fake_api, tmp_path):
+    screenshot_server(fake_api, fail=(3,))
+    grid = screenshot_grid([datetime(2022, 1, 1), datetime(2022, 1, 2)], ["[1,1,100]", "[10,1,100]"], imageScale=2)
+    results = list(createScreenshots(grid, directory=tmp_path, max_workers=4))
+    assert len(results) == 4
+    for spec, path in results:
+        assert path.name.startswith(f"{spec['date'].day * 100 + len(spec['layers'])}_")
+    with pytest.raises(RuntimeError, match="3 failed"):
+        list(createScreenshots(screenshot_grid([datetime(2022, 1, 3)], "[1,1,100]", imageScale=2), tmp_path))
+
+
+def jpx_server(fake_api, cadence=60):
+    """
+    Fakes verbose ``getJPX`` calls, with one image every ``cadence`` seconds.
+    """
+    ranges = []
+
+    def jpx(request):
+        query = parse_qs(urlsplit(request.url).query)
+        assert query["verbose"] == ["True"]
+        start, end = (
+            datetime.fromisoformat(query[key][0].rstrip("Z")).replace(tzinfo=timezone.utc).timestamp()
+            for key in ("startTime", "endTime")
+        )
+        ranges.append((start, end))
+        frames = list(range(math.ceil(start / cadence) * cadence, int(end) + 1, cadence))
+        return 200, json.dumps({"frames": frames, "numFrames": len(frames)}).encode(), {}
+
+    fake_api.add("getJPX", jpx)
+    return ranges
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_getClosestFrames(fake_api, monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    ranges = jpx_server(fake_api)
+    dates = [datetime(2022, 1, 1) + timedelta(seconds=7 * i) for i in range(2000)][::-1]
+    dates.append(datetime(2022, 1, 5))
+    frames = getClosestFrames(dates, DataSource.AIA_171, margin=timedelta(minutes=5))
+    # Earlier images win ties
+    assert frames == [datetime(2022, 1, 1) + timedelta(minutes=math.ceil(7 * i / 60 - 0.5)) for i in range(2000)][
+        ::-1
+    ] + [datetime(2022, 1, 5)]
+    # One range per day, requested concurrently
+    assert sorted(end - start for start, end in ranges) == [600, 7 * 1999 + 600]
+
+
+def test_getClosestFrames_splits_sampled_ranges(fake_api, monkeypatch):
+    monkeypatch.setattr(hvpy.batch, "JPX_MAX_FRAMES", 100)
+    ranges = jpx_server(fake_api)
+    dates = [datetime(2022, 1, 1) + timedelta(minutes=i) for i in range(300)]
+    assert getClosestFrames(dates, DataSource.AIA_171, margin=timedelta(0)) == dates
+    # 300 images are sampled, then 150 in each half, then 75 in each quarter.
+    assert len(ranges) == 7
+
+
+def test_getClosestFrames_falls_back_near_edges(fake_api):
+    jpx_server(fake_api, cadence=3 * 3600)
+    fake_api.add("getClosestImage", json_body={"date": "2022-01-01 03:00:00"})
+    dates = [datetime(2022, 1, 1, 1, 40), datetime(2022, 1, 1, 0, 20)]
+    frames = getClosestFrames(dates, DataSource.AIA_171, margin=timedelta(minutes=30))
+    # An image after 02:10, the end of the range, could be closer to 01:40 than the one at 00:00
+    assert frames == [datetime(2022, 1, 1, 3), datetime(2022, 1, 1)]
+    endpoints = [urlsplit(call.url).path.rstrip("/").rsplit("/", 1)[-1] for call in fake_api.calls]
+    assert endpoints == ["getJPX", "getClosestImage"]
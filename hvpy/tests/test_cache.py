@@ -0,0 +1,100 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hvpy import getClosestImage, getJP2Header, getStatus, queueMovie
+from hvpy.cache import MISSING, Cache, LRUCache, caching, get_cache, set_cache
+from hvpy.parameters import getJP2HeaderInputParameters, getStatusInputParameters
+
+
+@pytest.fixture
+def cache():
+    cache = LRUCache()
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+def test_caching_is_opt_in(fake_api):
+    assert get_cache() is None
+    fake_api.add("getStatus", json_body={})
+    getStatus()
+    getStatus()
+    assert len(fake_api.calls) == 2
+
+
+def test_cache_hits(fake_api, cache, date):
+    fake_api.add("getClosestImage", json_body={"id": "1"})
+    first = getClosestImage(date=date, sourceId=10)
+    first["id"] = "changed"
+    assert getClosestImage(date=date, sourceId=10) == {"id": "1"}
+    assert getClosestImage(date=date, sourceId=11) == {"id": "1"}
+    assert len(fake_api.calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_uncached_endpoints(fake_api, cache, start_time, end_time):
+    fake_api.add("queueMovie", json_body={"id": "abc"})
+    for _ in range(2):
+        queueMovie(startTime=start_time, endTime=end_time, layers="", events="", eventsLabels=False, imageScale=1)
+    assert len(fake_api.calls) == 2
+    assert len(cache) == 0
+
+
+def test_caching_override(fake_api, cache):
+    fake_api.add("getJP2Header", body=b"<meta/>")
+    with caching(None):
+        getJP2Header(id=1)
+        getJP2Header(id=1)
+    other = LRUCache()
+    with caching(other):
+        getJP2Header(id=1)
+    getJP2Header(id=1)
+    assert len(fake_api.calls) == 4
+    assert len(other) == 1
+    assert get_cache() is cache
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    params = [getJP2HeaderInputParameters(id=i) for i in range(3)]
+    for p in params:
+        cache.set(p, str(p.id))
+    assert len(cache) == 2
+    assert cache.get(params[0]) is MISSING
+    assert cache.get(params[2]) == "2"
+
+    cache = LRUCache(max_bytes=10)
+    cache.set(params[0], "x" * 6)
+    cache.set(params[1], "y" * 6)
+    assert len(cache) == 1
+    assert cache.nbytes == 6
+    cache.set(params[2], "z" * 11)
+    assert cache.get(params[1]) == "y" * 6
+    assert len(cache) == 1
+
+
+def test_cache_is_abstract():
+    with pytest.raises(TypeError, match="abstract"):
+        Cache()
+
+
+def test_concurrent_hits():
+    cache = LRUCache()
+    params = getJP2HeaderInputParameters(id=1)
+    cache.set(params, "header")
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: cache.get(params), range(4000)))
+    assert (cache.hits, cache.misses) == (4000, 0)
+
+
+def test_ttl_expiry():
+    cache = LRUCache(ttls={"getStatus": 0.01})
+    params = getStatusInputParameters()
+    cache.set(params, {})
+    assert cache.get(params) == {}
+    time.sleep(0.02)
+    assert cache.get(params) is MISSING
+    assert len(cache) == 0
+    assert not cache.caches(getJP2HeaderInputParameters(id=1))
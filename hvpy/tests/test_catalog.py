@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from hvpy import DataSource, getClosestImage
+from hvpy.batch import getClosestImages
+from hvpy.catalog import ImageCatalog, get_catalog, set_catalog
+from hvpy.parameters import getClosestImageInputParameters
+
+START = datetime(2022, 1, 1)
+
+
+def closest_image(request):
+    # One image every minute
+    query = parse_qs(urlsplit(request.url).query)
+    date = datetime.fromisoformat(query["date"][0].rstrip("Z"))
+    minute = START + timedelta(minutes=round((date - START).total_seconds() / 60))
+    image_id = int(query["sourceId"][0]) * 10**6 + int((minute - START).total_seconds())
+    body = {"id": str(image_id), "date": str(minute), "width": 4096, "height": 4096}
+    return 200, json.dumps(body).encode(), {}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ImageCatalog(tmp_path / "catalog.sqlite")
+    set_catalog(catalog)
+    yield catalog
+    set_catalog(None)
+    catalog.close()
+
+
+def test_catalog_is_opt_in(fake_api):
+    assert get_catalog() is None
+    fake_api.add("getClosestImage", closest_image)
+    getClosestImage(date=START, sourceId=10)
+    getClosestImage(date=START, sourceId=10)
+    assert len(fake_api.calls) == 2
+
+
+def test_catalog_answers_covered_dates(fake_api, catalog):
+    fake_api.add("getClosestImage", closest_image)
+    first = getClosestImage(date=START + timedelta(seconds=20), sourceId=10)
+    assert first == {"id": "10000000", "date": "2022-01-01 00:00:00", "width": 4096, "height": 4096}
+    # Nothing closer than 20 s on either side of 00:00:20
+    assert catalog.coverage(10) == [(START, START + timedelta(seconds=40))]
+    assert getClosestImage(date=START + timedelta(seconds=10), sourceId=10) == first
+    assert getClosestImage(date=START, sourceId=10) == first
+    assert len(fake_api.calls) == 1
+    # An image may exist between 00:00:40 and 00:01:00
+    assert getClosestImage(date=START + timedelta(seconds=25), sourceId=10) == first
+    assert len(fake_api.calls) == 2
+    # Other sources are not covered
+    getClosestImage(date=START + timedelta(seconds=10), sourceId=11)
+    assert len(fake_api.calls) == 3
+    assert (catalog.hits, catalog.misses) == (2, 3)
+    assert len(catalog) == 2
+
+
+def test_catalog_persists(fake_api, catalog):
+    fake_api.add("getClosestImage", closest_image)
+    getClosestImages([START + timedelta(seconds=s) for s in range(0, 600, 30)], DataSource.AIA_171)
+    calls = len(fake_api.calls)
+    assert catalog.coverage(10) == [(START, START + timedelta(seconds=600))]
+    with ImageCatalog(catalog.path) as reopened:
+        set_catalog(reopened)
+        table = getClosestImages([START + timedelta(seconds=s) for s in range(5, 590, 7)], DataSource.AIA_171)
+    assert len(fake_api.calls) == calls
+    assert table.ids == [10 * 10**6 + 60 * round(s / 60) for s in range(5, 590, 7)]
+
+
+def test_add_and_closest():
+    catalog = ImageCatalog()
+    images = [{"id": i, "date": f"2022-01-01 00:{i:02}:00"} for i in range(0, 60, 10)]
+    catalog.add(DataSource.AIA_171, images, coverage=(START, START + timedelta(minutes=50)))
+    catalog.add(DataSource.AIA_171, [], coverage=(START + timedelta(hours=1), START + timedelta(hours=2)))
+    assert catalog.closest(START + timedelta(minutes=14), 10)["id"] == 10
+    assert catalog.closest(START + timedelta(minutes=16), 10)["id"] == 20
+    assert catalog.closest("2022-01-01T00:30:00Z", 10)["id"] == 30
+    # The closest image may be after the covered interval
+    assert catalog.closest(START + timedelta(minutes=53), 10) is None
+    assert catalog.closest(START, 11) is None
+    # Overlapping intervals are merged
+    catalog.add(10, [], coverage=(START + timedelta(minutes=45), START + timedelta(hours=1)))
+    assert catalog.coverage(10) == [
+        (START, START + timedelta(hours=1)),
+        (START + timedelta(hours=1), START + timedelta(hours=2)),
+    ]
+    assert catalog.closest(START + timedelta(minutes=53), 10)["id"] == 50
+    # An image at 01:00 may be closer to 01:01 than the one at 00:50
+    assert catalog.closest(START + timedelta(minutes=61), 10) is None
+    # Touching intervals are merged once the image between them is known
+    catalog.add(10, [{"id": 60, "date": "2022-01-01 01:00:00"}])
+    assert catalog.coverage(10) == [(START, START + timedelta(hours=2))]
+    assert catalog.closest(START + timedelta(minutes=61), 10)["id"] == 60
+    assert catalog.closest(START + timedelta(minutes=90), 10)["id"] == 60
+    catalog.clear()
+    assert len(catalog) == 0
+    assert catalog.coverage(10) == []
+
+
+def test_errors_are_not_recorded():
+    catalog = ImageCatalog()
+    params = getClosestImageInputParameters(date=START, sourceId=10)
+    catalog.put(params, {"error": "No images"})
+    assert len(catalog) == 0
+    assert catalog.get(params) is None
+    assert not catalog.catalogs(getClosestImageInputParameters(date=START, sourceId=10, callback="f"))
@@ -0,0 +1,60 @@
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from hvpy import getStatus
+from hvpy.client import Client, get_client, set_client
+from hvpy.conftest import FakeAPI
+from hvpy.core import execute_api_call
+from hvpy.parameters import getStatusInputParameters
+from hvpy.retry import RetryPolicy
+
+
+def test_client_pool_settings():
+    client = Client(pool_connections=3, pool_maxsize=7, keep_alive=False, headers={"X-Test": "1"})
+    adapter = client.session.get_adapter("https://api.helioviewer.org/")
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert client.session.headers["Connection"] == "close"
+    assert client.session.headers["X-Test"] == "1"
+    client.close()
+
+
+def test_default_client_is_shared():
+    set_client(None)
+    assert get_client() is get_client()
+    custom = Client()
+    set_client(custom)
+    assert get_client() is custom
+    set_client(None)
+    assert get_client() is not custom
+
+
+def test_facade_routes_through_default_client(fake_api):
+    fake_api.add("getStatus", json_body={"AIA": {"time": "2022-01-01 00:00:00"}})
+    assert getStatus() == {"AIA": {"time": "2022-01-01 00:00:00"}}
+    assert len(fake_api.calls) == 1
+
+
+def test_execute_api_call_with_injected_client(fake_api):
+    fake_api.add("getStatus", json_body={"default": True})
+    injected = FakeAPI()
+    injected.add("getStatus", json_body={"injected": True})
+    client = Client(retry=RetryPolicy(backoff_factor=0))
+    client.session.mount("https://", injected)
+    assert execute_api_call(getStatusInputParameters(), client=client) == {"injected": True}
+    assert len(injected.calls) == 1
+    assert fake_api.calls == []
+    injected.add("getStatus", json_body={}, status=503)
+    with pytest.raises(requests.HTTPError):
+        execute_api_call(getStatusInputParameters(), client=client)
+    assert fake_api.calls == []
+
+
+def test_supplied_session_keeps_its_adapters():
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=5)
+    session.mount("https://", adapter)
+    client = Client(session=session, pool_maxsize=3)
+    assert client.session is session
+    assert session.get_adapter("https://api.helioviewer.org/") is adapter
@@ -1,8 +1,136 @@
+import io
+
 import pytest
+import requests
 
-from hvpy.core import parse_response
+from hvpy.core import download_api_call, execute_api_call, parse_response
+from hvpy.parameters import downloadMovieInputParameters, downloadScreenshotInputParameters
 
 
 def test_wrong_input_type():
     with pytest.raises(ValueError, match="Unknown output type: 42"):
         parse_response(None, 42)
+
+
+def test_download_api_call_to_path(fake_api, tmp_path):
+    fake_api.add("downloadMovie", body=b"x" * 2500)
+    progress = []
+    result = download_api_call(
+        downloadMovieInputParameters(id="abc", format="mp4"),
+        tmp_path / "movie.mp4",
+        progress=lambda done, total: progress.append((done, total)),
+        chunk_size=1000,
+    )
+    assert result == tmp_path / "movie.mp4"
+    assert result.read_bytes() == b"x" * 2500
+    assert progress == [(1000, 2500), (2000, 2500), (2500, 2500)]
+    assert fake_api.calls[0].url.endswith("downloadMovie/?id=abc&format=mp4&hq=False")
+    with pytest.raises(FileExistsError, match="already exists"):
+        download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4")
+
+
+def test_download_api_call_to_file_like(fake_api):
+    fake_api.add("downloadScreenshot", body=b"png")
+    sink = io.BytesIO()
+    assert download_api_call(downloadScreenshotInputParameters(id=1), sink) is sink
+    assert sink.getvalue() == b"png"
+
+
+def test_download_api_call_raises(fake_api, tmp_path):
+    fake_api.add("downloadScreenshot", status=404)
+    with pytest.raises(requests.HTTPError):
+        download_api_call(downloadScreenshotInputParameters(id=1), tmp_path / "screenshot.png")
+    assert not (tmp_path / "screenshot.png").exists()
+
+
+def flaky_download(data, honour_range=True, etag='"v1"'):
+    """
+    Serves ``data``, breaking the first transfer after 1000 bytes.
+    """
+    state = {"broken": False}
+
+    def handler(request):
+        headers = {"Content-Length": str(len(data)), "ETag": etag}
+        if not state["broken"]:
+            state["broken"] = True
+            return 200, data[:1000], headers
+        range_header = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if range_header and honour_range and if_range in (None, etag):
+            start = int(range_header[6:-1])
+            headers = {"Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}", "ETag": etag}
+            return 206, data[start:], headers
+        return 200, data, {"ETag": etag}
+
+    return handler
+
+
+def test_execute_api_call_resumes_raw(fake_api):
+    data = bytes(range(256)) * 12
+    fake_api.add("downloadMovie", flaky_download(data))
+    assert execute_api_call(downloadMovieInputParameters(id="abc", format="mp4")) == data
+    assert len(fake_api.calls) == 2
+
+
+@pytest.mark.parametrize("honour_range", [True, False])
+def test_download_api_call_resumes(fake_api, honour_range):
+    data = bytes(range(256)) * 12
+    fake_api.add("downloadMovie", flaky_download(data, honour_range))
+    sink = io.BytesIO()
+    download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), sink, chunk_size=100)
+    assert sink.getvalue() == data
+    assert len(fake_api.calls) == 2
+    assert fake_api.calls[1].headers["Range"] == "bytes=1000-"
+
+
+def test_download_api_call_resumes_partial_file(fake_api, tmp_path):
+    data = bytes(range(256)) * 12
+    fake_api.add("downloadMovie", flaky_download(data))
+    (tmp_path / "movie.mp4.part").write_bytes(data[:500])
+    (tmp_path / "movie.mp4.part.validator").write_text('"v1"')
+    fake_api.routes["downloadMovie"]({})  # Skip the broken transfer
+    result = download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4")
+    assert result.read_bytes() == data
+    assert fake_api.calls[0].headers["Range"] == "bytes=500-"
+    assert fake_api.calls[0].headers["If-Range"] == '"v1"'
+    assert list(tmp_path.iterdir()) == [result]
+
+
+def test_download_api_call_restarts_changed_resource(fake_api, tmp_path):
+    data = bytes(range(256)) * 12
+    fake_api.add("downloadMovie", flaky_download(data, etag='"v2"'))
+    (tmp_path / "movie.mp4.part").write_bytes(b"x" * 500)
+    (tmp_path / "movie.mp4.part.validator").write_text('"v1"')
+    fake_api.routes["downloadMovie"]({})  # Skip the broken transfer
+    result = download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4")
+    assert result.read_bytes() == data
+    assert fake_api.calls[0].headers["If-Range"] == '"v1"'
+
+
+def test_download_api_call_restarts_without_validator(fake_api, tmp_path):
+    data = bytes(range(256)) * 12
+    fake_api.add("downloadMovie", flaky_download(data))
+    (tmp_path / "movie.mp4.part").write_bytes(b"x" * 500)
+    fake_api.routes["downloadMovie"]({})  # Skip the broken transfer
+    result = download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4")
+    assert result.read_bytes() == data
+    assert "Range" not in fake_api.calls[0].headers
+
+
+def test_download_api_call_keeps_validator(fake_api, tmp_path):
+    data = bytes(range(256)) * 12
+    fake_api.add(
+        "downloadMovie", lambda request: (200, data[:1000], {"Content-Length": str(len(data)), "ETag": '"v1"'})
+    )
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4", chunk_size=100)
+    assert (tmp_path / "movie.mp4.part").read_bytes() == data[:1000]
+    assert (tmp_path / "movie.mp4.part.validator").read_text() == '"v1"'
+    assert fake_api.calls[-1].headers["If-Range"] == '"v1"'
+
+
+def test_download_api_call_gives_up(fake_api, tmp_path):
+    fake_api.add("downloadMovie", lambda request: (200, b"x" * 10, {"Content-Length": "20"}))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download_api_call(downloadMovieInputParameters(id="abc", format="mp4"), tmp_path / "movie.mp4")
+    assert len(fake_api.calls) == 4
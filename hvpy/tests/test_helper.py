@@ -5,6 +5,7 @@ import pytest
 
 from hvpy.datasource import DataSource
 from hvpy.helpers import createMovie, createScreenshot
+from hvpy.polling import FixedPolling
 from hvpy.utils import create_events, create_layers
 
 
@@ -127,3 +128,21 @@ def test_createScreenshot_with_none_filename(date):
     assert isinstance(result, Path)
     assert result.exists()
     result.unlink()  # clean up
+
+
+def test_createMovie_streams_download(fake_api, start_time, end_time, tmp_path):
+    fake_api.add("queueMovie", json_body={"id": "abc", "token": "t"})
+    fake_api.add("getMovieStatus", json_body={"status": 2, "title": "title"})
+    fake_api.add("downloadMovie", body=b"mp4")
+    result = createMovie(
+        startTime=start_time,
+        endTime=end_time,
+        layers=create_layers([(DataSource.AIA_171, 100)]),
+        events=create_events(["AR"]),
+        eventsLabels=True,
+        imageScale=1,
+        filename=tmp_path / "movie",
+        polling=FixedPolling(0),
+    )
+    assert result == tmp_path / "movie.mp4"
+    assert result.read_bytes() == b"mp4"
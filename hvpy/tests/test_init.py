@@ -0,0 +1,23 @@
+import sys
+import subprocess
+
+import hvpy
+from hvpy import facade, parameters
+
+
+def test_lazy_names_match_modules():
+    for name in facade.__all__:
+        assert getattr(hvpy, name) is getattr(facade, name)
+    for name in parameters.__all__:
+        assert name in dir(parameters)
+        assert getattr(parameters, name).__name__ == name
+    assert set(hvpy.__all__) <= set(dir(hvpy))
+    assert hvpy.createMovie.__module__ == "hvpy.helpers"
+
+
+def test_import_is_lazy():
+    # Guards the import time of hvpy, which matters to short-lived scripts.
+    heavy = ["requests", "pydantic", "hvpy.core", "hvpy.facade", "hvpy.io", "hvpy.parameters"]
+    code = f"import sys, hvpy; print([m for m in {heavy!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
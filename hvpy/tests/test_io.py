@@ -1,5 +1,12 @@
-from hvpy import set_api_url
+import warnings
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+
+from hvpy import DataSource, set_api_url
 from hvpy.io import HvpyParameters, OutputType
+from hvpy.parameters import getJP2ImageInputParameters, getJPXClosestToMidPointInputParameters, getTileInputParameters
 
 
 def test_default_get_output_type_is_raw():
@@ -42,3 +49,33 @@ def test_set_url_env(env):
     assert LiveSettings.api_url == "https://api.beta.helioviewer.org/"
 
     set_api_url("https://api.beta.helioviewer.org/v2/")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        getJP2ImageInputParameters(date=datetime(2022, 1, 1), sourceId=DataSource.AIA_171, json=True),
+        getTileInputParameters(id=7, x=-1, y=0, imageScale=2, baseDiffTime=datetime(2022, 1, 1)),
+        getJPXClosestToMidPointInputParameters(
+            startTimes=[datetime(2022, 1, 1)], endTimes=[datetime(2022, 1, 2)], sourceId=10
+        ),
+    ],
+)
+def test_model_dump_matches_pydantic(params):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = BaseModel.model_dump(params, by_alias=True)
+    assert params.model_dump() == expected
+    assert params.model_dump(exclude_none=True) == {k: v for k, v in expected.items() if v is not None}
+
+
+def test_trusted_construction():
+    params = getTileInputParameters(id=7, x=-1, y=0, imageScale=2)
+    trusted = getTileInputParameters._trusted(id=7, x=-1, y=0, imageScale=2)
+    assert trusted == params
+    assert trusted.model_dump() == params.model_dump()
+    assert trusted.url == params.url
+    image = getJP2ImageInputParameters._trusted(date="2022-01-01T00:00:00Z", sourceId=10, Json=True)
+    assert image.model_dump()["json"] is True
+    with pytest.raises(TypeError, match="Missing parameters: imageScale, y"):
+        getTileInputParameters._trusted(id=7, x=-1)
@@ -0,0 +1,122 @@
+import struct
+from datetime import datetime
+
+import pytest
+
+from hvpy import read_jp2_header
+from hvpy.jp2 import parse_jp2_header, parse_jp2_headers
+
+HEADER = b"<meta><fits><NAXIS1>4096</NAXIS1></fits><helioviewer/></meta>"
+
+
+def box(kind, contents, extended=False):
+    if extended:
+        return struct.pack(">I4sQ", 1, kind, len(contents) + 16) + contents
+    return struct.pack(">I4s", len(contents) + 8, kind) + contents
+
+
+def jp2(*boxes):
+    signature = box(b"jP  ", b"\r\n\x87\n")
+    return signature + box(b"ftyp", b"jp2 \0\0\0\0jp2 ") + b"".join(boxes)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        jp2(box(b"jp2h", box(b"ihdr", b"\0" * 14)), box(b"xml ", HEADER), box(b"jp2c", b"\xff" * 100)),
+        jp2(box(b"xml ", b"<other/>"), box(b"xml ", HEADER + b"\0", extended=True)),
+        jp2(box(b"asoc", box(b"lbl ", b"header") + box(b"xml ", HEADER))),
+        # The codestream box may be left open-ended
+        jp2(box(b"xml ", HEADER), struct.pack(">I4s", 0, b"jp2c") + b"\xff" * 100),
+    ],
+)
+def test_read_jp2_header(data, tmp_path):
+    expected = '<?xml version="1.0" encoding="utf-8"?>' + HEADER.decode()
+    assert read_jp2_header(data) == expected
+    path = tmp_path / "image.jp2"
+    path.write_bytes(data)
+    assert read_jp2_header(path) == expected
+    assert read_jp2_header(str(path)) == expected
+
+
+def test_read_jp2_header_errors(tmp_path):
+    with pytest.raises(ValueError, match="Not a JPEG2000 image"):
+        read_jp2_header(b"<meta/>")
+    path = tmp_path / "empty.jp2"
+    path.touch()
+    with pytest.raises(ValueError, match="Not a JPEG2000 image"):
+        read_jp2_header(path)
+    with pytest.raises(ValueError, match="No XML header"):
+        read_jp2_header(jp2(box(b"jp2c", b"\xff")))
+    with pytest.raises(ValueError, match="Invalid JP2 box"):
+        read_jp2_header(jp2(struct.pack(">I4s", 100, b"xml ")))
+
+
+XML = (
+    '<?xml version="1.0" encoding="utf-8"?><meta><fits>'
+    "<NAXIS1>4096</NAXIS1><NAXIS2>4096</NAXIS2><DATE-OBS>2022-01-01T00:00:09.35Z</DATE-OBS>"
+    "<TELESCOP>SDO/AIA</TELESCOP><INSTRUME>AIA_3</INSTRUME><WAVELNTH>171</WAVELNTH><CDELT1>0.600109</CDELT1>"
+    "<CROTA2>0.0</CROTA2><HISTORY>first</HISTORY><HISTORY>second</HISTORY><COMMENT>it's</COMMENT>"
+    "</fits><helioviewer><HV_ROTATION>0.0</HV_ROTATION><HV_COMMENT>n/a</HV_COMMENT></helioviewer></meta>"
+)
+
+
+@pytest.mark.parametrize("header", [XML, XML.encode(), "xml_header('" + XML.replace("'", "\\'") + "')"])
+def test_parse_jp2_header(header):
+    parsed = parse_jp2_header(header)
+    assert parsed.date == datetime(2022, 1, 1, 0, 0, 9, 350000)
+    assert parsed.telescope == "SDO/AIA"
+    assert parsed.instrument == "AIA_3"
+    assert parsed.detector is None
+    assert parsed.wavelength == 171.0
+    assert (parsed.width, parsed.height) == (4096, 4096)
+    assert parsed.scale == 0.600109
+    assert parsed["CROTA2"] == 0.0
+    assert parsed["HISTORY"] == "first\nsecond"
+    assert parsed["COMMENT"] == "it's"
+    assert parsed["HV_COMMENT"] == "n/a"
+    assert parsed.get("MISSING") is None
+    with pytest.raises(KeyError):
+        parsed["MISSING"]
+    assert parsed.helioviewer == {"HV_ROTATION": 0.0, "HV_COMMENT": "n/a"}
+    assert not hasattr(parsed, "__dict__")
+
+
+def test_parse_jp2_header_errors():
+    with pytest.raises(ValueError, match="Invalid JP2 header"):
+        parse_jp2_header("<meta>")
+
+
+@pytest.mark.parametrize(
+    "fits, date",
+    [
+        ("<DATE-OBS>2022-01-01T00:00:09.35Z</DATE-OBS>", datetime(2022, 1, 1, 0, 0, 9, 350000)),
+        ("<DATE-OBS>2022-01-01T00:00:09</DATE-OBS>", datetime(2022, 1, 1, 0, 0, 9)),
+        ("<DATE-OBS>2022-01-01T00:00:09.123456789</DATE-OBS>", datetime(2022, 1, 1, 0, 0, 9, 123456)),
+        ("<DATE-OBS>2022/01/01T00:00:09.5</DATE-OBS>", datetime(2022, 1, 1, 0, 0, 9, 500000)),
+        ("<DATE-OBS>2022-01-01</DATE-OBS><TIME-OBS>12:30:00.25</TIME-OBS>", datetime(2022, 1, 1, 12, 30, 0, 250000)),
+        ("<DATE-OBS>2022-01-01</DATE-OBS>", datetime(2022, 1, 1)),
+        ("<DATE-OBS>25/12/98</DATE-OBS><TIME-OBS>01:02:03</TIME-OBS>", datetime(1998, 12, 25, 1, 2, 3)),
+        ("<DATE-OBS>2022-13-01T00:00:00</DATE-OBS>", None),
+        ("<DATE-OBS>yesterday</DATE-OBS>", None),
+        ("", None),
+    ],
+)
+def test_parse_jp2_header_dates(fits, date):
+    assert parse_jp2_header(f"<meta><fits>{fits}</fits></meta>").date == date
+
+
+def test_parse_jp2_headers_with_bad_values():
+    bad = XML.replace("2022-01-01T00:00:09.35Z", "unknown").replace("<WAVELNTH>171", "<WAVELNTH>n/a")
+    table = parse_jp2_headers([XML, bad])
+    assert table.date == [datetime(2022, 1, 1, 0, 0, 9, 350000), None]
+    assert table.wavelength == [171.0, None]
+
+
+def test_parse_jp2_headers():
+    other = XML.replace("AIA_3", "AIA_4").replace("<WAVELNTH>171</WAVELNTH>", "")
+    table = parse_jp2_headers([XML, other], keywords=["CROTA2", "HV_ROTATION", "MISSING"])
+    assert table.instrument == ["AIA_3", "AIA_4"]
+    assert table.wavelength == [171.0, None]
+    assert table.width == [4096, 4096]
+    assert table.keywords == {"CROTA2": [0.0, 0.0], "HV_ROTATION": [0.0, 0.0], "MISSING": [None, None]}
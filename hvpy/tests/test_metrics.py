@@ -0,0 +1,197 @@
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from hvpy import getClosestImage, getJP2Image, getStatus, getTile
+from hvpy.cache import LRUCache, set_cache
+from hvpy.client import get_client
+from hvpy.core import download_api_call
+from hvpy.metrics import CallEvent, Exporter, MetricsCollector, PrometheusExporter
+from hvpy.parameters import getJP2ImageInputParameters
+from hvpy.store import DiskStore, set_store
+
+
+@pytest.fixture
+def metrics(fake_api):
+    metrics = MetricsCollector(buckets=(0.1, 1))
+    get_client().hooks.append(metrics)
+    return metrics
+
+
+@pytest.fixture
+def events(fake_api):
+    events = []
+    get_client().hooks.append(events.append)
+    return events
+
+
+def test_events(fake_api, events, date):
+    fake_api.add("getClosestImage", json_body={"id": "1"})
+    getClosestImage(date=date, sourceId=10)
+    assert [(e.kind, e.endpoint, e.attempt) for e in events] == [
+        ("request", "getClosestImage", 1),
+        ("response", "getClosestImage", 0),
+    ]
+    assert events[1].status == 200
+    assert events[1].nbytes == len(b'{"id": "1"}')
+    assert events[1].elapsed > 0
+
+
+def test_retry_and_error_events(fake_api, events):
+    statuses = iter([503, 503, 404])
+    fake_api.add("getStatus", lambda request: (next(statuses), b"", {}))
+    with pytest.raises(requests.HTTPError):
+        getStatus()
+    assert [(e.kind, e.attempt, e.status) for e in events] == [
+        ("request", 1, None),
+        ("retry", 1, 503),
+        ("request", 2, None),
+        ("retry", 2, 503),
+        ("request", 3, None),
+        ("error", 0, None),
+    ]
+    assert isinstance(events[-1].error, requests.HTTPError)
+
+
+def test_broken_hooks_are_logged(fake_api, events, caplog):
+    def broken(event):
+        raise ValueError("Broken hook")
+
+    fake_api.add("getStatus", json_body={})
+    get_client().hooks.insert(0, broken)
+    assert getStatus() == {}
+    # The hooks after it still see every event
+    assert [e.kind for e in events] == ["request", "response"]
+    assert [record.exc_info[1].args[0] for record in caplog.records] == ["Broken hook"] * 2
+
+
+def test_collector(fake_api, metrics, date):
+    statuses = iter([503, 200, 200])
+    fake_api.add("getClosestImage", lambda request: (next(statuses), b"{}", {}))
+    fake_api.add("getStatus", status=404)
+    getClosestImage(date=date, sourceId=10)
+    getClosestImage(date=date, sourceId=11)
+    with pytest.raises(requests.HTTPError):
+        getStatus()
+    assert metrics.counters == {
+        "requests": {"getClosestImage": 3, "getStatus": 1},
+        "retries": {"getClosestImage": 1},
+        "errors": {"getStatus": 1},
+        "coalesced": {},
+        "bytes": {"getClosestImage": 4},
+    }
+    assert metrics.responses == {("getClosestImage", 200): 2}
+    buckets, total, count = metrics.histogram("getClosestImage")
+    assert [bound for bound, _ in buckets] == [0.1, 1, float("inf")]
+    assert buckets[-1][1] == count == 2
+    assert total > 0
+    assert metrics.endpoints() == ["getClosestImage", "getStatus"]
+    metrics.reset()
+    assert metrics.endpoints() == []
+
+
+def test_transfers_are_measured(fake_api, metrics, date):
+    fake_api.add("getJP2Image", body=b"x" * 1000)
+    assert getJP2Image(date=date, sourceId=10) == b"x" * 1000
+    download_api_call(getJP2ImageInputParameters(date=date, sourceId=10), io.BytesIO())
+    assert metrics.counters["bytes"] == {"getJP2Image": 2000}
+    assert metrics.responses == {("getJP2Image", 200): 2}
+
+
+def test_cache_events(fake_api, metrics, date):
+    fake_api.add("getClosestImage", json_body={})
+    set_cache(LRUCache())
+    try:
+        for _ in range(3):
+            getClosestImage(date=date, sourceId=10)
+    finally:
+        set_cache(None)
+    assert metrics.cache == {
+        ("getClosestImage", "memory", True): 2,
+        ("getClosestImage", "memory", False): 1,
+    }
+    assert metrics.counters["requests"] == {"getClosestImage": 1}
+
+
+def test_coalesced_events(fake_api, metrics, date):
+    release = threading.Event()
+
+    def closest_image(request):
+        release.wait()
+        return 200, b"{}", {}
+
+    fake_api.add("getClosestImage", closest_image)
+    flights = get_client().flights
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = [executor.submit(getClosestImage, date=date, sourceId=10) for _ in range(3)]
+        deadline = time.monotonic() + 5
+        while flights.shared < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.001)
+        release.set()
+    assert [r.result() for r in results] == [{}] * 3
+    assert metrics.counters["coalesced"] == {"getClosestImage": 2}
+    assert metrics.counters["requests"] == {"getClosestImage": 1}
+
+
+def test_prometheus_exporter():
+    metrics = MetricsCollector(buckets=(0.1, 1))
+    metrics(CallEvent("request", "getTile", attempt=1))
+    metrics(CallEvent("response", "getTile", status=200, elapsed=0.5, nbytes=10))
+    metrics(CallEvent("cache_hit", "getTile", source="disk"))
+    stream = io.StringIO()
+    exporter = PrometheusExporter(prefix="test", stream=stream)
+    assert isinstance(exporter, Exporter)
+    text = exporter.export(metrics)
+    assert stream.getvalue() == text
+    lines = text.splitlines()
+    assert "# TYPE test_requests_total counter" in lines
+    assert 'test_requests_total{endpoint="getTile"} 1' in lines
+    assert 'test_received_bytes_total{endpoint="getTile"} 10' in lines
+    assert 'test_responses_total{endpoint="getTile",status="200"} 1' in lines
+    assert 'test_cache_lookups_total{endpoint="getTile",cache="disk",result="hit"} 1' in lines
+    assert "# TYPE test_call_duration_seconds histogram" in lines
+    assert 'test_call_duration_seconds_bucket{endpoint="getTile",le="0.1"} 0' in lines
+    assert 'test_call_duration_seconds_bucket{endpoint="getTile",le="1"} 1' in lines
+    assert 'test_call_duration_seconds_bucket{endpoint="getTile",le="+Inf"} 1' in lines
+    assert 'test_call_duration_seconds_sum{endpoint="getTile"} 0.5' in lines
+    assert 'test_call_duration_seconds_count{endpoint="getTile"} 1' in lines
+
+
+def test_export_while_collecting():
+    metrics = MetricsCollector()
+    exporter = PrometheusExporter()
+    done = threading.Event()
+
+    def collect():
+        for i in range(5000):
+            metrics(CallEvent("response", f"endpoint{i}", status=200 + i, elapsed=0.1, nbytes=1))
+            metrics(CallEvent("cache_hit", f"endpoint{i}", source="memory"))
+        done.set()
+
+    thread = threading.Thread(target=collect)
+    thread.start()
+    while not done.is_set():
+        exporter.export(metrics)
+    thread.join()
+    assert 'hvpy_responses_total{endpoint="endpoint4999",status="5199"} 1' in exporter.export(metrics)
+
+
+def test_exporter_is_abstract():
+    with pytest.raises(TypeError, match="abstract"):
+        Exporter()
+
+
+def test_store_events(fake_api, metrics, tmp_path):
+    fake_api.add("getTile", body=b"png")
+    set_store(DiskStore(tmp_path))
+    try:
+        for _ in range(2):
+            getTile(id=7, x=0, y=0, imageScale=2)
+    finally:
+        set_store(None)
+    assert metrics.cache == {("getTile", "disk", True): 1, ("getTile", "disk", False): 1}
@@ -0,0 +1,64 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from hvpy import DataSource, create_events, create_layers
+from hvpy.helpers import createMovie
+from hvpy.polling import ETAPolling, ExponentialPolling, FixedPolling, PollingStrategy
+
+
+def test_fixed_polling():
+    assert FixedPolling(2).delay({}, 0, 0) == 2
+    assert FixedPolling(2).delay({}, 10, 100) == 2
+
+
+def test_polling_strategy_is_abstract():
+    with pytest.raises(TypeError, match="abstract"):
+        PollingStrategy()
+
+
+def test_exponential_polling():
+    polling = ExponentialPolling(initial=1, factor=2, maximum=5)
+    assert [polling.delay({}, n, 0) for n in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_eta_polling_uses_eta():
+    polling = ETAPolling(min_interval=1, max_interval=60)
+    assert polling.verbose
+    assert polling.delay({"eta": 12}, 0, 0) == 12
+    assert polling.delay({"eta": "0.2"}, 0, 0) == 1
+    assert polling.delay({"eta": 600}, 0, 0) == 60
+
+
+@pytest.mark.parametrize("progress", [0.25, 25])
+def test_eta_polling_uses_progress(progress):
+    assert ETAPolling().estimate({"progress": progress}, 10) == pytest.approx(30)
+
+
+def test_eta_polling_falls_back():
+    polling = ETAPolling(fallback=FixedPolling(7))
+    assert polling.delay({}, 3, 10) == 7
+    assert polling.delay({"eta": 0, "progress": 1}, 3, 10) == 7
+    assert polling.delay({"eta": None, "progress": "?"}, 3, 10) == 7
+
+
+def test_createMovie_polls_with_strategy(fake_api, start_time, end_time, tmp_path):
+    statuses = [{"status": 0, "eta": 0.01}, {"status": 1, "progress": 0.5}, {"status": 2, "title": "title"}]
+    fake_api.add("queueMovie", json_body={"id": "abc", "token": "t", "eta": 0.01})
+    fake_api.add("getMovieStatus", lambda request: (200, json.dumps(statuses.pop(0)).encode(), {}))
+    fake_api.add("downloadMovie", body=b"mp4")
+    result = createMovie(
+        startTime=start_time,
+        endTime=end_time,
+        layers=create_layers([(DataSource.AIA_171, 100)]),
+        events=create_events(["AR"]),
+        eventsLabels=True,
+        imageScale=1,
+        filename=tmp_path / "movie",
+        polling=ETAPolling(min_interval=0, max_interval=0.01),
+    )
+    assert result.read_bytes() == b"mp4"
+    polls = [c for c in fake_api.calls if "getMovieStatus" in c.url]
+    assert len(polls) == 3
+    assert all(parse_qs(urlparse(c.url).query)["verbose"] == ["True"] for c in polls)
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hvpy import getStatus
+from hvpy.client import get_client
+from hvpy.ratelimit import FileTokenBucket, RateLimiter, TokenBucket
+
+
+def test_token_bucket_reservations():
+    bucket = TokenBucket(rate=10, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+    with pytest.raises(ValueError, match="must be positive"):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_across_threads():
+    bucket = TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: bucket.acquire(), range(11)))
+    assert time.monotonic() - start >= 0.09
+
+
+def test_file_token_bucket_is_shared(tmp_path):
+    first = FileTokenBucket(tmp_path / "bucket", rate=10, burst=2)
+    second = FileTokenBucket(tmp_path / "bucket", rate=10, burst=2)
+    assert first.reserve() == 0
+    assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(0.1, abs=0.02)
+    first.close()
+    second.close()
+
+
+def test_rate_limiter_budgets(tmp_path):
+    limiter = RateLimiter(rate=5, budgets={"getTile": 50})
+    assert limiter.bucket("getTile").rate == 50
+    assert limiter.bucket("getStatus") is limiter.bucket("getClosestImage")
+    assert limiter.bucket("getStatus").rate == 5
+    assert RateLimiter(budgets={"getTile": 50}).bucket("getStatus") is None
+    with RateLimiter(rate=5, directory=tmp_path) as shared:
+        bucket = shared.bucket("getStatus")
+        assert isinstance(bucket, FileTokenBucket)
+        assert (tmp_path / "default.bucket").exists()
+    assert bucket._file.closed
+    # Closed limiters open their buckets again when used
+    with shared:
+        assert shared.bucket("getStatus") is not bucket
+
+
+@pytest.mark.filterwarnings("error::ResourceWarning")
+def test_rate_limiter_closes_file_buckets(tmp_path):
+    with RateLimiter(rate=5, budgets={"getTile": 50}, directory=tmp_path) as limiter:
+        limiter.reserve("getTile")
+        limiter.reserve("getStatus")
+        buckets = {limiter.bucket("getTile"), limiter.bucket("getStatus")}
+    assert all(bucket._file.closed for bucket in buckets)
+
+
+def test_client_rate_limiter(fake_api):
+    fake_api.add("getStatus", json_body={})
+    limiter = RateLimiter(budgets={"getStatus": 100}, burst=0.01)
+    get_client().rate_limiter = limiter
+    for _ in range(3):
+        getStatus()
+    assert limiter.waited["getStatus"] == pytest.approx(0.03, abs=0.015)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import hvpy.registry
+from hvpy import DataSource
+from hvpy.registry import DataSourceInfo, DataSourceRegistry, get_registry, set_registry
+
+
+def measurement(sourceId, nickname, observatory, instrument, name, start="2010-06-02 00:05:30"):
+    return {
+        "sourceId": sourceId,
+        "nickname": nickname,
+        "layeringOrder": 1,
+        "start": start,
+        "end": "2022-01-01 00:00:00",
+        "uiLabels": [
+            {"label": "Observatory", "name": observatory},
+            {"label": "Instrument", "name": instrument},
+            {"label": "Measurement", "name": name},
+        ],
+    }
+
+
+# The verbose layout nests children under every level
+DATA_SOURCES = {
+    "SDO": {
+        "name": "SDO",
+        "children": {
+            "AIA": {
+                "name": "AIA",
+                "children": {
+                    "171": measurement(10, "AIA 171", "SDO", "AIA", "171"),
+                    "304": measurement(13, "AIA 304", "SDO", "AIA", "304"),
+                },
+            },
+            "HMI": {
+                "name": "HMI",
+                "children": {"magnetogram": measurement(19, "HMI Mag", "SDO", "HMI", "magnetogram", start=None)},
+            },
+        },
+    },
+    "SOHO": {
+        "LASCO": {
+            "C2": {"white-light": {"sourceId": 4, "nickname": "LASCO C2", "start": "1995-12-08T00:00:00Z"}},
+        },
+    },
+}
+
+
+@pytest.fixture
+def data_sources(fake_api):
+    fake_api.add("getDataSources", json_body=DATA_SOURCES)
+    return fake_api
+
+
+def test_lookups(data_sources):
+    registry = DataSourceRegistry()
+    assert registry[DataSource.AIA_171] == DataSourceInfo(
+        sourceId=10,
+        nickname="AIA 171",
+        path=("SDO", "AIA", "171"),
+        instrument="AIA",
+        start=datetime(2010, 6, 2, 0, 5, 30),
+        end=datetime(2022, 1, 1),
+        layeringOrder=1,
+    )
+    assert registry.get(13).nickname == "AIA 304"
+    assert registry.get(999) is None
+    assert 10 in registry and 999 not in registry
+    with pytest.raises(KeyError):
+        registry[999]
+    assert registry.by_nickname("aia 171").sourceId == 10
+    assert registry.by_nickname("EIT 171") is None
+    assert [source.sourceId for source in registry.by_instrument("aia")] == [10, 13]
+    assert registry.by_instrument("EIT") == []
+    # Without uiLabels, the instrument is the second level
+    assert registry[4].instrument == "LASCO"
+    assert registry[4].path == ("SOHO", "LASCO", "C2", "white-light")
+    assert registry.date_range(DataSource.LASCO_C2) == (datetime(1995, 12, 8), None)
+    assert registry.date_range(19) == (None, datetime(2022, 1, 1))
+    assert [source.sourceId for source in registry] == [4, 10, 13, 19]
+    assert len(registry) == 4
+    # Fetched once, verbose
+    assert len(data_sources.calls) == 1
+    assert "verbose=True" in data_sources.calls[0].url
+
+
+def test_ttl(data_sources):
+    registry = DataSourceRegistry(ttl=timedelta(hours=1))
+    registry.get(10)
+    registry.fetched -= 3600
+    registry.get(10)
+    assert len(data_sources.calls) == 2
+    registry.refresh()
+    assert len(data_sources.calls) == 3
+
+
+def test_disk_cache(data_sources, tmp_path):
+    path = tmp_path / "registry" / "datasources.json"
+    DataSourceRegistry(path).get(10)
+    assert json.loads(path.read_text()) == DATA_SOURCES
+    assert len(DataSourceRegistry(path)) == 4
+    assert len(data_sources.calls) == 1
+    # Responses older than the TTL are fetched again
+    old = time.time() - 2 * 86400
+    os.utime(path, (old, old))
+    assert len(DataSourceRegistry(path)) == 4
+    assert len(data_sources.calls) == 2
+
+
+def test_stale_sources_are_used_on_errors(fake_api, tmp_path, monkeypatch):
+    path = tmp_path / "datasources.json"
+    path.write_text(json.dumps(DATA_SOURCES))
+    old = time.time() - 2 * 86400
+    os.utime(path, (old, old))
+    fake_api.add("getDataSources", status=404)
+    registry = DataSourceRegistry(path)
+    assert registry[10].nickname == "AIA 171"
+    assert registry.by_nickname("AIA 304").sourceId == 13
+    # Not fetched again for a while
+    assert len(fake_api.calls) == 1
+    monkeypatch.setattr(hvpy.registry, "RETRY_AFTER", 0)
+    registry._retry_at = 0
+    registry.get(10)
+    assert len(fake_api.calls) == 2
+
+
+def test_failures_are_not_retried_at_once(fake_api):
+    fake_api.add("getDataSources", status=404)
+    registry = DataSourceRegistry()
+    with pytest.raises(Exception):
+        registry.get(10)
+    # Without stale datasources, nothing is listed until the next attempt
+    assert registry.get(10) is None
+    assert len(fake_api.calls) == 1
+
+
+def test_errors_are_raised(fake_api):
+    fake_api.add("getDataSources", json_body={"error": "Nope"})
+    with pytest.raises(RuntimeError, match="Nope"):
+        DataSourceRegistry().refresh()
+
+
+def test_default_registry():
+    registry = get_registry()
+    assert isinstance(registry, DataSourceRegistry)
+    assert get_registry() is registry
+    other = DataSourceRegistry()
+    set_registry(other)
+    try:
+        assert get_registry() is other
+    finally:
+        set_registry(None)
+    assert get_registry() is not other
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from hvpy import getStatus, takeScreenshot
+from hvpy.client import get_client
+from hvpy.parameters import getStatusInputParameters
+from hvpy.retry import RetryPolicy
+
+
+def flaky(statuses, headers=None):
+    """
+    Answers with each status in turn, then with 200.
+    """
+    statuses = list(statuses)
+
+    def handler(request):
+        status = statuses.pop(0) if statuses else 200
+        return status, b"{}", headers or {}
+
+    return handler
+
+
+def test_transient_errors_are_retried(fake_api):
+    fake_api.add("getStatus", flaky([429, 502, 503]))
+    assert getStatus() == {}
+    assert len(fake_api.calls) == 4
+    assert get_client().retry.retries == {"getStatus": 3}
+
+
+def test_retries_are_bounded(fake_api):
+    fake_api.add("getStatus", flaky([503] * 10))
+    with pytest.raises(requests.HTTPError):
+        getStatus()
+    assert len(fake_api.calls) == 4
+    assert get_client().retry.exhausted == {"getStatus": 1}
+
+
+def test_other_errors_are_not_retried(fake_api):
+    fake_api.add("getStatus", flaky([404]))
+    with pytest.raises(requests.HTTPError):
+        getStatus()
+    assert len(fake_api.calls) == 1
+
+
+def test_non_idempotent_endpoints_are_not_retried(fake_api):
+    fake_api.add("takeScreenshot", flaky([503]))
+    with pytest.raises(requests.HTTPError):
+        takeScreenshot(date=datetime(2022, 1, 1), imageScale=1, layers="[10,1,100]")
+    assert len(fake_api.calls) == 1
+    get_client().retry.idempotent_only = False
+    assert takeScreenshot(date=datetime(2022, 1, 1), imageScale=1, layers="[10,1,100]") == {}
+
+
+def test_delay():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [policy.delay(n) for n in range(1, 6)] == [1, 2, 4, 5, 5]
+    assert policy.delay(1, {"Retry-After": "3"}) == 3
+    assert policy.delay(1, {"Retry-After": "30"}) == 5
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=120), usegmt=True)
+    assert policy.delay(1, {"Retry-After": later}) == 5
+    assert policy.delay(2, {"Retry-After": "soon"}) == 2
+    policy = RetryPolicy(backoff_factor=1, jitter=True)
+    assert all(0 <= policy.delay(3) <= 4 for _ in range(20))
+
+
+def test_connection_errors():
+    policy = RetryPolicy(max_attempts=2)
+    params = getStatusInputParameters()
+    assert policy.should_retry(params, 1)
+    assert not policy.should_retry(params, 2)
+    assert not RetryPolicy(retry_connection_errors=False).should_retry(params, 1)
@@ -0,0 +1,92 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hvpy import getClosestImage, queueMovie
+from hvpy.client import get_client
+from hvpy.singleflight import SingleFlight
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return {"id": 1}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = [executor.submit(flights.do, "key", fn) for _ in range(8)]
+        wait_for(lambda: flights.shared == 7)
+        release.set()
+    results = [r.result() for r in results]
+    assert results == [{"id": 1}] * 8
+    assert len({id(r) for r in results}) == 8
+    assert len(calls) == 1
+    # Once finished, the call runs again
+    assert flights.do("key", fn) == {"id": 1}
+    assert len(calls) == 2
+
+
+def test_exceptions_are_shared():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait()
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = [executor.submit(flights.do, "key", fn) for _ in range(4)]
+        wait_for(lambda: flights.shared == 3)
+        release.set()
+    for result in results:
+        with pytest.raises(ValueError, match="boom"):
+            result.result()
+    assert flights._calls == {}
+
+
+def test_execute_api_call_coalesces(fake_api, date):
+    release = threading.Event()
+
+    def closest_image(request):
+        release.wait()
+        return 200, b'{"id": "1"}', {}
+
+    fake_api.add("getClosestImage", closest_image)
+    flights = get_client().flights
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        same = [executor.submit(getClosestImage, date=date, sourceId=10) for _ in range(5)]
+        other = executor.submit(getClosestImage, date=date, sourceId=11)
+        wait_for(lambda: flights.shared == 4 and len(fake_api.calls) == 2)
+        release.set()
+    assert [r.result() for r in same] == [{"id": "1"}] * 5
+    assert other.result() == {"id": "1"}
+    assert len(fake_api.calls) == 2
+
+
+def test_non_idempotent_calls_are_not_coalesced(fake_api, start_time, end_time):
+    release = threading.Event()
+
+    def queue(request):
+        release.wait()
+        return 200, b'{"id": "1"}', {}
+
+    fake_api.add("queueMovie", queue)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        kwargs = dict(startTime=start_time, endTime=end_time, layers="[10,1,100]", events="", eventsLabels=False)
+        results = [executor.submit(queueMovie, imageScale=1, **kwargs) for _ in range(2)]
+        wait_for(lambda: len(fake_api.calls) == 2)
+        release.set()
+    assert [r.result() for r in results] == [{"id": "1"}] * 2
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hvpy import getJP2Header, getJP2Image, getTile
+from hvpy.parameters import (
+    getJP2HeaderInputParameters,
+    getJP2ImageInputParameters,
+    getStatusInputParameters,
+    getTileInputParameters,
+)
+from hvpy.store import DiskStore, set_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DiskStore(tmp_path / "store")
+    set_store(store)
+    yield store
+    set_store(None)
+
+
+def test_store_paths(tmp_path):
+    store = DiskStore(tmp_path)
+    assert store.path(getJP2HeaderInputParameters(id=1234)) == tmp_path / "headers" / "34" / "1234.xml"
+    assert store.path(getJP2HeaderInputParameters(id=1234, callback="f")) is None
+    tile = getTileInputParameters(id=7, x=-1, y=0, imageScale=2)
+    assert store.path(tile) == tmp_path / "tiles" / "07" / "7" / "2_-1_0.png"
+    assert store.path(getTileInputParameters(id=7, x=-1, y=0, imageScale=2, difference=1)) is None
+    assert store.path(getStatusInputParameters()) is None
+    assert store.path(getJP2ImageInputParameters(date="2022-01-01T00:00:00Z", sourceId=10)) is None
+
+
+def test_store_serves_repeated_calls(fake_api, store, date):
+    fake_api.add("getTile", body=b"png")
+    fake_api.add("getJP2Header", body=b"<meta/>")
+    fake_api.add("getJP2Image", body=b"jp2")
+    for _ in range(2):
+        assert getTile(id=7, x=0, y=0, imageScale=2) == b"png"
+        assert getJP2Header(id=7) == "<meta/>"
+        # The closest image to a date changes as images are ingested
+        assert getJP2Image(date=date, sourceId=10) == b"jp2"
+    assert len(fake_api.calls) == 4
+    assert store.stats == {"hits": 2, "misses": 2, "files": 2, "bytes": 10}
+    # A new store picks up the files written by the previous one
+    assert DiskStore(store.directory).get(getJP2HeaderInputParameters(id=7)) == b"<meta/>"
+
+
+def test_store_eviction(tmp_path):
+    store = DiskStore(tmp_path, max_bytes=10)
+    params = [getJP2HeaderInputParameters(id=i) for i in range(3)]
+    store.put(params[0], b"x" * 4)
+    store.put(params[1], b"y" * 4)
+    assert store.get(params[0]) == b"x" * 4
+    store.put(params[2], b"z" * 4)
+    assert store.get(params[1]) is None
+    assert store.get(params[0]) == b"x" * 4
+    assert store.nbytes == 8
+    assert store.put(params[1], b"y" * 11) is None
+    store.clear()
+    assert store.get(params[0]) is None
+    assert not list(tmp_path.rglob("*.xml"))
+
+
+def test_store_accounts_for_files_of_other_processes(tmp_path):
+    store = DiskStore(tmp_path, max_bytes=10)
+    other = DiskStore(tmp_path)
+    params = [getJP2HeaderInputParameters(id=i) for i in range(3)]
+    store.put(params[0], b"x" * 4)
+    other.put(params[1], b"y" * 4)
+    other.put(params[2], b"z" * 4)
+    assert store.nbytes == 4
+    assert store.get(params[1]) == b"y" * 4
+    assert store.nbytes == 8
+    # Reading the third file goes over the limit, the least recent one is evicted
+    assert store.get(params[2]) == b"z" * 4
+    assert store.nbytes == 8
+    assert store.get(params[0]) is None
+
+
+def test_store_lists_files_lazily(tmp_path, monkeypatch):
+    DiskStore(tmp_path).put(getJP2HeaderInputParameters(id=1), b"x" * 4)
+    listed = []
+    rglob = type(tmp_path).rglob
+    monkeypatch.setattr(type(tmp_path), "rglob", lambda self, pattern: listed.append(self) or rglob(self, pattern))
+    store = DiskStore(tmp_path)
+    assert store.get(getJP2HeaderInputParameters(id=1)) == b"x" * 4
+    assert listed == []
+    assert store.stats == {"hits": 1, "misses": 0, "files": 1, "bytes": 4}
+    assert listed == [tmp_path]
+
+
+def test_store_counts_concurrent_lookups(tmp_path):
+    store = DiskStore(tmp_path)
+    params = getJP2HeaderInputParameters(id=1)
+    store.put(params, b"x")
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: store.get(params if i % 2 else getJP2HeaderInputParameters(id=2)), range(2000)))
+    assert (store.hits, store.misses) == (1000, 1000)
@@ -7,10 +7,12 @@ from hvpy import DataSource, EventType, takeScreenshot
 from hvpy.utils import (
     _create_events_string,
     _create_layer_string,
+    _data_source_to_int,
     _to_datasource,
     _to_event_type,
     create_events,
     create_layers,
+    data_sources_to_int,
     save_file,
 )
 
@@ -23,6 +25,17 @@ def test_create_layers():
         create_layers([(9, 101), (14, 100)])
     with pytest.raises(ValueError, match="must be between 0 and 100"):
         create_layers([(9, 100), (14, -1)])
+    assert create_layers([[DataSource.AIA_131, 100], [11, 50]]) == "[9,1,100],[11,1,50]"
+
+
+def test_create_layers_does_not_depend_on_history():
+    assert create_layers([(10, 50.0)]) == "[10,1,50.0]"
+    assert create_layers([(10, 50)]) == "[10,1,50]"
+    assert create_layers([(True, 50)]) == "[1,1,50]"
+    assert create_layers([(DataSource.AIA_171, True)]) == "[10,1,True]"
+    assert create_layers([(10, 1)]) == "[10,1,1]"
+    assert create_events([EventType.ACTIVE_REGION]) == create_events(["AR"]) == "[AR,all,1]"
+    assert create_events([("AR", "all")]) == "[AR,all,1]"
 
 
 def test_to_datasource():
@@ -30,6 +43,23 @@ def test_to_datasource():
     assert _to_datasource(DataSource.AIA_94) == DataSource.AIA_94
     with pytest.raises(ValueError, match="999 is not a valid DataSource"):
         _to_datasource(999)
+    with pytest.raises(ValueError, match="9.0 is not a valid DataSource"):
+        _to_datasource(9.0)
+    assert _data_source_to_int(DataSource.AIA_131) == _data_source_to_int(9) == 9
+
+
+def testdata_sources_to_int():
+    assert data_sources_to_int([DataSource.AIA_131, 10, DataSource.AIA_304]) == [9, 10, 13]
+    assert data_sources_to_int([]) == []
+    with pytest.raises(ValueError, match="998, 999 is not a valid DataSource"):
+        data_sources_to_int([999, 9, 998])
+
+
+def test_data_sources_to_int_numpy():
+    np = pytest.importorskip("numpy")
+    ids = data_sources_to_int(np.array([9, 10]))
+    assert ids == [9, 10]
+    assert all(type(i) is int for i in ids)
 
 
 def test_create_layers_string():
@@ -64,6 +94,8 @@ def test_create_events():
         create_events(["XYZ"])
     with pytest.raises(ValueError, match="is not a EventType or str or two-length tuple"):
         create_events([("AR", "SPoCA", 123)])
+    with pytest.raises(ValueError, match="is not a EventType or str or two-length tuple"):
+        create_events(["AR", ["ER", "SPoCA"]])
 
 
 def test_create_events_string():
@@ -127,3 +159,18 @@ def test_save_file_expands():
     saved_file.unlink()
     assert not Path(filename).exists()
     assert saved_file == Path(clean_filename).expanduser().resolve()
+
+
+def test_save_file_chunks(tmp_path):
+    saved_file = save_file(iter([b"a", b"b", b"c"]), tmp_path / "chunks.bin")
+    assert saved_file.read_bytes() == b"abc"
+
+
+def test_save_file_failure(tmp_path):
+    def chunks():
+        yield b"a"
+        raise OSError("Broken")
+
+    with pytest.raises(OSError, match="Broken"):
+        save_file(chunks(), tmp_path / "chunks.bin")
+    assert list(tmp_path.iterdir()) == []
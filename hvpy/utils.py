@@ -1,8 +1,9 @@
 import os
 import re
-from typing import Any, List, Union, Callable
+import functools
+from typing import Any, List, Union, Callable, Iterable, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 from hvpy.datasource import DataSource
 from hvpy.event import EventType
@@ -12,12 +13,30 @@ __all__ = [
     "convert_date_to_unix",
     "create_layers",
     "create_events",
+    "data_sources_to_int",
     "save_file",
 ]
 
 SHARED_FORMAT = "    .. {Shared}\n"
 ATTRIBUTE_HEADER = "Attributes\n    ----------\n"
 
+# This is an undocumented attribute of Enums, a dictionary of members by value
+_DATA_SOURCE_IDS = frozenset(DataSource._value2member_map_)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_docstring(input_class) -> Optional[str]:
+    """
+    Returns the part of the documentation string of ``input_class`` that is
+    covered by a ``.. {Shared}``, without the Attributes heading.
+
+    The result is cached as every input class is shared by the
+    synchronous and asynchronous facades and helpers.
+    """
+    if SHARED_FORMAT not in input_class.__doc__:
+        return None
+    return input_class.__doc__.split(SHARED_FORMAT)[1].replace(ATTRIBUTE_HEADER, "").lstrip()
+
 
 def _add_shared_docstring(input_class) -> Callable[[Any], Any]:
     """
@@ -27,9 +46,9 @@ def _add_shared_docstring(input_class) -> Callable[[Any], Any]:
     """
 
     def decorator(func):
-        if SHARED_FORMAT in input_class.__doc__:
-            split_doc = input_class.__doc__.split(SHARED_FORMAT)
-            func.__doc__ = func.__doc__.replace("{Insert}", split_doc[1].replace(ATTRIBUTE_HEADER, "").lstrip())
+        shared = _shared_docstring(input_class)
+        if shared is not None:
+            func.__doc__ = func.__doc__.replace("{Insert}", shared)
         return func
 
     return decorator
@@ -51,6 +70,25 @@ def convert_date_to_unix(v: list) -> str:
     return ",".join([str(int(datetime.timestamp(d))) for d in v])
 
 
+def _to_timestamp(date: Union[datetime, str]) -> float:
+    """
+    Converts a datetime, naive ones being in UTC, or a date string returned by
+    the API to a Unix timestamp.
+    """
+    if isinstance(date, str):
+        date = datetime.fromisoformat(date.rstrip("Z").replace("T", " "))
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def _from_timestamp(timestamp: float) -> datetime:
+    """
+    Converts a Unix timestamp to a naive datetime in UTC.
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
 def _data_source_to_int(source: Union[int, DataSource]) -> int:
     """
     Converts a `~hvpy.DataSource` to an integer.
@@ -60,17 +98,50 @@ def _data_source_to_int(source: Union[int, DataSource]) -> int:
     source
         The `~hvpy.DataSource` to convert.
     """
+    if isinstance(source, DataSource):
+        return source.value
     return _to_datasource(source).value
 
 
+def data_sources_to_int(sources: Iterable[Union[int, DataSource]]) -> List[int]:
+    """
+    Converts many `~hvpy.DataSource` or integers, such as the items of a NumPy
+    array, to integers.
+
+    All of them are validated at once, which is faster than converting them
+    one by one.
+
+    Parameters
+    ----------
+    sources
+        The datasources to convert.
+
+    Raises
+    ------
+    ValueError
+        If any of them is not a valid datasource.
+
+    Examples
+    --------
+    >>> from hvpy import DataSource, data_sources_to_int
+    >>> data_sources_to_int([DataSource.AIA_171, 13])
+    [10, 13]
+    """
+    ids = [source.value if isinstance(source, DataSource) else source for source in sources]
+    unknown = set(ids) - _DATA_SOURCE_IDS
+    if unknown:
+        raise ValueError(f"{', '.join(map(str, sorted(unknown)))} is not a valid DataSource")
+    return [int(i) for i in ids]
+
+
 def _to_datasource(val: Union[int, DataSource]) -> DataSource:
     """
     Validates the input and converts it to a DataSource enum.
     """
-    if isinstance(val, int) and val in [x.value for x in DataSource]:
-        return DataSource(val)
-    elif isinstance(val, DataSource):
+    if isinstance(val, DataSource):
         return val
+    elif isinstance(val, int) and val in DataSource._value2member_map_:
+        return DataSource._value2member_map_[val]
     else:
         raise ValueError(f"{val} is not a valid DataSource")
 
@@ -89,6 +160,8 @@ def create_layers(layer: list) -> str:
     """
     Creates a string of layers separated by commas.
 
+    The strings of the last layer lists seen are remembered.
+
     Parameters
     ----------
     layer
@@ -100,18 +173,30 @@ def create_layers(layer: list) -> str:
     >>> create_layers([(3, 50), (10, 50)])
     '[3,1,50],[10,1,50]'
     """
-    return ",".join([_create_layer_string(_to_datasource(s), o) for s, o in layer])
+    # Validated and normalized first, as equal keys such as 50 and 50.0 or
+    # True and 1 would otherwise share the string cached for the first one.
+    key = tuple((_data_source_to_int(source_id), type(opacity), opacity) for source_id, opacity in layer)
+    try:
+        return _create_layers(key)
+    except TypeError:
+        # Unhashable items are not remembered
+        return _create_layers.__wrapped__(key)
+
+
+@functools.lru_cache(maxsize=1024)
+def _create_layers(layer: tuple) -> str:
+    return ",".join([_create_layer_string(_to_datasource(source_id), opacity) for source_id, _, opacity in layer])
 
 
 def _to_event_type(val: Union[str, EventType]) -> EventType:
     """
     Validates the input and converts it to a EventType enum.
     """
-    # This is an undocumented attribute of Enums
-    if isinstance(val, str) and val in EventType._value2member_map_:
-        return EventType(val)
-    elif isinstance(val, EventType):
+    if isinstance(val, EventType):
         return val
+    # This is an undocumented attribute of Enums
+    elif isinstance(val, str) and val in EventType._value2member_map_:
+        return EventType._value2member_map_[val]
     else:
         raise ValueError(f"{val} is not a valid EventType")
 
@@ -128,6 +213,8 @@ def create_events(events: List[Union[EventType, str, tuple]]) -> str:
     """
     Creates a string of events separated by commas.
 
+    The strings of the last event lists seen are remembered.
+
     Parameters
     ----------
     events
@@ -141,26 +228,60 @@ def create_events(events: List[Union[EventType, str, tuple]]) -> str:
     >>> create_events(["AR", ("ER", "SPoCA;NOAA_SWPC_Observer")])
     '[AR,all,1],[ER,SPoCA;NOAA_SWPC_Observer,1]'
     """
-    constructed_events = ""
+    # Validated and normalized first, so that equal keys of different types
+    # cannot share the string cached for the first one.
+    key = []
     for event in events:
         if isinstance(event, (str, EventType)):
-            constructed_events += _create_events_string(_to_event_type(event)) + ","
+            key.append((_to_event_type(event).value, "all"))
         elif isinstance(event, tuple) and len(event) == 2:
-            constructed_events += _create_events_string(_to_event_type(event[0]), event[1]) + ","
+            key.append((_to_event_type(event[0]).value, event[1]))
         else:
             raise ValueError(f"{event} is not a EventType or str or two-length tuple")
-    # Strips the final comma
-    return constructed_events[:-1]
+    try:
+        return _create_events(tuple(key))
+    except TypeError:
+        # Unhashable items are not remembered
+        return _create_events.__wrapped__(tuple(key))
+
+
+@functools.lru_cache(maxsize=1024)
+def _create_events(events: tuple) -> str:
+    return ",".join([_create_events_string(_to_event_type(event_type), method) for event_type, method in events])
 
 
-def save_file(data: bytearray, filename: Union[Path, str], overwrite: bool = False) -> Path:
+def _prepare_filename(filename: Union[Path, str], overwrite: bool = False) -> Path:
+    """
+    Sanitizes and expands the filename, checking it can be written to.
+    """
+    filepath, filename = os.path.split(filename)
+    filename = re.sub(r"[^\w\-_\. ]", "_", filename)
+    filename = Path(filepath) / Path(filename)
+    filename = Path(filename).expanduser().resolve().absolute()
+    # Sanitize the filename - Only works for strings
+    if filename.exists() and not overwrite:
+        raise FileExistsError(f"{filename} already exists. Use overwrite=True to overwrite.")
+    return filename
+
+
+def _partial_filename(filename: Path) -> Path:
+    """
+    Returns the path incomplete data for ``filename`` is written to.
+    """
+    return filename.with_name(filename.name + ".part")
+
+
+def save_file(data: Union[bytes, Iterable[bytes]], filename: Union[Path, str], overwrite: bool = False) -> Path:
     """
     Saves a file to the specified path.
 
+    The data is written to ``<filename>.part`` first and renamed once
+    complete, so an interrupted save never leaves a truncated file behind.
+
     Parameters
     ----------
     data
-        The data to save.
+        The data to save, either as a whole or as an iterable of chunks.
     filename
         The path to save the file to.
     overwrite
@@ -172,12 +293,17 @@ def save_file(data: bytearray, filename: Union[Path, str], overwrite: bool = Fal
     `~pathlib.Path`
         The path to the saved file.
     """
-    filepath, filename = os.path.split(filename)
-    filename = re.sub(r"[^\w\-_\. ]", "_", filename)
-    filename = Path(filepath) / Path(filename)
-    filename = Path(filename).expanduser().resolve().absolute()
-    # Sanitize the filename - Only works for strings
-    if filename.exists() and not overwrite:
-        raise FileExistsError(f"{filename} already exists. Use overwrite=True to overwrite.")
-    filename.write_bytes(data)
+    filename = _prepare_filename(filename, overwrite=overwrite)
+    partial = _partial_filename(filename)
+    try:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            partial.write_bytes(data)
+        else:
+            with partial.open("wb") as f:
+                for chunk in data:
+                    f.write(chunk)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, filename)
     return filename